@@ -0,0 +1,79 @@
+"""store published schedule html gzip-compressed
+
+Revision ID: 3f9c2a7d1b04
+Revises:
+Create Date: 2026-10-19 09:12:41.318204
+
+"""
+import gzip
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2a7d1b04'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Rows are converted in keyset-paginated batches so the migration never holds
+# more than BATCH_SIZE snapshot bodies in memory at once.
+BATCH_SIZE = 200
+
+published_schedules = sa.table(
+    "published_schedules",
+    sa.column("id", sa.Integer),
+    sa.column("html_content", sa.Text),
+    sa.column("html_gzip", sa.LargeBinary),
+)
+
+
+def _convert_in_batches(source, target, transform) -> None:
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(published_schedules.c.id, source)
+            .where(published_schedules.c.id > last_id)
+            .order_by(published_schedules.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+
+        bind.execute(
+            published_schedules.update()
+            .where(published_schedules.c.id == sa.bindparam("row_id"))
+            .values({target.name: sa.bindparam("payload")}),
+            [{"row_id": row[0], "payload": transform(row[1])} for row in rows],
+        )
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    op.add_column("published_schedules", sa.Column("html_gzip", sa.LargeBinary(), nullable=True))
+
+    _convert_in_batches(
+        published_schedules.c.html_content,
+        published_schedules.c.html_gzip,
+        lambda html: gzip.compress(html.encode("utf-8"), compresslevel=9, mtime=0),
+    )
+
+    with op.batch_alter_table("published_schedules") as batch_op:
+        batch_op.alter_column("html_gzip", existing_type=sa.LargeBinary(), nullable=False)
+        batch_op.drop_column("html_content")
+
+
+def downgrade() -> None:
+    op.add_column("published_schedules", sa.Column("html_content", sa.Text(), nullable=True))
+
+    _convert_in_batches(
+        published_schedules.c.html_gzip,
+        published_schedules.c.html_content,
+        lambda payload: gzip.decompress(payload).decode("utf-8"),
+    )
+
+    with op.batch_alter_table("published_schedules") as batch_op:
+        batch_op.alter_column("html_content", existing_type=sa.Text(), nullable=False)
+        batch_op.drop_column("html_gzip")
@@ -0,0 +1,41 @@
+"""index doctor directory ordering and name search
+
+Revision ID: 5d8e1f3a6b27
+Revises: c27e5b9f0a13
+Create Date: 2026-10-19 12:05:51.402377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d8e1f3a6b27'
+down_revision = 'c27e5b9f0a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f("ix_doctors_name"), "doctors", ["name"])
+
+    # Name search filters on lower(name) LIKE. On PostgreSQL a pattern-ops
+    # index serves prefix matches and a trigram index serves substring matches.
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(
+            "CREATE INDEX ix_doctors_name_lower_pattern "
+            "ON doctors (lower(name) text_pattern_ops)"
+        )
+        op.execute(
+            "CREATE INDEX ix_doctors_name_lower_trgm "
+            "ON doctors USING gin (lower(name) gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_doctors_name_lower_trgm", table_name="doctors")
+        op.drop_index("ix_doctors_name_lower_pattern", table_name="doctors")
+
+    op.drop_index(op.f("ix_doctors_name"), table_name="doctors")
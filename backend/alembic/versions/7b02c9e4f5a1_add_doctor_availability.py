@@ -0,0 +1,49 @@
+"""add doctor availability calendar
+
+Revision ID: 7b02c9e4f5a1
+Revises: e93b47c1d208
+Create Date: 2026-10-19 13:31:26.084915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b02c9e4f5a1'
+down_revision = 'e93b47c1d208'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "doctor_availability",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("doctor_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "kind",
+            sa.Enum("LEAVE", "CONFERENCE", "PART_TIME", name="availabilitykind"),
+            nullable=False,
+        ),
+        sa.Column("start_date", sa.Date(), nullable=False),
+        sa.Column("end_date", sa.Date(), nullable=False),
+        sa.Column("weekday_mask", sa.Integer(), nullable=True),
+        sa.Column("note", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(["doctor_id"], ["doctors.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_doctor_availability_id"), "doctor_availability", ["id"])
+    op.create_index(
+        "ix_doctor_availability_doctor_start",
+        "doctor_availability",
+        ["doctor_id", "start_date"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_doctor_availability_doctor_start", table_name="doctor_availability")
+    op.drop_index(op.f("ix_doctor_availability_id"), table_name="doctor_availability")
+    op.drop_table("doctor_availability")
+    sa.Enum(name="availabilitykind").drop(op.get_bind(), checkfirst=True)
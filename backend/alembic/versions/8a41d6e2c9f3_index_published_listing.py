@@ -0,0 +1,26 @@
+"""index published listing join and week filter
+
+Revision ID: 8a41d6e2c9f3
+Revises: 3f9c2a7d1b04
+Create Date: 2026-10-19 10:04:17.552930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a41d6e2c9f3'
+down_revision = '3f9c2a7d1b04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f("ix_schedules_week_start_date"), "schedules", ["week_start_date"])
+    op.create_index(op.f("ix_published_schedules_schedule_id"), "published_schedules", ["schedule_id"])
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_published_schedules_schedule_id"), table_name="published_schedules")
+    op.drop_index(op.f("ix_schedules_week_start_date"), table_name="schedules")
@@ -0,0 +1,26 @@
+"""add schedule version for cache invalidation
+
+Revision ID: a4f6d8b2e190
+Revises: 7b02c9e4f5a1
+Create Date: 2026-10-19 14:12:48.563021
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4f6d8b2e190'
+down_revision = '7b02c9e4f5a1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("schedules") as batch_op:
+        batch_op.add_column(sa.Column("version", sa.Integer(), server_default="1", nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("schedules") as batch_op:
+        batch_op.drop_column("version")
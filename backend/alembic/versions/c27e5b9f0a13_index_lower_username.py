@@ -0,0 +1,24 @@
+"""index lower(username) for case-insensitive login lookup
+
+Revision ID: c27e5b9f0a13
+Revises: 8a41d6e2c9f3
+Create Date: 2026-10-19 11:22:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c27e5b9f0a13'
+down_revision = '8a41d6e2c9f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_users_username_lower", "users", [sa.text("lower(username)")])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_username_lower", table_name="users")
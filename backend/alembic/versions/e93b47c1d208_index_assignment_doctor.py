@@ -0,0 +1,24 @@
+"""index assignments by doctor
+
+Revision ID: e93b47c1d208
+Revises: 5d8e1f3a6b27
+Create Date: 2026-10-19 12:48:09.731654
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e93b47c1d208'
+down_revision = '5d8e1f3a6b27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f("ix_assignments_doctor_id"), "assignments", ["doctor_id"])
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_assignments_doctor_id"), table_name="assignments")
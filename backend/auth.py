@@ -1,22 +1,300 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+import asyncio
+import hashlib
+import logging
+import threading
+import time
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+from redis.exceptions import RedisError
+from cache import redis_client
 from database import get_db
-from models import User
+from models import User, UserRole
 from config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = logging.getLogger(__name__)
+
 security = HTTPBearer()
+# Same scheme without the 403 on a missing header, for optional authentication
+optional_security = HTTPBearer(auto_error=False)
+
+# Sorted set of user id -> revocation timestamp, shared by every worker.
+PRINCIPAL_REVOCATIONS_KEY = "auth:principal_revocations"
+# How often each worker pulls the revocation set from Redis.
+PRINCIPAL_REVOCATION_SYNC_SECONDS = 1.0
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated user as seen by request handlers.
+
+    A detached snapshot of the ``User`` row, safe to cache across requests.
+    Handlers that need to modify the user must load the row themselves.
+    """
+    id: int
+    username: str
+    email: str
+    role: UserRole
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            role=user.role,
+            is_active=user.is_active,
+        )
+
+
+class PrincipalCache:
+    """Short-lived, in-process cache of verified principals keyed by token hash.
+
+    Entries expire after ``ttl`` seconds or when the token does, whichever is
+    sooner. Revocations are published to a Redis sorted set and pulled by every
+    worker at most once per sync interval; while that set cannot be read the
+    cache is bypassed so a revoked principal is never served.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, sync_interval: float = PRINCIPAL_REVOCATION_SYNC_SECONDS):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.sync_interval = sync_interval
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, Tuple[float, float, Principal]] = {}
+        self._revocations: Dict[int, float] = {}
+        self._revocations_synced = False
+        self._last_sync_attempt = float("-inf")
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def token_key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token_key: str) -> Optional[Principal]:
+        now = time.time()
+        entry = self._entries.get(token_key)
+        if entry is None or not self._revocations_current(now):
+            self.misses += 1
+            return None
+
+        cached_at, expires_at, principal = entry
+        revoked_at = self._revocations.get(principal.id)
+        if now >= expires_at or (revoked_at is not None and revoked_at >= cached_at):
+            self._entries.pop(token_key, None)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return principal
+
+    def put(self, token_key: str, principal: Principal, token_expires_at: Optional[float]) -> None:
+        if self.ttl <= 0:
+            return
+        now = time.time()
+        expires_at = now + self.ttl
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._evict(now)
+            self._entries[token_key] = (now, expires_at, principal)
+
+    def revoke(self, user_id: int) -> None:
+        """Drop cached principals for a user in this and every other worker."""
+        now = time.time()
+        with self._lock:
+            self._revocations[user_id] = now
+            for token_key, (_, _, principal) in list(self._entries.items()):
+                if principal.id == user_id:
+                    self._entries.pop(token_key, None)
+
+        try:
+            pipe = redis_client.pipeline()
+            pipe.zadd(PRINCIPAL_REVOCATIONS_KEY, {str(user_id): now})
+            # Anything older than the TTL can no longer match a live entry.
+            pipe.zremrangebyscore(PRINCIPAL_REVOCATIONS_KEY, "-inf", now - self.ttl)
+            pipe.execute()
+        except RedisError:
+            logger.warning("Could not publish principal revocation for user %s", user_id, exc_info=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._revocations.clear()
+            self._revocations_synced = False
+            self._last_sync_attempt = float("-inf")
+
+    def _revocations_current(self, now: float) -> bool:
+        if now - self._last_sync_attempt < self.sync_interval:
+            return self._revocations_synced
+
+        with self._lock:
+            if now - self._last_sync_attempt < self.sync_interval:
+                return self._revocations_synced
+            self._last_sync_attempt = now
+            try:
+                revoked = redis_client.zrangebyscore(
+                    PRINCIPAL_REVOCATIONS_KEY, now - self.ttl, "+inf", withscores=True
+                )
+            except RedisError:
+                self._revocations_synced = False
+                return False
+
+            merged = {int(user_id): revoked_at for user_id, revoked_at in revoked}
+            # Keep local revocations that have not reached Redis yet.
+            for user_id, revoked_at in self._revocations.items():
+                if revoked_at >= now - self.ttl and revoked_at > merged.get(user_id, float("-inf")):
+                    merged[user_id] = revoked_at
+            self._revocations = merged
+            self._revocations_synced = True
+            return True
+
+    def _evict(self, now: float) -> None:
+        for token_key, (_, expires_at, _) in list(self._entries.items()):
+            if expires_at <= now:
+                del self._entries[token_key]
+        while len(self._entries) >= self.max_entries:
+            self._entries.pop(next(iter(self._entries)))
+
+
+principal_cache = PrincipalCache(
+    ttl=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=settings.AUTH_PRINCIPAL_CACHE_MAX_ENTRIES,
+)
+
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    """Bounded worker pool for bcrypt so hashing never runs on the event loop.
+
+    bcrypt releases the GIL, so a thread pool gives real parallelism up to
+    ``max_workers``. Jobs beyond that wait in the executor queue; once
+    ``max_queue`` jobs are waiting or running, new ones are rejected with 503
+    instead of piling up behind a login flood.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.run_seconds_total = 0.0
+
+    @property
+    def pending(self) -> int:
+        """Jobs currently queued or running."""
+        return self._pending
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "pending": self._pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+                "run_seconds_total": self.run_seconds_total,
+            }
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            if self._pending >= self.max_queue:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Authentication is busy, please retry shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="password-hash"
+                )
+            executor = self._executor
+
+        submitted_at = time.perf_counter()
+
+        def job() -> T:
+            started_at = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                finished_at = time.perf_counter()
+                waited = started_at - submitted_at
+                with self._lock:
+                    self._pending -= 1
+                    self.completed += 1
+                    self.wait_seconds_total += waited
+                    self.wait_seconds_max = max(self.wait_seconds_max, waited)
+                    self.run_seconds_total += finished_at - started_at
+
+        # A job stays pending until its thread is done with it, even if the
+        # caller is cancelled meanwhile; one cancelled before it started
+        # never runs, so it is released here instead.
+        def release_if_cancelled(future: Future) -> None:
+            if future.cancelled():
+                with self._lock:
+                    self._pending -= 1
+
+        try:
+            future = executor.submit(job)
+        except RuntimeError:
+            # Shut down between taking the executor and submitting
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(release_if_cancelled)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+
+# passlib and jose are imported on first use rather than at startup; a
+# worker that only serves cached reads never loads the bcrypt backend.
+@lru_cache(maxsize=None)
+def pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return pwd_context().hash(password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """``verify_password`` on the hashing pool, for use from async handlers."""
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """``get_password_hash`` on the hashing pool, for use from async handlers."""
+    return await password_hasher.run(get_password_hash, password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -25,42 +303,72 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
+    from jose import jwt
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
 def verify_token(token: str) -> Optional[dict]:
+    from jose import JWTError, jwt
     try:
         payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
         return payload
     except JWTError:
         return None
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+def get_optional_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
     db: Session = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
+) -> Optional[Principal]:
+    """The principal for a valid bearer token, or ``None``.
+
+    FastAPI resolves it once per request, so :func:`get_current_user` and read
+    routing share the token decode and user lookup.
+    """
+    if credentials is None:
+        return None
+
     token = credentials.credentials
+    token_key = principal_cache.token_key(token)
+    principal = principal_cache.get(token_key)
+    if principal is not None:
+        return principal
+
     payload = verify_token(token)
     if payload is None:
-        raise credentials_exception
+        return None
     
     username: str = payload.get("sub")
     if username is None:
-        raise credentials_exception
+        return None
     
     user = db.query(User).filter(User.username == username).first()
     if user is None:
-        raise credentials_exception
+        return None
     
-    return user
+    principal = Principal.from_user(user)
+    principal_cache.put(token_key, principal, payload.get("exp"))
+    return principal
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    principal: Optional[Principal] = Depends(get_optional_user)
+) -> Principal:
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return principal
+
+def get_current_session_id(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> Optional[str]:
+    """Login session id carried by the bearer token, if it was issued with one."""
+    payload = verify_token(credentials.credentials)
+    return payload.get("sid") if payload else None
 
-def get_current_admin_user(current_user: User = Depends(get_current_user)) -> User:
+def get_current_admin_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,65 @@
+"""Shared helpers for the benchmark scripts."""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+from typing import Dict, Iterable, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def use_scratch_database(name: str) -> str:
+    """Point the app at a throwaway SQLite file. Must run before app imports."""
+    path = os.path.join(tempfile.gettempdir(), f"scheduler-bench-{name}.db")
+    if os.path.exists(path):
+        os.remove(path)
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    # Nothing listens here, so Redis-backed features take their fallback path.
+    os.environ.setdefault("REDIS_URL", "redis://127.0.0.1:1/0")
+    return path
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def bootstrap_database(env: Dict[str, str]) -> None:
+    """Run ``bootstrap.py`` as a deploy would, before starting a server."""
+    subprocess.run([sys.executable, "bootstrap.py"], cwd=BACKEND_DIR, env=env, check=True, stdout=subprocess.DEVNULL)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize_latencies(seconds: Iterable[float]) -> Dict[str, float]:
+    """p50/p95/p99/max in milliseconds."""
+    values = sorted(seconds)
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round((values[-1] if values else 0.0) * 1000, 3),
+    }
+
+
+def emit(result: dict, output: str | None) -> None:
+    """Write a result as JSON to ``output`` or stdout."""
+    text = json.dumps(result, indent=2, sort_keys=True)
+    if output:
+        with open(output, "w") as handle:
+            handle.write(text + "\n")
+    else:
+        sys.stdout.write(text + "\n")
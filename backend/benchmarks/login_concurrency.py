@@ -0,0 +1,104 @@
+"""Schedule-read latency while a wave of logins is in flight.
+
+Runs the app in-process on a single event loop, so any bcrypt work done on the
+loop shows up directly as read latency. Compare the default run with
+``--inline-hashing``, which restores the old behaviour of hashing on the loop:
+
+    python -m benchmarks.login_concurrency
+    python -m benchmarks.login_concurrency --inline-hashing
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import emit, summarize_latencies, use_scratch_database
+
+use_scratch_database("login-concurrency")
+
+import httpx  # noqa: E402
+
+import routers.auth  # noqa: E402
+from auth import get_password_hash, verify_password  # noqa: E402
+from database import Base, SessionLocal, engine  # noqa: E402
+from main import app  # noqa: E402
+from models import User, UserRole  # noqa: E402
+
+WEEK = "2024-01-01"
+
+
+def seed_users(count: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    hashed = get_password_hash("password")
+    with SessionLocal() as db:
+        db.add(User(username="reader", email="reader@bench.local", hashed_password=hashed, role=UserRole.ADMIN))
+        for index in range(count):
+            db.add(User(username=f"user{index}", email=f"user{index}@bench.local", hashed_password=hashed, role=UserRole.EDITOR))
+        db.commit()
+
+
+async def run(logins: int, readers: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        token = (await client.post("/api/auth/login-json", json={"username": "reader", "password": "password"})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        # First read creates the schedule row for the week.
+        await client.get(f"/api/schedules/week/{WEEK}", headers=headers)
+
+        latencies = []
+        done = asyncio.Event()
+
+        async def reader() -> None:
+            while not done.is_set():
+                started = time.perf_counter()
+                response = await client.get(f"/api/schedules/week/{WEEK}", headers=headers)
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+
+        async def login(index: int) -> int:
+            response = await client.post(
+                "/api/auth/login-json",
+                json={"username": f"user{index}", "password": "password"},
+            )
+            return response.status_code
+
+        reader_tasks = [asyncio.create_task(reader()) for _ in range(readers)]
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*(login(index) for index in range(logins)))
+        login_wall = time.perf_counter() - started
+        done.set()
+        await asyncio.gather(*reader_tasks)
+
+    return {
+        "logins": logins,
+        "login_status_codes": sorted(set(statuses)),
+        "login_wall_seconds": round(login_wall, 3),
+        "readers": readers,
+        "read_latency": summarize_latencies(latencies),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--inline-hashing", action="store_true", help="verify passwords on the event loop (pre-pool behaviour)")
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    if args.inline_hashing:
+        async def verify_inline(plain_password: str, hashed_password: str) -> bool:
+            return verify_password(plain_password, hashed_password)
+
+        routers.auth.verify_password_async = verify_inline
+
+    seed_users(args.logins)
+    result = asyncio.run(run(args.logins, args.readers))
+    result["mode"] = "inline" if args.inline_hashing else "pool"
+    emit(result, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Schedule-read latency while a brute-force script floods the login endpoint.
+
+Attackers hammer ``/api/auth/login-json`` with wrong passwords for a real
+account, so every request that gets past the limiter costs a bcrypt verify.
+Compare a run with the limiter against ``--no-limit``:
+
+    python -m benchmarks.login_flood --fake-redis
+    python -m benchmarks.login_flood --fake-redis --no-limit
+
+Without ``--fake-redis`` the limiter uses ``REDIS_URL``; if that Redis is not
+reachable the limiter fails open and both runs behave like ``--no-limit``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+from benchmarks.common import emit, summarize_latencies, use_scratch_database
+
+use_scratch_database("login-flood")
+
+import httpx  # noqa: E402
+
+import auth  # noqa: E402
+import rate_limit  # noqa: E402
+import sessions  # noqa: E402
+from auth import get_password_hash  # noqa: E402
+from config import settings  # noqa: E402
+from database import Base, SessionLocal, engine  # noqa: E402
+from main import app  # noqa: E402
+from models import User, UserRole  # noqa: E402
+
+WEEK = "2024-01-01"
+
+
+def seed_users() -> None:
+    Base.metadata.create_all(bind=engine)
+    hashed = get_password_hash("password")
+    with SessionLocal() as db:
+        db.add(User(username="reader", email="reader@bench.local", hashed_password=hashed, role=UserRole.ADMIN))
+        db.add(User(username="victim", email="victim@bench.local", hashed_password=hashed, role=UserRole.EDITOR))
+        db.commit()
+
+
+async def run(attackers: int, readers: int, duration: float) -> dict:
+    transport = httpx.ASGITransport(app=app, client=("10.0.0.1", 40000))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        token = (await client.post("/api/auth/login-json", json={"username": "reader", "password": "password"})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        await client.get(f"/api/schedules/week/{WEEK}", headers=headers)
+
+        latencies = []
+        attack_statuses = Counter()
+        deadline = time.perf_counter() + duration
+
+        async def reader() -> None:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.get(f"/api/schedules/week/{WEEK}", headers=headers)
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+
+        async def attacker() -> None:
+            while time.perf_counter() < deadline:
+                response = await client.post(
+                    "/api/auth/login-json",
+                    json={"username": "victim", "password": "guess"},
+                )
+                attack_statuses[response.status_code] += 1
+
+        await asyncio.gather(
+            *(reader() for _ in range(readers)),
+            *(attacker() for _ in range(attackers)),
+        )
+
+    return {
+        "attackers": attackers,
+        "readers": readers,
+        "duration_seconds": duration,
+        "attack_status_counts": {str(code): count for code, count in sorted(attack_statuses.items())},
+        "read_latency": summarize_latencies(latencies),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--attackers", type=int, default=16)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--no-limit", action="store_true", help="disable the login rate limiter")
+    parser.add_argument("--fake-redis", action="store_true", help="use an in-process fakeredis server")
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    if args.fake_redis:
+        import fakeredis
+
+        fake = fakeredis.FakeRedis(decode_responses=True)
+        for module in (rate_limit, auth, sessions):
+            module.redis_client = fake
+    settings.LOGIN_RATE_LIMIT_ENABLED = not args.no_limit
+
+    seed_users()
+    result = asyncio.run(run(args.attackers, args.readers, args.duration))
+    result["mode"] = "unlimited" if args.no_limit else "limited"
+    emit(result, args.output)
+
+
+if __name__ == "__main__":
+    main()
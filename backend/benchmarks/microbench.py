@@ -0,0 +1,221 @@
+"""Microbenchmarks for the scheduling hot paths.
+
+Each function is timed on a realistic dataset (a staffed week, one year of
+history, 60 doctors) and an extreme one (cells staffed 40 deep, ten years of
+history, 1000 doctors):
+
+    python -m benchmarks.microbench --output before.json
+    python -m benchmarks.microbench --baseline before.json --threshold 10
+    python -m benchmarks.microbench compare before.json after.json
+
+Timings are per call, the best and median of ``--repeat`` rounds. Each round
+runs enough calls to last at least 0.2 seconds. With ``--baseline`` or
+``compare``, any case whose median slowed by more than ``--threshold``
+percent is reported as a regression and the exit status is 1.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.common import emit, use_scratch_database
+
+WEEK = date(2024, 1, 1)
+WEEKDAY_TYPES = 4  # Monday to Thursday need every type; Friday to Sunday only duty
+
+# name -> (doctors, weeks of history, doctors per cell in the benchmarked week)
+DATASETS = {
+    "realistic": (60, 52, 1),
+    "extreme": (1000, 520, 40),
+}
+
+
+def seed(doctors: int, weeks: int) -> None:
+    """Doctors and fully staffed weeks of history ending before ``WEEK``."""
+    from sqlalchemy import insert
+
+    from bootstrap import ensure_default_capacities
+    from database import Base, SessionLocal, engine
+    from models import Assignment, AssignmentType, Doctor, Schedule
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    types = list(AssignmentType)
+    with SessionLocal() as db:
+        ensure_default_capacities(db)
+        db.execute(insert(Doctor), [{"name": f"Dr. {index:04d}", "is_active": True} for index in range(doctors)])
+        first_week = datetime.combine(WEEK, datetime.min.time()) - timedelta(weeks=weeks)
+        db.execute(insert(Schedule), [
+            {"week_start_date": first_week + timedelta(weeks=week), "week_end_date": first_week + timedelta(weeks=week, days=6)}
+            for week in range(weeks)
+        ])
+        rows = []
+        for week in range(weeks):
+            for day in range(7):
+                for slot, assignment_type in enumerate(types if day < WEEKDAY_TYPES else [AssignmentType.DUTY]):
+                    rows.append({
+                        "schedule_id": week + 1,
+                        "doctor_id": (week * 7 + day + slot) % doctors + 1,
+                        "assignment_date": first_week + timedelta(weeks=week, days=day),
+                        "assignment_type": assignment_type,
+                    })
+        db.execute(insert(Assignment), rows)
+        # The benchmarked week, empty so validate_assignment accepts the probe
+        db.add(Schedule(week_start_date=datetime.combine(WEEK, datetime.min.time()), week_end_date=datetime.combine(WEEK + timedelta(days=6), datetime.min.time())))
+        db.commit()
+
+
+def staffed_week(depth: int, doctors: int) -> Tuple[list, list, dict]:
+    """Assignments, week dates and the publish payload for one staffed week."""
+    from models import Assignment, AssignmentType
+
+    week_dates = [datetime.combine(WEEK + timedelta(days=day), datetime.min.time()) for day in range(7)]
+    assignments = []
+    cells: Dict[str, List[dict]] = {}
+    for day, day_start in enumerate(week_dates):
+        for assignment_type in (list(AssignmentType) if day < WEEKDAY_TYPES else [AssignmentType.DUTY]):
+            for slot in range(depth):
+                doctor_id = (len(assignments) % doctors) + 1
+                assignments.append(Assignment(
+                    id=len(assignments) + 1,
+                    schedule_id=1,
+                    doctor_id=doctor_id,
+                    assignment_date=day_start,
+                    assignment_type=assignment_type,
+                ))
+                cells.setdefault(f"{day_start.isoformat()}_{assignment_type.value}", []).append({
+                    "id": doctor_id,
+                    "name": f"Dr. {doctor_id:04d}",
+                    "email": f"doctor{doctor_id}@example.com",
+                    "phone": "+1 555 0100",
+                })
+    return assignments, week_dates, {"week_dates": week_dates, "assignments": cells}
+
+
+def build_cases(dataset: str) -> Dict[str, Callable[[], object]]:
+    from auth import get_password_hash, verify_password
+    from database import SessionLocal
+    from models import AssignmentType, Schedule
+    from routers.published import generate_schedule_html, validate_schedule_completeness
+    from routers.schedules import AssignmentCreate, _assignment_response, _schedule_response, validate_assignment
+    from utils.responses import trusted_json
+
+    doctors, weeks, depth = DATASETS[dataset]
+    seed(doctors, weeks)
+    assignments, week_dates, schedule_data = staffed_week(depth, doctors)
+    # Shaped like the column rows the schedule endpoints select
+    rows = [
+        SimpleNamespace(
+            id=index, doctor_id=assignment.doctor_id, assignment_date=assignment.assignment_date,
+            assignment_type=assignment.assignment_type, doctor_name=f"Dr. {assignment.doctor_id:04d}",
+        )
+        for index, assignment in enumerate(assignments, start=1)
+    ]
+
+    db = SessionLocal()
+    probe = AssignmentCreate(doctor_id=1, assignment_date=WEEK, assignment_type=AssignmentType.MRI)
+    current_schedule_id = weeks + 1
+    schedule = Schedule(id=1, week_start_date=WEEK, week_end_date=WEEK + timedelta(days=6), is_published=False)
+
+    def serialize_schedule() -> bytes:
+        return trusted_json(_schedule_response(
+            schedule, [_assignment_response(row) for row in rows]
+        )).body
+
+    cases = {
+        "validate_assignment": lambda: validate_assignment(db, probe, current_schedule_id),
+        "validate_schedule_completeness": lambda: validate_schedule_completeness(assignments, week_dates),
+        "generate_schedule_html": lambda: generate_schedule_html(schedule_data, "January 01, 2024 at 09:00 AM UTC", "Chief", "Director"),
+        "serialize_schedule": serialize_schedule,
+    }
+    if dataset == "realistic":
+        # Cost does not depend on the dataset
+        hashed = get_password_hash("correct horse battery staple")
+        cases["get_password_hash"] = lambda: get_password_hash("correct horse battery staple")
+        cases["verify_password"] = lambda: verify_password("correct horse battery staple", hashed)
+    return cases
+
+
+def time_case(func: Callable[[], object], repeat: int, min_seconds: float) -> dict:
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_seconds:
+            break
+        number = max(number * 2, int(number * min_seconds / max(elapsed, 1e-9)))
+    rounds = [elapsed / number] + [seconds / number for seconds in timer.repeat(repeat - 1, number)]
+    return {
+        "calls_per_round": number,
+        "best_us": round(min(rounds) * 1e6, 3),
+        "median_us": round(statistics.median(rounds) * 1e6, 3),
+    }
+
+
+def run(datasets: List[str], only: List[str], repeat: int, min_seconds: float) -> dict:
+    results = {}
+    for dataset in datasets:
+        for name, func in build_cases(dataset).items():
+            if only and name not in only:
+                continue
+            results[f"{name}[{dataset}]"] = time_case(func, repeat, min_seconds)
+            print(f"{name}[{dataset}]: {results[f'{name}[{dataset}]']['median_us']} us", file=sys.stderr)
+    return {"python": sys.version.split()[0], "results": results}
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> dict:
+    """Per-case median change in percent; slower than ``threshold`` is a regression."""
+    changes = {}
+    regressions = []
+    for case, result in sorted(current["results"].items()):
+        before = baseline["results"].get(case)
+        if before is None:
+            continue
+        change = (result["median_us"] - before["median_us"]) / before["median_us"] * 100
+        changes[case] = {"before_us": before["median_us"], "after_us": result["median_us"], "change_pct": round(change, 1)}
+        if change > threshold:
+            regressions.append(case)
+    return {"threshold_pct": threshold, "changes": changes, "regressions": regressions}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", nargs="?", choices=["run", "compare"], default="run")
+    parser.add_argument("files", nargs="*", help="compare: baseline and candidate result files")
+    parser.add_argument("--dataset", choices=[*DATASETS, "all"], default="all")
+    parser.add_argument("--case", action="append", default=[], help="only run this case; repeatable")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-seconds", type=float, default=0.2, help="minimum duration of one round")
+    parser.add_argument("--baseline", help="compare this run against an earlier result file")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    if args.mode == "compare":
+        if len(args.files) != 2:
+            parser.error("compare needs a baseline and a candidate file")
+        with open(args.files[0]) as old, open(args.files[1]) as new:
+            report = compare(json.load(old), json.load(new), args.threshold)
+        emit(report, args.output)
+        sys.exit(1 if report["regressions"] else 0)
+
+    use_scratch_database("microbench")
+    datasets = list(DATASETS) if args.dataset == "all" else [args.dataset]
+    result = run(datasets, args.case, args.repeat, args.min_seconds)
+    if args.baseline:
+        with open(args.baseline) as handle:
+            result["comparison"] = compare(json.load(handle), result, args.threshold)
+    emit(result, args.output)
+    if args.baseline and result["comparison"]["regressions"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""CPU time per response for the large JSON endpoints.
+
+Loads a synthetic dataset with ``generate_dataset`` into a scratch SQLite
+file, then calls each endpoint in-process through ``httpx.ASGITransport``,
+one request at a time:
+
+    python -m benchmarks.response_cpu --output after.json
+    python -m benchmarks.response_cpu --years 2 --doctors 200
+
+For each endpoint it reports the process CPU time and the wall time per
+response, plus the body size. CPU time counts every thread, so work pushed
+to the threadpool is included. Routing, auth and the SQL are part of every
+number, so compare runs made on the same machine and dataset.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import date
+from typing import Dict, List
+
+from benchmarks.common import emit, use_scratch_database
+
+
+def seed(years: float, doctors: int) -> Dict[str, str]:
+    """Dataset plus a reader account; returns the paths to measure."""
+    from sqlalchemy import select
+
+    from bootstrap import ensure_default_capacities
+    from database import Base, SessionLocal, engine
+    from generate_dataset import GeneratorConfig, generate
+    from models import Doctor, Schedule, User, UserRole
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        ensure_default_capacities(db)
+        db.add(User(username="reader", email="reader@example.com", hashed_password="", role=UserRole.ADMIN))
+        db.commit()
+    with engine.begin() as connection:
+        generate(connection, GeneratorConfig(years=years, doctors=doctors, start=date(2024, 1, 1), versions=2))
+
+    with SessionLocal() as db:
+        busiest_doctor = db.scalar(select(Doctor.id).where(Doctor.is_active.is_(True)).order_by(Doctor.id))
+        first = db.scalars(select(Schedule).order_by(Schedule.week_start_date)).first()
+    return {
+        "schedules_list": "/api/schedules/",
+        "schedules_list_compact": "/api/schedules/?format=compact",
+        "schedule": f"/api/schedules/{first.id}",
+        "schedule_week": f"/api/schedules/week/{first.week_start_date.date().isoformat()}",
+        "schedule_week_compact": f"/api/schedules/week/{first.week_start_date.date().isoformat()}?format=compact",
+        "doctors_list": "/api/doctors/",
+        "doctors_sidebar": f"/api/doctors/sidebar?available_on={first.week_start_date.date().isoformat()}",
+        "doctor_assignments": f"/api/doctors/{busiest_doctor}/assignments?limit=200",
+        "published_list": "/api/published/?limit=200",
+    }
+
+
+async def measure(paths: Dict[str, str], requests: int) -> dict:
+    import fakeredis
+    import httpx
+
+    import auth
+    from auth import create_access_token
+    from main import app
+
+    # Serve the principal from its cache, as with a live Redis
+    auth.redis_client = fakeredis.FakeRedis(decode_responses=True)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'reader'})}"}
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, path in paths.items():
+            response = await client.get(path, headers=headers)
+            response.raise_for_status()
+            cpu: List[float] = []
+            wall: List[float] = []
+            for _ in range(requests):
+                cpu_started, wall_started = time.process_time(), time.perf_counter()
+                response = await client.get(path, headers=headers)
+                cpu.append(time.process_time() - cpu_started)
+                wall.append(time.perf_counter() - wall_started)
+            results[name] = {
+                "path": path,
+                "bytes": len(response.content),
+                "cpu_ms_median": round(statistics.median(cpu) * 1000, 3),
+                "cpu_ms_mean": round(statistics.mean(cpu) * 1000, 3),
+                "wall_ms_median": round(statistics.median(wall) * 1000, 3),
+            }
+            print(f"{name}: {results[name]['cpu_ms_median']} ms CPU", file=sys.stderr)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=float, default=1.0, help="weeks of schedules to load, in years")
+    parser.add_argument("--doctors", type=int, default=120)
+    parser.add_argument("--requests", type=int, default=30, help="requests per endpoint")
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    use_scratch_database("response-cpu")
+    paths = seed(args.years, args.doctors)
+    results = asyncio.run(measure(paths, args.requests))
+    emit({
+        "python": sys.version.split()[0],
+        "dataset": {"years": args.years, "doctors": args.doctors},
+        "results": results,
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
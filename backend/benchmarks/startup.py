@@ -0,0 +1,110 @@
+"""Time from process start to the first served request.
+
+Bootstraps a scratch SQLite file (or ``--database-url``) once, as a deploy
+would, then starts ``uvicorn main:app`` ``--runs`` times and polls ``/``
+until it answers:
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --workers 2 --runs 10
+
+Each run reports the import time of ``main`` in a fresh interpreter and the
+time until the first 200. This is what a rolling restart or a new worker
+costs before it can take traffic.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, Optional
+
+import httpx
+
+from benchmarks.common import BACKEND_DIR, bootstrap_database, emit, free_port
+
+IMPORT_MAIN = "import time; started = time.perf_counter(); import main; print(time.perf_counter() - started)"
+
+
+def server_env(database_url: Optional[str]) -> Dict[str, str]:
+    env = dict(os.environ)
+    if database_url is None:
+        path = os.path.join(tempfile.gettempdir(), "scheduler-bench-startup.db")
+        if os.path.exists(path):
+            os.remove(path)
+        database_url = f"sqlite:///{path}"
+    env["DATABASE_URL"] = database_url
+    # Nothing listens here; startup must not depend on Redis.
+    env.setdefault("REDIS_URL", "redis://127.0.0.1:1/0")
+    return env
+
+
+def import_seconds(env: Dict[str, str]) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_MAIN], cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def first_request_seconds(env: Dict[str, str], workers: int, timeout: float) -> float:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise SystemExit(f"uvicorn exited with status {process.returncode}")
+            try:
+                if httpx.get(url, timeout=1).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.HTTPError:
+                time.sleep(0.01)
+        raise SystemExit(f"no response within {timeout} seconds")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="defaults to a scratch SQLite file")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    env = server_env(args.database_url)
+    bootstrap_database(env)
+    # The first interpreter pays for writing bytecode caches; not a restart cost.
+    import_seconds(env)
+
+    runs = []
+    for _ in range(args.runs):
+        runs.append({
+            "import_main_s": round(import_seconds(env), 3),
+            "first_request_s": round(first_request_seconds(env, args.workers, args.timeout), 3),
+        })
+        print(f"first request after {runs[-1]['first_request_s']}s", file=sys.stderr)
+
+    emit({
+        "python": sys.version.split()[0],
+        "workers": args.workers,
+        "runs": runs,
+        "median_import_main_s": round(statistics.median(run["import_main_s"] for run in runs), 3),
+        "median_first_request_s": round(statistics.median(run["first_request_s"] for run in runs), 3),
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
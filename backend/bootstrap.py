@@ -1,15 +1,30 @@
-"""Startup bootstrap helpers for the API."""
+"""Deploy-time bootstrap for the API.
+
+Run once per deploy, before the API workers start:
+
+    python bootstrap.py
+
+It brings the schema to the latest Alembic revision, creating it on an empty
+database and upgrading an unversioned one from the original pre-Alembic
+schema, then seeds capacities and the default admin. The API lifespan only
+checks the revision (``check_schema_revision``) so workers start quickly.
+"""
 
 from __future__ import annotations
 
+import argparse
 import logging
-from typing import Optional
+import os
+import sys
+from typing import Optional, Tuple
 
+from sqlalchemy import inspect, select, text
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.orm import Session
 
 from auth import get_password_hash, verify_password
 from config import settings
-from models import User, UserRole, Capacity, AssignmentType
+from models import SCHEMA_REVISION, Base, User, UserRole, Capacity, AssignmentType
 from utils.auth import get_user_by_username, normalize_username
 
 logger = logging.getLogger(__name__)
@@ -63,12 +78,10 @@ def ensure_default_capacities(db: Session) -> None:
         (AssignmentType.DUTY,                 1),
     ]
 
+    existing = set(db.scalars(select(Capacity.assignment_type)))
     seeded = False
     for assignment_type, max_capacity in DEFAULT_CAPACITIES:
-        exists = db.query(Capacity).filter(
-            Capacity.assignment_type == assignment_type
-        ).first()
-        if not exists:
+        if assignment_type not in existing:
             db.add(Capacity(assignment_type=assignment_type, max_capacity=max_capacity))
             seeded = True
 
@@ -76,3 +89,111 @@ def ensure_default_capacities(db: Session) -> None:
         db.commit()
         logger.info("Seeded default capacity rows for all assignment types")
 
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+
+
+def alembic_config(database_url: Optional[str] = None):
+    """Alembic config for this checkout, pointed at ``DATABASE_URL``."""
+    from alembic.config import Config
+
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(os.path.dirname(ALEMBIC_INI), "alembic"))
+    # ConfigParser interpolates %, which URL-encoded passwords may contain
+    config.set_main_option("sqlalchemy.url", (database_url or settings.DATABASE_URL).replace("%", "%%"))
+    return config
+
+
+def head_revision() -> str:
+    """The head revision of the migrations in alembic/versions."""
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def current_revision(connection: Connection) -> Optional[str]:
+    """The revision the database is stamped with, or ``None`` if unversioned."""
+    # Plain SQL: importing alembic would add more to startup than the check costs
+    if not inspect(connection).has_table("alembic_version"):
+        return None
+    return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def check_schema_revision(engine: Engine) -> str:
+    """Raise ``RuntimeError`` unless the schema is at ``SCHEMA_REVISION``.
+
+    This is the only schema work the API does on startup; run
+    ``python bootstrap.py`` to migrate.
+    """
+    with engine.connect() as connection:
+        current = current_revision(connection)
+    if current != SCHEMA_REVISION:
+        raise RuntimeError(
+            f"Database schema is at revision {current or 'none'}, expected {SCHEMA_REVISION}; "
+            "run 'python bootstrap.py' before starting the API"
+        )
+    return current
+
+
+def migrate(engine: Engine) -> str:
+    """Create or upgrade the schema to head; returns what was done."""
+    from alembic import command
+
+    config = alembic_config(engine.url.render_as_string(hide_password=False))
+    with engine.connect() as connection:
+        tables = set(inspect(connection).get_table_names())
+        revision = current_revision(connection)
+
+    if not tables - {"alembic_version"}:
+        # The migrations start from an existing schema, so a new database
+        # gets the current models and is stamped at head.
+        Base.metadata.create_all(bind=engine)
+        command.stamp(config, "head")
+        return "created"
+    if revision is None:
+        # Tables without a revision predate Alembic: the first migration
+        # upgrades from that original create_all schema.
+        command.upgrade(config, "head")
+        return "upgraded"
+    if revision == head_revision():
+        return "current"
+    command.upgrade(config, "head")
+    return "upgraded"
+
+
+def drop_schema(engine: Engine) -> None:
+    """Drop every model table and the Alembic version, leaving an empty database."""
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Migrate and seed the database before starting the API")
+    parser.add_argument("--check", action="store_true", help="only check the schema revision; exit 1 if it is behind")
+    args = parser.parse_args()
+
+    from database import SessionLocal, engine
+
+    if args.check:
+        try:
+            current = check_schema_revision(engine)
+        except RuntimeError as exc:
+            print(f"❌ {exc}")
+            sys.exit(1)
+        print(f"✓ Schema is at revision {current}")
+        return
+
+    print("🔧 Bootstrapping database...")
+    outcome = migrate(engine)
+    print(f"✓ Schema {outcome} (revision {head_revision()})")
+    with SessionLocal() as db:
+        ensure_default_capacities(db)
+        print("✓ Default capacities present")
+        if ensure_default_admin(db):
+            print(f"✓ Default admin '{settings.DEFAULT_ADMIN_USERNAME}' created")
+    print("\n🎉 Database ready")
+
+
+if __name__ == "__main__":
+    main()
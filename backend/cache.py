@@ -0,0 +1,111 @@
+"""Shared Redis client and small JSON cache helpers."""
+
+import logging
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Optional
+
+import redis
+from redis.client import NEVER_DECODE, Pipeline
+from redis.exceptions import RedisError
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Called with a command name and its round trip in seconds; set by ``metrics``.
+CommandObserver = Callable[[str, float], None]
+
+
+class TimedPipeline(Pipeline):
+    on_command: Optional[CommandObserver] = None
+
+    def execute(self, raise_on_error=True):
+        observe = self.on_command
+        if observe is None:
+            return super().execute(raise_on_error)
+        started = time.perf_counter()
+        try:
+            return super().execute(raise_on_error)
+        finally:
+            observe("PIPELINE", time.perf_counter() - started)
+
+
+class TimedRedis(redis.Redis):
+    """Redis client that reports each command's round trip to ``on_command``."""
+
+    on_command: Optional[CommandObserver] = None
+
+    def execute_command(self, *args, **options):
+        observe = self.on_command
+        if observe is None:
+            return super().execute_command(*args, **options)
+        started = time.perf_counter()
+        try:
+            return super().execute_command(*args, **options)
+        finally:
+            observe(str(args[0]).upper(), time.perf_counter() - started)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        pipe = TimedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+        pipe.on_command = self.on_command
+        return pipe
+
+
+# A single connection pool per process; redis-py clients are thread-safe.
+redis_client = TimedRedis.from_url(
+    settings.REDIS_URL,
+    decode_responses=True,
+    socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+    socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+)
+
+GENERATION_KEY_PREFIX = "generation:"
+
+# Lookups through ``get_cached`` per key prefix, e.g. ``doctor_week``.
+cache_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+
+def get_generation(name: str) -> Optional[int]:
+    """Current value of a named invalidation counter, or ``None`` if Redis is down.
+
+    Cache keys that embed the generation go stale as soon as it is bumped.
+    """
+    try:
+        return int(redis_client.get(f"{GENERATION_KEY_PREFIX}{name}") or 0)
+    except RedisError:
+        return None
+
+
+def bump_generation(name: str) -> None:
+    """Invalidate every cache entry keyed on the named generation."""
+    try:
+        redis_client.incr(f"{GENERATION_KEY_PREFIX}{name}")
+    except RedisError:
+        logger.warning("Could not bump cache generation '%s'", name, exc_info=True)
+
+
+def get_cached(key: str) -> Optional[str]:
+    try:
+        value = redis_client.get(key)
+    except RedisError:
+        value = None
+    cache_stats[key.split(":", 1)[0]]["hits" if value is not None else "misses"] += 1
+    return value
+
+
+def get_cached_bytes(key: str) -> Optional[bytes]:
+    """``get_cached`` for binary values such as gzip bodies; skips decoding."""
+    try:
+        value = redis_client.execute_command("GET", key, **{NEVER_DECODE: True})
+    except RedisError:
+        value = None
+    cache_stats[key.split(":", 1)[0]]["hits" if value is not None else "misses"] += 1
+    return value
+
+
+def set_cached(key: str, value: str | bytes, ttl_seconds: int) -> None:
+    try:
+        redis_client.set(key, value, ex=ttl_seconds)
+    except RedisError:
+        logger.warning("Could not cache '%s'", key, exc_info=True)
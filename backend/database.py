@@ -1,16 +1,216 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from typing import Any, Dict, List
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 from config import settings
 
-engine = create_engine(settings.DATABASE_URL)
+# Async drivers for the synchronous URLs the app is configured with
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def async_database_url(url: str) -> str:
+    """Rewrite a sync database URL to use the matching async driver."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}' databases")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+class PoolMetrics:
+    """Checkout counts and wait times for one connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, waited: float, timed_out: bool) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+
+
+class _InstrumentedPoolMixin:
+    """Times every checkout, including the wait for a free connection."""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - started, timed_out=False)
+        return connection
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    metrics = PoolMetrics()
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    metrics = PoolMetrics()
+
+
+class ReplicaQueuePool(InstrumentedQueuePool):
+    metrics = PoolMetrics()
+
+
+class ReplicaAsyncQueuePool(InstrumentedAsyncQueuePool):
+    metrics = PoolMetrics()
+
+
+POOL_CLASSES = {
+    (False, False): InstrumentedQueuePool,
+    (True, False): InstrumentedAsyncQueuePool,
+    (False, True): ReplicaQueuePool,
+    (True, True): ReplicaAsyncQueuePool,
+}
+
+
+def _engine_options(url: str, is_async: bool, replica: bool = False) -> Dict[str, Any]:
+    """Pool and driver options for an engine, from ``Settings``.
+
+    In-memory SQLite keeps the pool SQLAlchemy picks for it, since a queue
+    of connections would each open a separate, empty database.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    timeout_ms = settings.DB_STATEMENT_TIMEOUT_MS
+    options: Dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    connect_args: Dict[str, Any] = {}
+
+    if settings.DB_PGBOUNCER:
+        # PgBouncer owns the pooling; holding idle connections here would only
+        # pin server connections. Transaction pooling also forbids named
+        # prepared statements and startup parameters.
+        options["poolclass"] = NullPool
+        if is_async and backend == "postgresql":
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_cache_size"] = 0
+    elif backend == "sqlite" and parsed.database in (None, "", ":memory:"):
+        pass
+    else:
+        options.update(
+            poolclass=POOL_CLASSES[(is_async, replica)],
+            pool_size=settings.DB_ASYNC_POOL_SIZE if is_async else settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_ASYNC_MAX_OVERFLOW if is_async else settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        )
+        if backend == "postgresql" and timeout_ms:
+            if is_async:
+                connect_args["server_settings"] = {"statement_timeout": str(timeout_ms)}
+            else:
+                connect_args["options"] = f"-c statement_timeout={timeout_ms}"
+
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+def _set_local_statement_timeout(sync_engine) -> None:
+    """Apply the statement timeout per transaction, which PgBouncer allows."""
+    @event.listens_for(sync_engine, "begin")
+    def set_statement_timeout(connection):
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(settings.DB_STATEMENT_TIMEOUT_MS)}")
+
+
+_async_url = settings.DATABASE_ASYNC_URL or async_database_url(settings.DATABASE_URL)
+
+engine = create_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL, is_async=False))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(_async_url, **_engine_options(_async_url, is_async=True))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Read-only handlers use these; without a replica they are the primary's.
+read_replica_configured = settings.DATABASE_READ_URL is not None
+if read_replica_configured:
+    _async_read_url = settings.DATABASE_READ_ASYNC_URL or async_database_url(settings.DATABASE_READ_URL)
+    read_engine = create_engine(
+        settings.DATABASE_READ_URL,
+        **_engine_options(settings.DATABASE_READ_URL, is_async=False, replica=True),
+    )
+    async_read_engine = create_async_engine(
+        _async_read_url, **_engine_options(_async_read_url, is_async=True, replica=True)
+    )
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+    AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
+else:
+    read_engine = engine
+    async_read_engine = async_engine
+    ReadSessionLocal = SessionLocal
+    AsyncReadSessionLocal = AsyncSessionLocal
+
+if settings.DB_PGBOUNCER and settings.DB_STATEMENT_TIMEOUT_MS:
+    for _engine in {engine, async_engine.sync_engine, read_engine, async_read_engine.sync_engine}:
+        if _engine.dialect.name == "postgresql":
+            _set_local_statement_timeout(_engine)
+
 Base = declarative_base()
 
+def app_engines() -> List[Engine]:
+    """The sync engines behind every session the app hands out."""
+    return list({engine, async_engine.sync_engine, read_engine, async_read_engine.sync_engine})
+
+def pool_status() -> Dict[str, Dict[str, Any]]:
+    """Occupancy and checkout metrics for the sync and async pools."""
+    pools = [("sync", engine.pool), ("async", async_engine.pool)]
+    if read_replica_configured:
+        pools += [("sync_replica", read_engine.pool), ("async_replica", async_read_engine.pool)]
+    status = {}
+    for name, pool in pools:
+        entry: Dict[str, Any] = {"pool": pool.__class__.__name__}
+        if isinstance(pool, QueuePool):
+            entry.update(
+                size=pool.size(),
+                max_overflow=pool._max_overflow,
+                checked_out=pool.checkedout(),
+                overflow=pool.overflow(),
+                idle=pool.checkedin(),
+            )
+        metrics = getattr(pool, "metrics", None)
+        if metrics is not None:
+            entry.update(metrics.snapshot())
+        status[name] = entry
+    return status
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    """Async session for handlers that must not block the event loop."""
+    async with AsyncSessionLocal() as db:
+        yield db
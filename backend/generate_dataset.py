@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Generate a large synthetic dataset for scale testing.
+
+Produces doctors with leave, conference and part-time patterns, one schedule
+per week, assignments that respect capacities, availability and the
+one-assignment-per-day rule, and several published versions per week:
+
+    python generate_dataset.py --years 5 --doctors 200 --reset
+
+Rows are generated in memory with explicit ids and written with set-based
+inserts, or COPY on PostgreSQL, so nothing round-trips per row.
+"""
+import argparse
+import csv
+import enum
+import io
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from typing import Dict, List, Sequence
+
+from sqlalchemy import Table, func, insert, select, text
+from sqlalchemy.engine import Connection
+
+from bootstrap import drop_schema, ensure_default_capacities, migrate
+from database import SessionLocal, engine
+from models import (
+    Assignment,
+    AssignmentType,
+    AvailabilityKind,
+    Capacity,
+    Doctor,
+    DoctorAvailability,
+    DoctorStatus,
+    PublishedSchedule,
+    Schedule,
+)
+from routers.published import generate_schedule_html
+from utils.availability import AvailabilityIndex
+from utils.compression import compress_html
+
+FIRST_NAMES = [
+    "Ahmed", "Fatima", "Mohammed", "Aisha", "Omar", "Khadija", "Yusuf", "Amina", "Hassan", "Zainab",
+    "Abebe", "Selam", "Dawit", "Hana", "Tesfaye", "Meron", "Samuel", "Ruth", "Daniel", "Liya",
+]
+LAST_NAMES = [
+    "Hassan", "Ali", "Ibrahim", "Mohamed", "Ahmed", "Tadesse", "Bekele", "Girma", "Haile", "Kebede",
+    "Mekonnen", "Alemu", "Wolde", "Desta", "Negash", "Assefa", "Getachew", "Tesfaye", "Yohannes", "Abera",
+]
+POSITIONS = ["Consultant", "Senior Resident", "Resident", "Fellow"]
+
+# Friday to Sunday only need a duty doctor, as in validate_schedule_completeness
+WEEKEND_START = 4
+
+
+@dataclass
+class GeneratorConfig:
+    years: float = 1.0
+    doctors: int = 200
+    start: date = None  # Monday of the first week; defaults to ``years`` before this week
+    versions: int = 3  # Published snapshots per past week
+    part_time_share: float = 0.1
+    inactive_share: float = 0.05
+    seed: int = 42
+    batch_size: int = 5000
+
+    @property
+    def weeks(self) -> int:
+        return max(1, round(self.years * 52))
+
+    def first_week(self) -> date:
+        if self.start is not None:
+            return self.start - timedelta(days=self.start.weekday())
+        this_week = date.today() - timedelta(days=date.today().weekday())
+        return this_week - timedelta(weeks=self.weeks)
+
+
+def _next_id(connection: Connection, table: Table) -> int:
+    return (connection.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+
+def _copy_value(value) -> object:
+    """A value as COPY's csv format expects it."""
+    if value is None:
+        return ""
+    if isinstance(value, bytes):
+        return "\\x" + value.hex()
+    if isinstance(value, enum.Enum):
+        # SQLAlchemy stores enum members by name
+        return value.name
+    return value
+
+
+def bulk_load(connection: Connection, table: Table, rows: Sequence[dict], batch_size: int) -> None:
+    """Write rows with COPY on psycopg2, otherwise with batched executemany inserts."""
+    if not rows:
+        return
+    if connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg2":
+        columns = list(rows[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([_copy_value(row[column]) for column in columns])
+        buffer.seek(0)
+        cursor = connection.connection.dbapi_connection.cursor()
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '')",
+            buffer,
+        )
+        # Explicit ids leave the serial sequence behind
+        connection.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), (SELECT max(id) FROM {table.name}))"
+        ))
+        return
+
+    for offset in range(0, len(rows), batch_size):
+        connection.execute(insert(table), list(rows[offset:offset + batch_size]))
+    if connection.dialect.name == "postgresql":
+        connection.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), (SELECT max(id) FROM {table.name}))"
+        ))
+
+
+def generate_doctors(rng: random.Random, config: GeneratorConfig, first_id: int) -> List[dict]:
+    doctors = []
+    for offset in range(config.doctors):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        inactive = rng.random() < config.inactive_share
+        doctors.append({
+            "id": first_id + offset,
+            "name": f"Dr. {first} {last} {offset:04d}",
+            "email": f"{first.lower()}.{last.lower()}.{offset}@hospital.example",
+            "phone": f"+2519{rng.randrange(10_000_000, 99_999_999)}",
+            "position": rng.choice(POSITIONS),
+            "is_active": not inactive,
+            "status": DoctorStatus.INACTIVE if inactive else DoctorStatus.ACTIVE,
+        })
+    return doctors
+
+
+def generate_availability(
+    rng: random.Random, config: GeneratorConfig, doctor_ids: Sequence[int], first_day: date, last_day: date, first_id: int
+) -> List[dict]:
+    """Annual leave, conferences and part-time weekdays off for each doctor."""
+    entries = []
+    span = (last_day - first_day).days
+    years = max(1, round(span / 365))
+
+    def add(doctor_id: int, kind: AvailabilityKind, start: date, length: int, weekday_mask=None) -> None:
+        entries.append({
+            "id": first_id + len(entries),
+            "doctor_id": doctor_id,
+            "kind": kind,
+            "start_date": start,
+            "end_date": min(start + timedelta(days=length - 1), last_day),
+            "weekday_mask": weekday_mask,
+            "note": None,
+        })
+
+    for doctor_id in doctor_ids:
+        for _ in range(years * rng.randint(1, 3)):
+            add(doctor_id, AvailabilityKind.LEAVE, first_day + timedelta(days=rng.randrange(span + 1)), rng.randint(5, 14))
+        for _ in range(years * rng.randint(0, 2)):
+            add(doctor_id, AvailabilityKind.CONFERENCE, first_day + timedelta(days=rng.randrange(span + 1)), rng.randint(2, 4))
+        if rng.random() < config.part_time_share:
+            days_off = rng.sample(range(WEEKEND_START), rng.randint(1, 2))
+            add(doctor_id, AvailabilityKind.PART_TIME, first_day, span + 1, sum(1 << day for day in days_off))
+    return entries
+
+
+def generate_week_assignments(
+    rng: random.Random,
+    week_start: date,
+    schedule_id: int,
+    doctor_ids: Sequence[int],
+    availability: AvailabilityIndex,
+    capacities: Dict[AssignmentType, int],
+) -> List[dict]:
+    """Staff every required cell, and some optional slots up to capacity."""
+    assignments = []
+    for day_offset in range(7):
+        day = week_start + timedelta(days=day_offset)
+        types = [AssignmentType.DUTY] if day.weekday() >= WEEKEND_START else list(AssignmentType)
+        free = [doctor_id for doctor_id in doctor_ids if availability.is_available(doctor_id, day)]
+        rng.shuffle(free)
+        day_start = datetime.combine(day, datetime.min.time())
+        for assignment_type in types:
+            wanted = 1 + sum(rng.random() < 0.6 for _ in range(capacities[assignment_type] - 1))
+            for _ in range(wanted):
+                if not free:
+                    break
+                # Popping keeps each doctor to one assignment per day
+                assignments.append({
+                    "schedule_id": schedule_id,
+                    "doctor_id": free.pop(),
+                    "assignment_date": day_start,
+                    "assignment_type": assignment_type,
+                })
+    return assignments
+
+
+def generate_snapshots(
+    rng: random.Random,
+    config: GeneratorConfig,
+    schedule_id: int,
+    week_start: date,
+    assignments: Sequence[dict],
+    doctors_by_id: Dict[int, dict],
+    slugs: set,
+) -> List[dict]:
+    """Published versions of a week, re-published over the preceding days."""
+    week_dates = [datetime.combine(week_start + timedelta(days=day), datetime.min.time()) for day in range(7)]
+    cells: Dict[str, List[dict]] = {}
+    for assignment in assignments:
+        doctor = doctors_by_id[assignment["doctor_id"]]
+        cells.setdefault(f"{assignment['assignment_date'].isoformat()}_{assignment['assignment_type'].value}", []).append({
+            "id": doctor["id"], "name": doctor["name"], "email": doctor["email"], "phone": doctor["phone"],
+        })
+
+    snapshots = []
+    for version in range(config.versions):
+        published_at = datetime.combine(week_start, datetime.min.time()) - timedelta(
+            days=config.versions - version, hours=rng.randint(8, 17)
+        )
+        # Random like publish_schedule, so reruns with the same seed do not collide
+        slug = str(uuid.uuid4())[:8]
+        while slug in slugs:
+            slug = str(uuid.uuid4())[:8]
+        slugs.add(slug)
+        html = generate_schedule_html(
+            {"week_dates": week_dates, "assignments": cells},
+            published_at.strftime('%B %d, %Y at %I:%M %p UTC'),
+        )
+        snapshots.append({
+            "slug": slug,
+            "schedule_id": schedule_id,
+            "published_at": published_at,
+            "html_gzip": compress_html(html),
+        })
+    return snapshots
+
+
+def generate(connection: Connection, config: GeneratorConfig) -> Dict[str, int]:
+    """Generate and load the dataset on ``connection``; returns row counts."""
+    rng = random.Random(config.seed)
+    first_week = config.first_week()
+    last_day = first_week + timedelta(weeks=config.weeks) - timedelta(days=1)
+    this_week = date.today() - timedelta(days=date.today().weekday())
+
+    capacities = {
+        row.assignment_type: row.max_capacity
+        for row in connection.execute(select(Capacity.assignment_type, Capacity.max_capacity))
+    }
+
+    doctors = generate_doctors(rng, config, _next_id(connection, Doctor.__table__))
+    doctors_by_id = {doctor["id"]: doctor for doctor in doctors}
+    active_ids = [doctor["id"] for doctor in doctors if doctor["is_active"]]
+
+    availability_rows = generate_availability(
+        rng, config, active_ids, first_week, last_day, _next_id(connection, DoctorAvailability.__table__)
+    )
+    availability = AvailabilityIndex(SimpleNamespace(**row) for row in availability_rows)
+
+    schedules, assignments, snapshots = [], [], []
+    schedule_id = _next_id(connection, Schedule.__table__)
+    existing_slugs = set(connection.execute(select(PublishedSchedule.slug)).scalars())
+    for week in range(config.weeks):
+        week_start = first_week + timedelta(weeks=week)
+        week_assignments = generate_week_assignments(rng, week_start, schedule_id, active_ids, availability, capacities)
+        published = config.versions > 0 and week_start < this_week
+        schedules.append({
+            "id": schedule_id,
+            "week_start_date": datetime.combine(week_start, datetime.min.time()),
+            "week_end_date": datetime.combine(week_start + timedelta(days=6), datetime.min.time()),
+            "is_published": published,
+            "version": 1 + len(week_assignments),
+        })
+        if published:
+            snapshots += generate_snapshots(rng, config, schedule_id, week_start, week_assignments, doctors_by_id, existing_slugs)
+        assignments += week_assignments
+        schedule_id += 1
+
+    for rows, table in (
+        (assignments, Assignment.__table__),
+        (snapshots, PublishedSchedule.__table__),
+    ):
+        first_id = _next_id(connection, table)
+        for offset, row in enumerate(rows):
+            row["id"] = first_id + offset
+
+    for rows, table in (
+        (doctors, Doctor.__table__),
+        (availability_rows, DoctorAvailability.__table__),
+        (schedules, Schedule.__table__),
+        (assignments, Assignment.__table__),
+        (snapshots, PublishedSchedule.__table__),
+    ):
+        bulk_load(connection, table, rows, config.batch_size)
+
+    return {
+        "doctors": len(doctors),
+        "availability": len(availability_rows),
+        "schedules": len(schedules),
+        "assignments": len(assignments),
+        "published_schedules": len(snapshots),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset for scale testing")
+    parser.add_argument("--years", type=float, default=1.0, help="weeks of schedules to generate, in years")
+    parser.add_argument("--doctors", type=int, default=200)
+    parser.add_argument("--start", type=date.fromisoformat, help="first week (YYYY-MM-DD); defaults to --years ago")
+    parser.add_argument("--versions", type=int, default=3, help="published snapshots per past week")
+    parser.add_argument("--seed", type=int, default=42, help="random seed; the same seed gives the same data")
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per insert batch without COPY")
+    parser.add_argument("--reset", action="store_true", help="drop all tables and the schema revision first")
+    args = parser.parse_args()
+
+    config = GeneratorConfig(
+        years=args.years,
+        doctors=args.doctors,
+        start=args.start,
+        versions=args.versions,
+        seed=args.seed,
+        batch_size=args.batch_size,
+    )
+
+    print("🧪 Generating synthetic dataset...")
+    if args.reset:
+        drop_schema(engine)
+        print("✓ Dropped existing tables")
+    print(f"✓ Schema {migrate(engine)}")
+    with SessionLocal() as db:
+        ensure_default_capacities(db)
+
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        counts = generate(connection, config)
+    elapsed = time.perf_counter() - started
+
+    for name, count in counts.items():
+        print(f"✓ {count} {name.replace('_', ' ')}")
+    print(f"\n🎉 Loaded in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Liveness and readiness probes backed by a cached dependency status.
+
+``/livez`` answers from memory and only proves the event loop is serving.
+``/readyz`` returns the last status gathered by :class:`HealthMonitor`,
+which checks the database and Redis in the background every
+``HEALTH_CHECK_INTERVAL_SECONDS``, so probes never wait on a dependency.
+
+A worker reports not ready when the database check fails, a connection pool
+is nearly exhausted, the event loop is lagging, or the status has gone
+stale. Redis has fallbacks everywhere it is used, so losing it only marks
+the worker degraded.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from fastapi import APIRouter, Response, status
+from sqlalchemy import text
+
+from cache import redis_client
+from config import settings
+from database import async_engine, pool_status
+
+logger = logging.getLogger(__name__)
+
+# How often the loop-lag sampler wakes up, and how many samples it keeps.
+LAG_SAMPLE_SECONDS = 0.25
+LAG_SAMPLES = 20
+
+
+def pool_saturation() -> Dict[str, float]:
+    """Share of each bounded pool's connections that are checked out."""
+    saturation = {}
+    for name, entry in pool_status().items():
+        # max_overflow of -1 means the pool is unbounded
+        if "checked_out" not in entry or entry["max_overflow"] < 0:
+            continue
+        capacity = entry["size"] + entry["max_overflow"]
+        if capacity:
+            saturation[name] = round(entry["checked_out"] / capacity, 3)
+    return saturation
+
+
+class HealthMonitor:
+    """Refreshes dependency status in the background for the probes."""
+
+    def __init__(self, interval: float, timeout: float):
+        self.interval = interval
+        self.timeout = timeout
+        self.status: Optional[Dict[str, Any]] = None
+        self.refreshed_at = 0.0
+        self._lags: Deque[float] = deque(maxlen=LAG_SAMPLES)
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def event_loop_lag(self) -> float:
+        """Worst recent delay between a timer's due time and its callback."""
+        return max(self._lags, default=0.0)
+
+    async def _check(self, name: str, probe) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(probe(), self.timeout)
+        except Exception as exc:
+            logger.warning("Health check for %s failed: %r", name, exc)
+            return {"status": "unavailable", "error": type(exc).__name__}
+        return {"status": "connected", "latency_ms": round((time.perf_counter() - started) * 1000, 3)}
+
+    async def _ping_database(self) -> None:
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    async def _ping_redis(self) -> None:
+        # redis-py is synchronous; keep its socket waits off the event loop
+        await asyncio.get_running_loop().run_in_executor(None, redis_client.ping)
+
+    async def refresh(self) -> Dict[str, Any]:
+        """Check every dependency now and store the result."""
+        database, redis = await asyncio.gather(
+            self._check("database", self._ping_database),
+            self._check("redis", self._ping_redis),
+        )
+        self.status = {
+            "checked_at": datetime.utcnow().isoformat(),
+            "services": {"database": database, "redis": redis},
+            "pool_saturation": pool_saturation(),
+        }
+        self.refreshed_at = time.monotonic()
+        return self.status
+
+    def readiness(self) -> Dict[str, Any]:
+        """The cached status plus a verdict; never touches a dependency."""
+        if self.status is None:
+            return {"status": "starting", "reasons": ["no health check has completed yet"]}
+
+        reasons = []
+        age = time.monotonic() - self.refreshed_at
+        if age > 3 * self.interval:
+            reasons.append(f"health status is {age:.0f}s old")
+        if self.status["services"]["database"]["status"] != "connected":
+            reasons.append("database unavailable")
+        for name, share in self.status["pool_saturation"].items():
+            if share >= settings.READY_MAX_POOL_SATURATION:
+                reasons.append(f"{name} pool {share:.0%} checked out")
+        lag = self.event_loop_lag
+        if lag >= settings.READY_MAX_EVENT_LOOP_LAG_SECONDS:
+            reasons.append(f"event loop lagging {lag * 1000:.0f} ms")
+
+        if reasons:
+            verdict = "not_ready"
+        elif self.status["services"]["redis"]["status"] != "connected":
+            verdict = "degraded"
+        else:
+            verdict = "ready"
+        return {
+            **self.status,
+            "status": verdict,
+            "reasons": reasons,
+            "event_loop_lag_ms": round(lag * 1000, 3),
+        }
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Health refresh failed")
+
+    async def _sample_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(LAG_SAMPLE_SECONDS)
+            self._lags.append(max(0.0, loop.time() - started - LAG_SAMPLE_SECONDS))
+
+    async def start(self) -> None:
+        """Check once, then keep refreshing in the background."""
+        if self._tasks:
+            return
+        # The first check also makes the async engine's first connection
+        # before traffic arrives; SQLAlchemy guards that with a thread lock
+        # that two coroutines on one loop can deadlock on.
+        await self.refresh()
+        self._tasks = [asyncio.create_task(self._refresh_loop()), asyncio.create_task(self._sample_lag())]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+health_monitor = HealthMonitor(
+    interval=settings.HEALTH_CHECK_INTERVAL_SECONDS,
+    timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS,
+)
+
+router = APIRouter()
+
+
+@router.get("/livez")
+async def liveness():
+    """The process is up and its event loop is serving requests"""
+    return {"status": "alive"}
+
+
+@router.get("/readyz")
+async def readiness(response: Response):
+    """Whether this worker should receive traffic, from the cached status"""
+    report = health_monitor.readiness()
+    if report["status"] not in ("ready", "degraded"):
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return report
+
+
+@router.get("/health")
+async def health_check(response: Response):
+    """Health check endpoint"""
+    report = health_monitor.readiness()
+    services = report.get("services", {})
+    healthy = report["status"] in ("ready", "degraded")
+    if not healthy:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {
+        "status": "healthy" if healthy else "unhealthy",
+        "timestamp": datetime.utcnow().isoformat(),
+        "services": {name: service["status"] for name, service in services.items()},
+    }
@@ -1,44 +1,54 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer
 from sqlalchemy.orm import Session
 from contextlib import asynccontextmanager
-import redis
 from datetime import datetime
 
-from database import engine, get_db, SessionLocal
-from models import Base
-from auth import get_current_user, User
+from cache import redis_client
+from database import async_engine, async_read_engine, engine, get_db, pool_status
+from auth import get_current_admin_user, get_current_user, User, password_hasher
 from routers import auth, users, doctors, schedules, published
+from health import health_monitor, router as health_router
 from config import settings
-from bootstrap import ensure_default_admin, ensure_default_capacities
+from read_routing import ReadYourWritesMiddleware
+from metrics import install_metrics
+from response_compression import install_compression
+from bootstrap import check_schema_revision
+from utils.pagination import NEXT_CURSOR_HEADER
 import logging
 
-# Initialize Redis
-redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
-
 logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
-    Base.metadata.create_all(bind=engine)
-    with SessionLocal() as db:
-        ensure_default_capacities(db)
-        created_admin = ensure_default_admin(db)
-        if created_admin:
-            logger.info(
-                "Default admin '%s' provisioned during startup", created_admin.username
-            )
+    # Startup: migrations and seeding run once per deploy in bootstrap.py,
+    # so a worker only confirms the schema it is about to serve.
+    if settings.DB_SCHEMA_CHECK != "off":
+        try:
+            current = check_schema_revision(engine)
+            logger.info("Database schema at revision %s", current)
+        except RuntimeError:
+            if settings.DB_SCHEMA_CHECK != "warn":
+                raise
+            logger.warning("Database schema check failed", exc_info=True)
+    await health_monitor.start()
     yield
     # Shutdown
+    await health_monitor.stop()
+    password_hasher.shutdown()
+    await async_engine.dispose()
+    if async_read_engine is not async_engine:
+        await async_read_engine.dispose()
     redis_client.close()
 
 app = FastAPI(
     title="Duty Scheduler API",
     description="API for managing radiology duty rosters",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
@@ -48,7 +58,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
+app.add_middleware(ReadYourWritesMiddleware)
+# Also counts each request's SQL for the query budget
+if settings.METRICS_ENABLED or settings.QUERY_BUDGET_PER_REQUEST or settings.QUERY_DUPLICATE_THRESHOLD:
+    install_metrics(app, serve=settings.METRICS_ENABLED)
+# Outermost, so other middleware see the uncompressed body
+if settings.COMPRESSION_ENABLED:
+    install_compression(app)
 
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
@@ -56,30 +74,16 @@ app.include_router(users.router, prefix="/api/users", tags=["users"])
 app.include_router(doctors.router, prefix="/api/doctors", tags=["doctors"])
 app.include_router(schedules.router, prefix="/api/schedules", tags=["schedules"])
 app.include_router(published.router, prefix="/api/published", tags=["published"])
+app.include_router(health_router, tags=["health"])
 
-@app.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    try:
-        from sqlalchemy import text
-        with SessionLocal() as db:
-            db.execute(text("SELECT 1"))
-
-        redis_client.ping()
-
-        return {
-            "status": "healthy",
-            "timestamp": datetime.utcnow().isoformat(),
-            "services": {
-                "database": "connected",
-                "redis": "connected"
-            }
-        }
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=f"Service unhealthy: {str(e)}"
-        )
+@app.get("/health/pools")
+async def pool_health(current_user: User = Depends(get_current_admin_user)):
+    """Connection pool occupancy and checkout waits, for sizing the pools"""
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "database": pool_status(),
+        "password_hasher": password_hasher.stats(),
+    }
 
 @app.get("/")
 async def root():
@@ -0,0 +1,254 @@
+"""Prometheus metrics for requests, SQL, Redis, connection pools and caches.
+
+Hot-path work is a few ``perf_counter`` calls and histogram observations per
+request and per query. Pool occupancy, cache hit counts and hashing-pool
+stats are already counted by their owners and are only read at scrape time.
+
+The same per-request SQL count enforces the query budget: a request that
+runs more than ``QUERY_BUDGET_PER_REQUEST`` statements, or runs the same
+statement ``QUERY_DUPLICATE_THRESHOLD`` times (the signature of a lookup
+inside a loop), is logged as a warning with a summary of the stack that
+issued the offending statement. Either limit is off when set to 0.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+import traceback
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from fastapi import FastAPI, Response
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from auth import password_hasher, principal_cache
+from cache import cache_stats, redis_client
+from config import settings
+from database import app_engines, pool_status
+
+logger = logging.getLogger(__name__)
+
+registry = CollectorRegistry()
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template",
+    ["method", "route", "status"],
+    registry=registry,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being served",
+    ["method"],
+    registry=registry,
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "SQL statements executed while serving a request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250),
+    registry=registry,
+)
+DB_SECONDS_PER_REQUEST = Histogram(
+    "db_query_seconds_per_request",
+    "Time spent in SQL statements while serving a request",
+    ["route"],
+    registry=registry,
+)
+REDIS_COMMAND_LATENCY = Histogram(
+    "redis_command_duration_seconds",
+    "Redis round trips by command; pipelines are timed as one",
+    ["command"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0),
+    registry=registry,
+)
+
+UNMATCHED_ROUTE = "unmatched"
+
+# Frames kept in a stack summary, innermost last.
+STACK_SUMMARY_DEPTH = 8
+
+
+def stack_summary() -> str:
+    """The caller's stack with library frames left out."""
+    frames = [
+        frame for frame in traceback.extract_stack()[:-1]
+        if "site-packages" not in frame.filename and frame.filename != __file__
+    ]
+    return "".join(traceback.format_list(frames[-STACK_SUMMARY_DEPTH:])).rstrip()
+
+
+@dataclass
+class RequestStats:
+    """SQL run while serving one request, checked against the query budget."""
+
+    budget: int = 0
+    duplicate_threshold: int = 0
+    queries: int = 0
+    query_seconds: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+    over_budget_stack: Optional[str] = None
+    duplicate_stacks: Dict[str, str] = field(default_factory=dict)
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.queries += 1
+        self.query_seconds += seconds
+        self.statements[statement] += 1
+        if self.budget and self.queries == self.budget + 1:
+            self.over_budget_stack = stack_summary()
+        if self.duplicate_threshold and self.statements[statement] == self.duplicate_threshold:
+            self.duplicate_stacks[statement] = stack_summary()
+
+    def report(self, method: str, path: str) -> None:
+        """Log the request if it went over budget or repeated a statement."""
+        if self.over_budget_stack is not None:
+            logger.warning(
+                "%s %s ran %d SQL statements, over the budget of %d; first statement over budget from:\n%s",
+                method, path, self.queries, self.budget, self.over_budget_stack,
+            )
+        for statement, stack in self.duplicate_stacks.items():
+            logger.warning(
+                "%s %s ran the same SQL statement %d times (possible N+1): %s\nfrom:\n%s",
+                method, path, self.statements[statement], " ".join(statement.split()), stack,
+            )
+
+
+# Shared by reference with threadpool handlers and async-engine greenlets,
+# which run in copies of the request's context.
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - context._metrics_started)
+
+
+def instrument_engine(target: Engine) -> None:
+    if not event.contains(target, "after_cursor_execute", _after_cursor_execute):
+        event.listen(target, "before_cursor_execute", _before_cursor_execute)
+        event.listen(target, "after_cursor_execute", _after_cursor_execute)
+
+
+def observe_redis_command(command: str, seconds: float) -> None:
+    REDIS_COMMAND_LATENCY.labels(command).observe(seconds)
+
+
+class MetricsMiddleware:
+    """Times each HTTP request and the SQL it runs, labelled by route template.
+
+    Requests over the query budget are logged once the response is sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        stats = RequestStats(settings.QUERY_BUDGET_PER_REQUEST, settings.QUERY_DUPLICATE_THRESHOLD)
+        token = _request_stats.set(stats)
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight = REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_flight.dec()
+            _request_stats.reset(token)
+            route = scope.get("route")
+            # The template, not the raw path, keeps label cardinality bounded.
+            template = getattr(route, "path", UNMATCHED_ROUTE)
+            REQUEST_LATENCY.labels(method, template, str(status_code)).observe(elapsed)
+            DB_QUERIES_PER_REQUEST.labels(template).observe(stats.queries)
+            DB_SECONDS_PER_REQUEST.labels(template).observe(stats.query_seconds)
+            stats.report(method, scope["path"])
+
+
+class _StateCollector:
+    """Reads counters the app already keeps, when Prometheus scrapes."""
+
+    def collect(self):
+        checked_out = GaugeMetricFamily("db_pool_checked_out", "Connections in use", labels=["pool"])
+        idle = GaugeMetricFamily("db_pool_idle", "Idle pooled connections", labels=["pool"])
+        checkouts = CounterMetricFamily("db_pool_checkouts", "Connection checkouts", labels=["pool"])
+        timeouts = CounterMetricFamily("db_pool_checkout_timeouts", "Checkouts that timed out", labels=["pool"])
+        wait = CounterMetricFamily("db_pool_checkout_wait_seconds", "Time spent waiting for a connection", labels=["pool"])
+        wait_max = GaugeMetricFamily("db_pool_checkout_wait_max_seconds", "Longest checkout wait", labels=["pool"])
+        for name, entry in pool_status().items():
+            if "checked_out" in entry:
+                checked_out.add_metric([name], entry["checked_out"])
+                idle.add_metric([name], entry["idle"])
+            if "checkouts" in entry:
+                checkouts.add_metric([name], entry["checkouts"])
+                timeouts.add_metric([name], entry["timeouts"])
+                wait.add_metric([name], entry["wait_seconds_total"])
+                wait_max.add_metric([name], entry["wait_seconds_max"])
+        yield from (checked_out, idle, checkouts, timeouts, wait, wait_max)
+
+        lookups = CounterMetricFamily("cache_lookups", "Cache lookups by cache and result", labels=["cache", "result"])
+        lookups.add_metric(["principal", "hit"], principal_cache.hits)
+        lookups.add_metric(["principal", "miss"], principal_cache.misses)
+        for name, counts in list(cache_stats.items()):
+            lookups.add_metric([name, "hit"], counts["hits"])
+            lookups.add_metric([name, "miss"], counts["misses"])
+        yield lookups
+
+        hasher = password_hasher.stats()
+        yield GaugeMetricFamily("password_hash_pending", "Hashes queued or running", value=hasher["pending"])
+        yield CounterMetricFamily("password_hash_rejected", "Hashes rejected by a full queue", value=hasher["rejected"])
+        yield CounterMetricFamily("password_hash_wait_seconds", "Time hashes spent queued", value=hasher["wait_seconds_total"])
+
+
+_installed = False
+
+
+def install_metrics(app: FastAPI, serve: bool = True) -> None:
+    """Instrument the engines and count each request's SQL.
+
+    With ``serve`` the Redis client is timed too and ``GET /metrics`` is
+    served; without it only the query budget is enforced.
+    """
+    global _installed
+    if _installed:
+        return
+    _installed = True
+
+    for instrumented in app_engines():
+        instrument_engine(instrumented)
+    app.add_middleware(MetricsMiddleware)
+    if not serve:
+        return
+
+    redis_client.on_command = observe_redis_command
+    registry.register(_StateCollector())
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics_endpoint():
+        return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, ForeignKey, Enum, LargeBinary, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
+from utils.compression import compress_html, decompress_html
 import enum
 from datetime import date
 
+# Alembic revision these models correspond to: the head of alembic/versions.
+# The API refuses to start against another revision; bump it with each migration.
+SCHEMA_REVISION = "a4f6d8b2e190"
+
 class UserRole(str, enum.Enum):
     ADMIN = "admin"
     EDITOR = "editor"
@@ -27,11 +32,17 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Serves the case-insensitive lookup in utils.auth.get_user_by_username.
+    # Not unique: existing rows may differ only by case.
+    __table_args__ = (
+        Index("ix_users_username_lower", func.lower(username)),
+    )
+
 class Doctor(Base):
     __tablename__ = "doctors"
     
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
     email = Column(String, nullable=True)  # Made optional
     phone = Column(String, nullable=True)  # Made optional
     position = Column(String, nullable=True)  # Added position field
@@ -40,14 +51,39 @@ class Doctor(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+class AvailabilityKind(str, enum.Enum):
+    LEAVE = "LEAVE"
+    CONFERENCE = "CONFERENCE"
+    PART_TIME = "PART_TIME"
+
+class DoctorAvailability(Base):
+    __tablename__ = "doctor_availability"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    doctor_id = Column(Integer, ForeignKey("doctors.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(Enum(AvailabilityKind), nullable=False)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)  # Inclusive
+    weekday_mask = Column(Integer, nullable=True)  # Bit 0 is Monday; NULL means every day
+    note = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    doctor = relationship("Doctor")
+
+    __table_args__ = (
+        Index("ix_doctor_availability_doctor_start", doctor_id, start_date),
+    )
+
 class Schedule(Base):
     __tablename__ = "schedules"
     
     id = Column(Integer, primary_key=True, index=True)
-    week_start_date = Column(DateTime, nullable=False)  # Monday of the week
+    week_start_date = Column(DateTime, nullable=False, index=True)  # Monday of the week
     week_end_date = Column(DateTime, nullable=False)    # Sunday of the week
     created_by = Column(Integer, ForeignKey("users.id"))
     is_published = Column(Boolean, default=False, nullable=False)
+    version = Column(Integer, default=1, server_default="1", nullable=False)  # Bumped on every assignment change
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -68,7 +104,7 @@ class Assignment(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     schedule_id = Column(Integer, ForeignKey("schedules.id"), nullable=False)
-    doctor_id = Column(Integer, ForeignKey("doctors.id"), nullable=False)
+    doctor_id = Column(Integer, ForeignKey("doctors.id"), nullable=False, index=True)
     assignment_date = Column(DateTime, nullable=False)  # Specific date within the week
     assignment_type = Column(Enum(AssignmentType), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -82,15 +118,24 @@ class PublishedSchedule(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     slug = Column(String, unique=True, index=True, nullable=False)
-    schedule_id = Column(Integer, ForeignKey("schedules.id"), nullable=False)
+    schedule_id = Column(Integer, ForeignKey("schedules.id"), nullable=False, index=True)
     published_by = Column(Integer, ForeignKey("users.id"))
     published_at = Column(DateTime(timezone=True), server_default=func.now())
-    html_content = Column(Text, nullable=False)  # Immutable HTML snapshot
+    html_gzip = Column(LargeBinary, nullable=False)  # Immutable HTML snapshot, gzip-compressed
     
     # Relationships
     schedule = relationship("Schedule")
     publisher = relationship("User")
 
+    @property
+    def html_content(self) -> str:
+        """Decompressed HTML snapshot."""
+        return decompress_html(self.html_gzip)
+
+    @html_content.setter
+    def html_content(self, html: str) -> None:
+        self.html_gzip = compress_html(html)
+
 class Capacity(Base):
     __tablename__ = "capacities"
     
@@ -0,0 +1,50 @@
+"""Count SQL statements over a block of code.
+
+Requests are held to ``QUERY_BUDGET_PER_REQUEST`` by the metrics middleware
+(see :mod:`metrics`). :class:`QueryRecorder` counts statements over a block
+instead of a request; the test suite uses it to hold endpoints to a budget.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import Iterable, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from database import app_engines
+
+
+class QueryRecorder:
+    """Records every statement on the app's engines while the block runs.
+
+    Unlike the middleware this is not request-scoped, so it also sees
+    statements issued from other threads, such as a ``TestClient`` portal.
+    """
+
+    def __init__(self, engines: Optional[Iterable[Engine]] = None):
+        self.engines = list(engines) if engines is not None else app_engines()
+        self.statements: List[str] = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self) -> "QueryRecorder":
+        for target in self.engines:
+            event.listen(target, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        for target in self.engines:
+            event.remove(target, "before_cursor_execute", self._record)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def most_repeated(self) -> tuple:
+        """``(statement, times)`` for the most repeated statement, or ``("", 0)``."""
+        if not self.statements:
+            return "", 0
+        return Counter(self.statements).most_common(1)[0]
@@ -0,0 +1,76 @@
+"""Redis-backed sliding-window rate limiting."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict
+
+from redis.exceptions import RedisError
+
+from cache import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    retry_after: int = 0
+
+
+class SlidingWindowLimiter:
+    """Sliding-window counter limiter.
+
+    Each subject keeps one counter per fixed window. The rate is estimated as
+    the current window's count plus the previous window's count weighted by how
+    much of it still overlaps the sliding window. That needs O(1) memory per
+    subject and a single pipelined round trip for any number of subjects.
+
+    When Redis is unavailable the limiter fails open.
+    """
+
+    def __init__(self, name: str, window_seconds: int):
+        self.name = name
+        self.window_seconds = window_seconds
+
+    def _key(self, subject: str, window: int) -> str:
+        return f"ratelimit:{self.name}:{subject}:{window}"
+
+    @staticmethod
+    def subject(kind: str, value: str) -> str:
+        """Build a compact, key-safe subject from arbitrary client input."""
+        digest = hashlib.sha256(value.encode("utf-8")).hexdigest()[:32]
+        return f"{kind}:{digest}"
+
+    def hit(self, limits: Dict[str, int]) -> RateLimitDecision:
+        """Record one attempt for every subject and check it against its limit."""
+        now = time.time()
+        window = int(now // self.window_seconds)
+        elapsed = now - window * self.window_seconds
+        previous_weight = 1 - elapsed / self.window_seconds
+
+        subjects = list(limits)
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for subject in subjects:
+                current_key = self._key(subject, window)
+                pipe.incr(current_key)
+                pipe.expire(current_key, self.window_seconds * 2)
+                pipe.get(self._key(subject, window - 1))
+            results = pipe.execute()
+        except RedisError:
+            logger.warning("Rate limiter '%s' unavailable; allowing request", self.name)
+            return RateLimitDecision(allowed=True)
+
+        for index, subject in enumerate(subjects):
+            current_count, _, previous_count = results[index * 3:index * 3 + 3]
+            estimate = int(previous_count or 0) * previous_weight + int(current_count)
+            if estimate > limits[subject]:
+                retry_after = max(1, math.ceil(self.window_seconds - elapsed))
+                return RateLimitDecision(allowed=False, retry_after=retry_after)
+
+        return RateLimitDecision(allowed=True)
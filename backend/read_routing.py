@@ -0,0 +1,129 @@
+"""Send read-only requests to the replica, with read-your-writes pinning.
+
+GET handlers that depend on :func:`get_read_db` or :func:`get_async_read_db`
+use the replica from ``DATABASE_READ_URL``. Replication lags, so a user who
+just wrote something would not see it there. After any successful write,
+:class:`ReadYourWritesMiddleware` pins the user to the primary for
+``READ_YOUR_WRITES_SECONDS``. The pins live in Redis so every worker sees
+them. When Redis cannot answer, reads go to the primary.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import AsyncIterator, Iterator, Optional
+
+from fastapi import Depends, Request
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from auth import Principal, get_optional_user, verify_token
+from cache import redis_client
+from config import settings
+from database import (
+    AsyncReadSessionLocal,
+    AsyncSessionLocal,
+    ReadSessionLocal,
+    SessionLocal,
+    read_replica_configured,
+)
+
+logger = logging.getLogger(__name__)
+
+PIN_KEY_PREFIX = "read_pin:"
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def _bearer_subject(authorization: Optional[str]) -> Optional[str]:
+    """Username in a valid bearer token, or ``None`` for anonymous requests."""
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = verify_token(token)
+    return payload.get("sub") if payload else None
+
+
+def pin_to_primary(subject: str) -> None:
+    """Route the user's reads to the primary until replication catches up."""
+    try:
+        redis_client.set(f"{PIN_KEY_PREFIX}{subject}", 1, ex=settings.READ_YOUR_WRITES_SECONDS)
+    except RedisError:
+        logger.warning("Could not pin '%s' to the primary", subject, exc_info=True)
+
+
+def is_pinned(subject: str) -> bool:
+    try:
+        return bool(redis_client.exists(f"{PIN_KEY_PREFIX}{subject}"))
+    except RedisError:
+        return True
+
+
+def use_replica(request: Request, principal: Optional[Principal]) -> bool:
+    """Whether this request's reads can be served by the replica.
+
+    Looks the pin up in Redis, so async callers run it in the threadpool.
+    """
+    if not read_replica_configured or request.method not in SAFE_METHODS:
+        return False
+    return principal is None or not is_pinned(principal.username)
+
+
+def get_read_db(
+    request: Request, principal: Optional[Principal] = Depends(get_optional_user)
+) -> Iterator[Session]:
+    """``get_db`` for read-only handlers; may use the replica."""
+    db = ReadSessionLocal() if use_replica(request, principal) else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(
+    request: Request, principal: Optional[Principal] = Depends(get_optional_user)
+) -> AsyncIterator[AsyncSession]:
+    """``get_async_db`` for read-only handlers; may use the replica."""
+    replica = read_replica_configured and await run_in_threadpool(use_replica, request, principal)
+    session_factory = AsyncReadSessionLocal if replica else AsyncSessionLocal
+    async with session_factory() as db:
+        yield db
+
+
+class ReadYourWritesMiddleware:
+    """Pins the author of every successful write to the primary.
+
+    The pin is stored before the response starts, so the client cannot issue
+    its next read before the pin exists.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            not read_replica_configured
+            or scope["type"] != "http"
+            or scope["method"] in SAFE_METHODS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_pinning(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                authorization = dict(scope["headers"]).get(b"authorization")
+                if authorization:
+                    # Token decode and Redis write both block; keep them off the loop
+                    await run_in_threadpool(_pin_author, authorization.decode("latin-1"))
+            await send(message)
+
+        await self.app(scope, receive, send_pinning)
+
+
+def _pin_author(authorization: str) -> None:
+    subject = _bearer_subject(authorization)
+    if subject is not None:
+        pin_to_primary(subject)
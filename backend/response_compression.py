@@ -0,0 +1,116 @@
+"""Gzip API responses that are worth compressing.
+
+Only bodies of at least ``COMPRESSION_MINIMUM_SIZE`` bytes whose media type
+is in ``COMPRESSION_CONTENT_TYPES`` are compressed; small bodies gain little
+and binary formats barely shrink. A response that already carries a
+``Content-Encoding`` is passed through untouched, which is how handlers
+serve bytes compressed once and stored, such as published snapshots and
+the cached doctor week, without recompressing them per request.
+"""
+
+from __future__ import annotations
+
+import zlib
+from typing import Iterable
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from config import settings
+from utils.compression import accepts_gzip
+
+# Bodies that are never sent with a payload
+_BODYLESS_STATUSES = frozenset({204, 304})
+
+
+def _media_type(content_type: str | None) -> str:
+    return (content_type or "").partition(";")[0].strip().lower()
+
+
+class CompressionMiddleware:
+    """Gzip eligible responses for clients that accept it.
+
+    Eligible responses get ``Vary: Accept-Encoding`` whether or not this
+    client accepts gzip, so shared caches keep the two variants apart.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, level: int = 5, content_types: Iterable[str] = ()):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+        self.content_types = frozenset(_media_type(content_type) for content_type in content_types)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        gzip_ok = accepts_gzip(Headers(scope=scope).get("accept-encoding"))
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, compressor, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if (
+                    message["status"] in _BODYLESS_STATUSES
+                    or "content-encoding" in headers
+                    or _media_type(headers.get("content-type")) not in self.content_types
+                ):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Held back until the first body chunk shows whether it is worth compressing
+                    start = message
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                if len(body) < self.minimum_size and not more_body:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                headers = MutableHeaders(raw=start["headers"])
+                headers.add_vary_header("Accept-Encoding")
+                if not gzip_ok:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = zlib.compressobj(self.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+                headers["Content-Encoding"] = "gzip"
+                if more_body:
+                    del headers["Content-Length"]
+                    await send(start)
+                else:
+                    compressed = compressor.compress(body) + compressor.flush()
+                    headers["Content-Length"] = str(len(compressed))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+
+            chunk = compressor.compress(body)
+            if more_body:
+                chunk += compressor.flush(zlib.Z_SYNC_FLUSH)
+            else:
+                chunk += compressor.flush()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+def install_compression(app) -> None:
+    """Add :class:`CompressionMiddleware` configured from settings."""
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        level=settings.COMPRESSION_LEVEL,
+        content_types=settings.COMPRESSION_CONTENT_TYPES.split(","),
+    )
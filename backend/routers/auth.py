@@ -1,16 +1,31 @@
-from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime, timedelta
+from typing import List, Optional
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import func
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from database import get_db
 from models import User, UserRole
-from auth import verify_password, create_access_token, get_current_user, get_password_hash
+from redis.exceptions import RedisError
+from auth import (
+    verify_password_async,
+    create_access_token,
+    get_current_user,
+    get_current_session_id,
+    get_password_hash_async,
+)
 from config import settings
 from pydantic import BaseModel
-from utils.auth import get_user_by_username, normalize_username
+from rate_limit import SlidingWindowLimiter
+from sessions import LoginSession, session_store
+from utils.auth import get_user_by_username, normalize_username, release_connection
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+login_rate_limiter = SlidingWindowLimiter("login", settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS)
 
 
 _DEFAULT_ADMIN_USERNAME = normalize_username(settings.DEFAULT_ADMIN_USERNAME)
@@ -29,6 +44,7 @@ def _sync_default_admin_if_applicable(db: Session, normalized_username: str) ->
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
 
 class UserResponse(BaseModel):
     id: int
@@ -48,9 +64,94 @@ class LoginRequest(BaseModel):
     username: str
     password: str
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class SessionResponse(BaseModel):
+    id: str
+    created_at: datetime
+    last_used_at: datetime
+    user_agent: str
+    ip_address: str
+    current: bool = False
+
+    @classmethod
+    def from_session(cls, session: LoginSession, current_session_id: Optional[str] = None):
+        return cls(
+            id=session.id,
+            created_at=datetime.utcfromtimestamp(session.created_at),
+            last_used_at=datetime.utcfromtimestamp(session.last_used_at),
+            user_agent=session.user_agent,
+            ip_address=session.ip_address,
+            current=session.id == current_session_id,
+        )
+
+
+def _enforce_login_rate_limit(request: Request, normalized_username: str) -> None:
+    """Reject login floods before any database lookup or password hashing.
+
+    Attempts are counted per client IP and per case-folded username in a
+    single Redis round trip. It blocks on Redis, so async handlers run it in
+    the threadpool.
+    """
+    if not settings.LOGIN_RATE_LIMIT_ENABLED:
+        return
+
+    client_ip = request.client.host if request.client else "unknown"
+    decision = login_rate_limiter.hit({
+        SlidingWindowLimiter.subject("ip", client_ip): settings.LOGIN_RATE_LIMIT_PER_IP,
+        SlidingWindowLimiter.subject("user", normalized_username.lower()): settings.LOGIN_RATE_LIMIT_PER_USERNAME,
+    })
+    if not decision.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, please try again later",
+            headers={"Retry-After": str(decision.retry_after)},
+        )
+
+
+def _session_store_unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Session store unavailable"
+    )
+
+
+def _access_token_for(username: str, session_id: Optional[str]) -> str:
+    claims = {"sub": username}
+    if session_id:
+        claims["sid"] = session_id
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    return create_access_token(data=claims, expires_delta=access_token_expires)
+
+
+def _issue_tokens(user: User, request: Request) -> dict:
+    """Start a refresh session and return the token pair for a verified login.
+
+    Login still succeeds without Redis; the client just gets no refresh token.
+    Blocks on Redis, like :func:`_enforce_login_rate_limit`.
+    """
+    try:
+        issued = session_store.create(
+            user_id=user.id,
+            username=user.username,
+            user_agent=request.headers.get("user-agent", ""),
+            ip_address=request.client.host if request.client else "",
+        )
+    except RedisError:
+        logger.warning("Session store unavailable; issuing access token without refresh token", exc_info=True)
+        return {"access_token": _access_token_for(user.username, None), "token_type": "bearer"}
+
+    return {
+        "access_token": _access_token_for(user.username, issued.session.id),
+        "token_type": "bearer",
+        "refresh_token": issued.refresh_token,
+    }
+
 
 @router.post("/login", response_model=Token)
 async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
@@ -61,22 +162,21 @@ async def login(
             detail="Username is required",
         )
 
+    await run_in_threadpool(_enforce_login_rate_limit, request, normalized_username)
     user = get_user_by_username(db, normalized_username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    release_connection(db, user)
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
-    )
-    return {"access_token": access_token, "token_type": "bearer"}
+    return await run_in_threadpool(_issue_tokens, user, request)
 
 @router.post("/login-json", response_model=Token)
 async def login_json(
+    request: Request,
     login_data: LoginRequest,
     db: Session = Depends(get_db)
 ):
@@ -87,45 +187,157 @@ async def login_json(
             detail="Username is required",
         )
 
+    await run_in_threadpool(_enforce_login_rate_limit, request, normalized_username)
     user = get_user_by_username(db, normalized_username)
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    release_connection(db, user)
+    if not user or not await verify_password_async(login_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+    return await run_in_threadpool(_issue_tokens, user, request)
+
+@router.post("/refresh", response_model=Token)
+def refresh(refresh_data: RefreshRequest, db: Session = Depends(get_db)):
+    """Exchange a refresh token for a new access token and a rotated refresh token"""
+    invalid_token = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
     )
-    return {"access_token": access_token, "token_type": "bearer"}
+    try:
+        issued = session_store.rotate(refresh_data.refresh_token)
+    except RedisError:
+        raise _session_store_unavailable()
+
+    if issued is None:
+        raise invalid_token
+
+    # The session alone is not enough: the account may have been deleted or
+    # deactivated without its sessions being revoked
+    user = get_user_by_username(db, issued.session.username)
+    release_connection(db, user)
+    if user is None or user.id != issued.session.user_id or not user.is_active:
+        try:
+            session_store.revoke(issued.session.user_id, issued.session.id)
+        except RedisError:
+            logger.warning("Could not revoke session %s", issued.session.id, exc_info=True)
+        raise invalid_token
+
+    return {
+        "access_token": _access_token_for(issued.session.username, issued.session.id),
+        "token_type": "bearer",
+        "refresh_token": issued.refresh_token,
+    }
+
+@router.post("/logout")
+def logout(refresh_data: RefreshRequest):
+    """End the session a refresh token belongs to"""
+    try:
+        session_store.revoke_token(refresh_data.refresh_token)
+    except RedisError:
+        raise _session_store_unavailable()
+    return {"message": "Logged out successfully"}
+
+@router.get("/sessions", response_model=List[SessionResponse])
+def list_sessions(
+    current_user = Depends(get_current_user),
+    current_session_id: Optional[str] = Depends(get_current_session_id)
+):
+    """List the current user's active sessions"""
+    try:
+        sessions = session_store.list_for_user(current_user.id)
+    except RedisError:
+        raise _session_store_unavailable()
+    return [SessionResponse.from_session(session, current_session_id) for session in sessions]
+
+@router.delete("/sessions")
+def revoke_sessions(
+    include_current: bool = False,
+    current_user = Depends(get_current_user),
+    current_session_id: Optional[str] = Depends(get_current_session_id)
+):
+    """Sign out the current user's other sessions, or all of them"""
+    keep_session_id = None if include_current else current_session_id
+    try:
+        revoked = session_store.revoke_all(current_user.id, keep_session_id)
+    except RedisError:
+        raise _session_store_unavailable()
+    return {"message": f"Revoked {revoked} session(s)", "revoked_count": revoked}
+
+@router.delete("/sessions/{session_id}")
+def revoke_session(
+    session_id: str,
+    current_user = Depends(get_current_user)
+):
+    """Sign out one of the current user's sessions"""
+    try:
+        revoked = session_store.revoke(current_user.id, session_id)
+    except RedisError:
+        raise _session_store_unavailable()
+    if not revoked:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+    return {"message": "Session revoked"}
 
 @router.get("/me", response_model=UserResponse)
 async def read_users_me(current_user: User = Depends(get_current_user)):
     return current_user
 
-@router.post("/change-password")
-async def change_password(
+async def change_user_password(
+    db: Session,
+    current_user: User,
     password_data: ChangePasswordRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """Change user password"""
-    
-    # Verify current password
-    if not verify_password(password_data.current_password, current_user.hashed_password):
+    current_session_id: Optional[str]
+) -> dict:
+    """Check the current password, store the new one and sign out other devices.
+
+    Other devices must sign in again with the new password. Their sessions
+    are revoked before the commit, so the password is never changed while
+    they live on; if the session store is down nothing is changed.
+    """
+    user = db.query(User).filter(User.id == current_user.id).first()
+    release_connection(db, user)
+    if user is None:
+        # Deleted while its principal was still cached
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    if not await verify_password_async(password_data.current_password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
         )
-    
-    # Update password
-    current_user.hashed_password = get_password_hash(password_data.new_password)
+
+    hashed_password = await get_password_hash_async(password_data.new_password)
+    db.add(user)
+    user.hashed_password = hashed_password
+    try:
+        await run_in_threadpool(session_store.revoke_all, user.id, keep_session_id=current_session_id)
+    except RedisError:
+        db.rollback()
+        raise _session_store_unavailable()
     db.commit()
-    
+
     return {"message": "Password changed successfully"}
 
+@router.post("/change-password")
+async def change_password(
+    password_data: ChangePasswordRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    current_session_id: Optional[str] = Depends(get_current_session_id)
+):
+    """Change user password"""
+    return await change_user_password(db, current_user, password_data, current_session_id)
+
 def require_admin(current_user = Depends(get_current_user)):
     """Require admin role"""
     if current_user.role != UserRole.ADMIN:
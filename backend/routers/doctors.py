@@ -1,14 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import Select, and_, exists, func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query as OrmQuery, Session
 from sqlalchemy.exc import IntegrityError
-from database import get_db
-from models import Doctor, Assignment, DoctorStatus
+from database import get_async_db, get_db
+from read_routing import get_async_read_db, get_read_db
+from models import Doctor, DoctorAvailability, Assignment, AssignmentType, AvailabilityKind, DoctorStatus, Schedule
 from auth import get_current_user
-from pydantic import BaseModel, EmailStr, field_validator
-from typing import Optional
+from cache import bump_generation, get_cached, get_cached_bytes, get_generation, set_cached
+from config import settings
+from pydantic import BaseModel, EmailStr, ValidationError, field_validator, model_validator
+from typing import Literal, Optional, Sequence
+from datetime import date, datetime, timedelta
+from utils.availability import AvailabilityIndex, mask_to_weekdays, weekdays_to_mask
+from utils.compression import accepts_gzip, compress_body
+from utils.bulk_import import iter_upload_records
+from utils.pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor, set_next_cursor
+from utils.responses import as_date, trusted_json
 
 router = APIRouter()
 
+# Assignments listed in the error when deleting a doctor who still has some
+DELETE_DETAIL_LIMIT = 10
+
+# Invalidation counter for cached payloads built from doctor rows
+DOCTOR_GENERATION = "doctors"
+
+# Rows validated and written per round trip by the bulk import
+IMPORT_BATCH_SIZE = 500
+IMPORT_FIELDS = ("name", "email", "phone", "position", "status")
+
 class DoctorCreate(BaseModel):
     name: str
     email: Optional[str] = None
@@ -90,14 +112,361 @@ class DoctorResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class DoctorSidebarEntry(BaseModel):
+    id: int
+    name: str
+    status: DoctorStatus
+    available: Optional[bool] = None
+
+    class Config:
+        from_attributes = True
+
+class AvailabilityCreate(BaseModel):
+    kind: AvailabilityKind
+    start_date: date
+    end_date: date
+    weekdays: Optional[list[int]] = None  # Days off for PART_TIME, Monday is 0
+    note: Optional[str] = None
+
+    @field_validator('weekdays')
+    @classmethod
+    def validate_weekdays(cls, v):
+        if v is None:
+            return None
+        if not v or any(day < 0 or day > 6 for day in v):
+            raise ValueError('Weekdays must be a non-empty list of numbers from 0 (Monday) to 6 (Sunday)')
+        return sorted(set(v))
+
+    @model_validator(mode='after')
+    def validate_range(self):
+        if self.end_date < self.start_date:
+            raise ValueError('end_date must not be before start_date')
+        if self.kind == AvailabilityKind.PART_TIME and self.weekdays is None:
+            raise ValueError('Part-time entries need the weekdays the doctor is off')
+        if self.kind != AvailabilityKind.PART_TIME and self.weekdays is not None:
+            raise ValueError('Only part-time entries can be limited to weekdays')
+        return self
+
+class AvailabilityResponse(BaseModel):
+    id: int
+    doctor_id: int
+    kind: AvailabilityKind
+    start_date: date
+    end_date: date
+    weekdays: Optional[list[int]]
+    note: Optional[str]
+
+    @classmethod
+    def from_entry(cls, entry: DoctorAvailability) -> "AvailabilityResponse":
+        return cls(
+            id=entry.id,
+            doctor_id=entry.doctor_id,
+            kind=entry.kind,
+            start_date=entry.start_date,
+            end_date=entry.end_date,
+            weekdays=mask_to_weekdays(entry.weekday_mask),
+            note=entry.note
+        )
+
+class DoctorWeekLoad(BaseModel):
+    id: int
+    name: str
+    status: DoctorStatus
+    booked_dates: list[date]
+    assignment_counts: dict[AssignmentType, int]
+    total_assignments: int
+    unavailable: dict[date, list[AvailabilityKind]]
+
+class DoctorWeekAvailability(BaseModel):
+    week_start_date: date
+    week_end_date: date
+    schedule_version: int
+    doctors: list[DoctorWeekLoad]
+
+class DoctorImportRow(BaseModel):
+    row: int
+    status: Literal["created", "updated", "error"]
+    doctor_id: Optional[int] = None
+    error: Optional[str] = None
+
+class DoctorImportReport(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    rows: list[DoctorImportRow]
+
+class DoctorAssignmentResponse(BaseModel):
+    id: int
+    assignment_date: date
+    assignment_type: AssignmentType
+    schedule_id: int
+    week_start_date: date
+    week_end_date: date
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def _directory_statement(
+    statement: Select,
+    doctor_status: Optional[DoctorStatus],
+    is_active: Optional[bool],
+    position: Optional[str],
+    q: Optional[str],
+    match: str,
+    limit: Optional[int],
+    cursor: Optional[str],
+) -> Select:
+    """Apply the directory filters and keyset pagination shared by the list endpoints.
+
+    Rows are ordered by ``(name, id)``, which the name index serves; the cursor
+    holds the last row's name and id. One extra row is fetched to tell whether
+    another page follows; :func:`_directory_page` trims it.
+    """
+    if doctor_status is not None:
+        statement = statement.where(Doctor.status == doctor_status)
+    if is_active is not None:
+        statement = statement.where(Doctor.is_active == is_active)
+    if position is not None:
+        statement = statement.where(Doctor.position == position)
+
+    term = (q or "").strip().lower()
+    if term:
+        pattern = _escape_like(term) + "%"
+        if match == "contains":
+            pattern = "%" + pattern
+        statement = statement.where(func.lower(Doctor.name).like(pattern, escape="\\"))
+
+    if cursor is not None:
+        last_name, last_id = decode_cursor(cursor, str, int)
+        statement = statement.where(or_(
+            Doctor.name > last_name,
+            and_(Doctor.name == last_name, Doctor.id > last_id),
+        ))
+
+    statement = statement.order_by(Doctor.name, Doctor.id)
+    if limit is not None:
+        statement = statement.limit(limit + 1)
+    return statement
+
+def _directory_page(rows: Sequence, response: Response, limit: Optional[int]) -> Sequence:
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        set_next_cursor(response, encode_cursor(rows[-1].name, rows[-1].id))
+    return rows
+
 @router.get("/", response_model=list[DoctorResponse])
 async def get_doctors(
-    db: Session = Depends(get_db),
+    response: Response,
+    doctor_status: Optional[DoctorStatus] = Query(None, alias="status"),
+    is_active: Optional[bool] = None,
+    position: Optional[str] = None,
+    q: Optional[str] = None,
+    match: Literal["contains", "prefix"] = "contains",
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user = Depends(get_current_user)
+):
+    """Get doctors ordered by name
+
+    ``q`` matches names case-insensitively, as a substring or, with
+    ``match=prefix``, as a prefix. When ``limit`` is given and more rows
+    remain, the cursor for the next page is returned in ``X-Next-Cursor``.
+    """
+    statement = _directory_statement(
+        select(Doctor), doctor_status, is_active, position, q, match, limit, cursor
+    )
+    doctors = (await db.execute(statement)).scalars().all()
+    return trusted_json([
+        {
+            "id": doctor.id,
+            "name": doctor.name,
+            "email": doctor.email,
+            "phone": doctor.phone,
+            "position": doctor.position,
+            "is_active": bool(doctor.is_active),
+            "status": doctor.status,
+        }
+        for doctor in _directory_page(doctors, response, limit)
+    ], response)
+
+@router.get("/sidebar", response_model=list[DoctorSidebarEntry], response_model_exclude_none=True)
+async def get_doctor_sidebar(
+    response: Response,
+    doctor_status: Optional[DoctorStatus] = Query(None, alias="status"),
+    is_active: Optional[bool] = None,
+    position: Optional[str] = None,
+    q: Optional[str] = None,
+    match: Literal["contains", "prefix"] = "contains",
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    available_on: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user = Depends(get_current_user)
+):
+    """Get the id, name and status of doctors for the draggable sidebar
+
+    Accepts the same filters and pagination as the full listing but selects
+    only the three columns the sidebar renders. With ``available_on`` each
+    entry also says whether the doctor is free that day.
+    """
+    statement = _directory_statement(
+        select(Doctor.id, Doctor.name, Doctor.status),
+        doctor_status, is_active, position, q, match, limit, cursor
+    )
+    rows = _directory_page((await db.execute(statement)).all(), response, limit)
+
+    availability = None
+    if available_on is not None and rows:
+        availability = await AvailabilityIndex.load_async(
+            db, available_on, available_on, doctor_ids=[row.id for row in rows]
+        )
+
+    # Without available_on the key is left out, as response_model_exclude_none would
+    if available_on is None:
+        entries = [{"id": row.id, "name": row.name, "status": row.status} for row in rows]
+    else:
+        entries = [
+            {"id": row.id, "name": row.name, "status": row.status, "available": availability.is_available(row.id, available_on)}
+            for row in rows
+        ]
+    return trusted_json(entries, response)
+
+async def _build_week_availability(db: AsyncSession, week_start: date, schedule_version: int) -> DoctorWeekAvailability:
+    """Booked dates, per-type load and unavailable days for every active doctor."""
+    week_end = week_start + timedelta(days=6)
+    week_dates = [week_start + timedelta(days=offset) for offset in range(7)]
+
+    # One row per (doctor, day, type) with assignments that week, and one row
+    # with NULL assignment columns for each doctor who has none.
+    rows = (await db.execute(
+        select(
+            Doctor.id,
+            Doctor.name,
+            Doctor.status,
+            Assignment.assignment_date,
+            Assignment.assignment_type,
+            func.count(Assignment.id).label("assignment_count"),
+        )
+        .outerjoin(Assignment, and_(
+            Assignment.doctor_id == Doctor.id,
+            Assignment.assignment_date >= datetime.combine(week_start, datetime.min.time()),
+            Assignment.assignment_date < datetime.combine(week_end + timedelta(days=1), datetime.min.time()),
+        ))
+        .where(Doctor.is_active.is_(True))
+        .group_by(Doctor.id, Doctor.name, Doctor.status, Assignment.assignment_date, Assignment.assignment_type)
+        .order_by(Doctor.name, Doctor.id)
+    )).all()
+
+    doctors = {}
+    for row in rows:
+        load = doctors.get(row.id)
+        if load is None:
+            load = doctors[row.id] = DoctorWeekLoad(
+                id=row.id,
+                name=row.name,
+                status=row.status,
+                booked_dates=[],
+                assignment_counts={},
+                total_assignments=0,
+                unavailable={}
+            )
+        if row.assignment_type is None:
+            continue
+        booked = row.assignment_date.date()
+        if booked not in load.booked_dates:
+            load.booked_dates.append(booked)
+        load.assignment_counts[row.assignment_type] = (
+            load.assignment_counts.get(row.assignment_type, 0) + row.assignment_count
+        )
+        load.total_assignments += row.assignment_count
+
+    availability = await AvailabilityIndex.load_async(db, week_start, week_end, doctor_ids=list(doctors))
+    for load in doctors.values():
+        load.booked_dates.sort()
+        for day in week_dates:
+            kinds = availability.unavailable(load.id, day)
+            if kinds:
+                load.unavailable[day] = sorted(kinds, key=lambda kind: kind.value)
+
+    return DoctorWeekAvailability(
+        week_start_date=week_start,
+        week_end_date=week_end,
+        schedule_version=schedule_version,
+        doctors=list(doctors.values())
+    )
+
+def _cached_week_availability(
+    week_start: date, schedule_version: int, gzip_ok: bool
+) -> tuple[Optional[str], Optional[Response]]:
+    """The cache key for a week and the cached response, if there is one.
+
+    The key is ``None`` when Redis is down. Blocking Redis calls, so handlers
+    run it in the threadpool.
+    """
+    generation = get_generation(DOCTOR_GENERATION)
+    if generation is None:
+        return None, None
+    cache_key = f"doctor_week:{week_start.isoformat()}:{schedule_version}:{generation}"
+    if gzip_ok:
+        compressed = get_cached_bytes(f"{cache_key}:gzip")
+        if compressed is not None:
+            return cache_key, Response(
+                content=compressed,
+                media_type="application/json",
+                headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+            )
+    cached = get_cached(cache_key)
+    if cached is not None:
+        return cache_key, Response(content=cached, media_type="application/json")
+    return cache_key, None
+
+def _cache_week_availability(cache_key: str, body: str) -> None:
+    """Store a week's payload, and its gzip form when worth compressing."""
+    set_cached(cache_key, body, settings.DOCTOR_WEEK_CACHE_TTL_SECONDS)
+    if settings.COMPRESSION_ENABLED and len(body) >= settings.COMPRESSION_MINIMUM_SIZE:
+        set_cached(f"{cache_key}:gzip", compress_body(body), settings.DOCTOR_WEEK_CACHE_TTL_SECONDS)
+
+@router.get("/availability", response_model=DoctorWeekAvailability)
+async def get_week_availability(
+    week: date,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    """Get all doctors"""
-    doctors = db.query(Doctor).all()
-    return doctors
+    """Get every active doctor's bookings, load and unavailable days for a week
+
+    ``week`` may be any day of the week; it is moved back to Monday. The result
+    is cached in Redis under the schedule's version and the doctor generation,
+    so any assignment or doctor change produces a fresh key. Large results are
+    also cached gzip-compressed, and gzip-capable clients get those bytes as-is.
+    Redis is only called from the threadpool, so a slow Redis does not stall
+    the event loop.
+
+    Reads go to the primary: the generation is bumped as soon as a doctor is
+    written, and a lagging replica would cache the old rows under the new key
+    for every user.
+    """
+    week_start = week - timedelta(days=week.weekday())
+    schedule_version = (await db.execute(
+        select(Schedule.version).where(
+            Schedule.week_start_date == datetime.combine(week_start, datetime.min.time())
+        )
+    )).scalar() or 0
+
+    cache_key, cached = await run_in_threadpool(
+        _cached_week_availability,
+        week_start,
+        schedule_version,
+        accepts_gzip(request.headers.get("accept-encoding")),
+    )
+    if cached is not None:
+        return cached
+
+    result = await _build_week_availability(db, week_start, schedule_version)
+    if cache_key is not None:
+        await run_in_threadpool(_cache_week_availability, cache_key, result.model_dump_json())
+    return result
 
 @router.post("/", response_model=DoctorResponse)
 async def create_doctor(
@@ -126,13 +495,159 @@ async def create_doctor(
     )
     db.add(db_doctor)
     db.commit()
+    bump_generation(DOCTOR_GENERATION)
     db.refresh(db_doctor)
     return db_doctor
 
+def _validate_import_record(record: dict) -> tuple[Optional[DoctorCreate], Optional[str]]:
+    """Validate one uploaded record with the same rules as ``POST /``."""
+    values = {
+        field: record[field]
+        for field in IMPORT_FIELDS
+        if record.get(field) not in (None, "")
+    }
+    try:
+        return DoctorCreate.model_validate(values), None
+    except ValidationError as exc:
+        messages = [
+            f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+            for error in exc.errors()
+        ]
+        return None, "; ".join(messages)
+
+def _import_key(doctor: DoctorCreate) -> tuple[str, str]:
+    """How an imported row is matched to a doctor: by email, else by name."""
+    if doctor.email:
+        return "email", doctor.email
+    return "name", doctor.name
+
+def _upsert_doctor_batch(db: Session, batch: list[tuple[int, DoctorCreate]]) -> list[DoctorImportRow]:
+    """Insert or update a batch of validated rows without committing.
+
+    Rows are matched by email, and rows without one by name among doctors
+    that have no email either, so importing the same file twice updates
+    rather than duplicates. Neither column is unique, so existing doctors
+    are found with one ``IN`` query per key and the batch is written with
+    one bulk INSERT and one bulk UPDATE. Updates only touch the fields
+    present in the row. A repeated key in the upload updates the doctor
+    created or matched by its first row.
+    """
+    keys = {_import_key(doctor) for _, doctor in batch}
+    emails = {value for kind, value in keys if kind == "email"}
+    names = {value for kind, value in keys if kind == "name"}
+    existing_ids = {}
+    if emails:
+        for email, doctor_id in (
+            db.query(Doctor.email, Doctor.id).filter(Doctor.email.in_(emails)).order_by(Doctor.id).all()
+        ):
+            existing_ids.setdefault(("email", email), doctor_id)
+    if names:
+        for name, doctor_id in (
+            db.query(Doctor.name, Doctor.id)
+            .filter(Doctor.email.is_(None), Doctor.name.in_(names))
+            .order_by(Doctor.id)
+            .all()
+        ):
+            existing_ids.setdefault(("name", name), doctor_id)
+
+    inserts = []
+    updates = {}
+    pending_inserts = {}
+    outcomes = []
+    for row_number, doctor in batch:
+        key = _import_key(doctor)
+        provided = doctor.model_dump(include=doctor.model_fields_set)
+        if key in existing_ids:
+            doctor_id = existing_ids[key]
+            updates.setdefault(doctor_id, {"id": doctor_id}).update(provided)
+            outcomes.append((row_number, "updated", doctor_id, None))
+        elif key in pending_inserts:
+            index = pending_inserts[key]
+            inserts[index].update(provided)
+            outcomes.append((row_number, "updated", None, index))
+        else:
+            pending_inserts[key] = len(inserts)
+            outcomes.append((row_number, "created", None, len(inserts)))
+            inserts.append(doctor.model_dump())
+
+    inserted_ids = []
+    if inserts:
+        inserted_ids = db.scalars(
+            insert(Doctor).returning(Doctor.id, sort_by_parameter_order=True),
+            inserts
+        ).all()
+    if updates:
+        db.execute(update(Doctor), list(updates.values()))
+
+    return [
+        DoctorImportRow(
+            row=row_number,
+            status=row_status,
+            doctor_id=doctor_id if insert_index is None else inserted_ids[insert_index]
+        )
+        for row_number, row_status, doctor_id, insert_index in outcomes
+    ]
+
+def _commit_import(db: Session) -> None:
+    db.commit()
+    bump_generation(DOCTOR_GENERATION)
+
+@router.post("/import", response_model=DoctorImportReport)
+async def import_doctors(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Bulk create or update doctors from a streamed CSV or NDJSON body
+
+    Send the file as the raw request body with ``Content-Type: text/csv``
+    (first row is the header) or ``application/x-ndjson``. Recognised fields
+    are name, email, phone, position and status. Rows are read as they arrive
+    and written in batches, and the report lists the outcome of every row.
+
+    The whole upload is one transaction: if the body turns out to be
+    unreadable part way through, nothing is written. Batches run in the
+    threadpool so the sync Session never blocks the event loop.
+    """
+    if current_user.role == "viewer":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Viewers cannot create doctors")
+
+    records = iter_upload_records(request.headers.get("content-type", ""), request.stream())
+
+    rows = []
+    batch = []
+    try:
+        async for row_number, record, error in records:
+            doctor = None
+            if error is None:
+                doctor, error = _validate_import_record(record)
+            if error is not None:
+                rows.append(DoctorImportRow(row=row_number, status="error", error=error))
+                continue
+
+            batch.append((row_number, doctor))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                rows.extend(await run_in_threadpool(_upsert_doctor_batch, db, batch))
+                batch = []
+        if batch:
+            rows.extend(await run_in_threadpool(_upsert_doctor_batch, db, batch))
+        await run_in_threadpool(_commit_import, db)
+    except Exception:
+        await run_in_threadpool(db.rollback)
+        raise
+
+    rows.sort(key=lambda row: row.row)
+    return DoctorImportReport(
+        created=sum(row.status == "created" for row in rows),
+        updated=sum(row.status == "updated" for row in rows),
+        failed=sum(row.status == "error" for row in rows),
+        rows=rows
+    )
+
 @router.get("/{doctor_id}", response_model=DoctorResponse)
 async def get_doctor(
     doctor_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     """Get a specific doctor"""
@@ -188,9 +703,151 @@ async def update_doctor(
         doctor.status = doctor_data.status
     
     db.commit()
+    bump_generation(DOCTOR_GENERATION)
     db.refresh(doctor)
     return doctor
 
+def _get_doctor_name(db: Session, doctor_id: int) -> str:
+    name = db.query(Doctor.name).filter(Doctor.id == doctor_id).scalar()
+    if name is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Doctor not found"
+        )
+    return name
+
+def _assignment_details_query(db: Session, doctor_id: int) -> OrmQuery:
+    return (
+        db.query(
+            Assignment.id,
+            Assignment.assignment_date,
+            Assignment.assignment_type,
+            Assignment.schedule_id,
+            Schedule.week_start_date,
+            Schedule.week_end_date,
+        )
+        .join(Schedule, Schedule.id == Assignment.schedule_id)
+        .filter(Assignment.doctor_id == doctor_id)
+    )
+
+@router.get("/{doctor_id}/assignments", response_model=list[DoctorAssignmentResponse])
+async def get_doctor_assignments(
+    doctor_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user = Depends(get_current_user)
+):
+    """Get a doctor's assignments, oldest first, one page at a time
+
+    The cursor for the next page is returned in the ``X-Next-Cursor`` header.
+    """
+    _get_doctor_name(db, doctor_id)
+
+    query = _assignment_details_query(db, doctor_id)
+    if cursor is not None:
+        last_date, last_id = decode_cursor(cursor, str, int)
+        try:
+            last_date = datetime.fromisoformat(last_date)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor"
+            )
+        query = query.filter(or_(
+            Assignment.assignment_date > last_date,
+            and_(Assignment.assignment_date == last_date, Assignment.id > last_id),
+        ))
+
+    rows = query.order_by(Assignment.assignment_date, Assignment.id).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        set_next_cursor(response, encode_cursor(rows[-1].assignment_date.isoformat(), rows[-1].id))
+
+    return trusted_json([
+        {
+            "id": row.id,
+            "assignment_date": as_date(row.assignment_date),
+            "assignment_type": row.assignment_type,
+            "schedule_id": row.schedule_id,
+            "week_start_date": as_date(row.week_start_date),
+            "week_end_date": as_date(row.week_end_date),
+        }
+        for row in rows
+    ], response)
+
+@router.get("/{doctor_id}/availability", response_model=list[AvailabilityResponse])
+async def get_doctor_availability(
+    doctor_id: int,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: Session = Depends(get_read_db),
+    current_user = Depends(get_current_user)
+):
+    """Get a doctor's leave, conference and part-time entries, optionally within a date range"""
+    _get_doctor_name(db, doctor_id)
+
+    query = db.query(DoctorAvailability).filter(DoctorAvailability.doctor_id == doctor_id)
+    if start is not None:
+        query = query.filter(DoctorAvailability.end_date >= start)
+    if end is not None:
+        query = query.filter(DoctorAvailability.start_date <= end)
+
+    entries = query.order_by(DoctorAvailability.start_date, DoctorAvailability.id).all()
+    return [AvailabilityResponse.from_entry(entry) for entry in entries]
+
+@router.post("/{doctor_id}/availability", response_model=AvailabilityResponse)
+async def create_doctor_availability(
+    doctor_id: int,
+    availability_data: AvailabilityCreate,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Record a period when a doctor cannot be assigned"""
+    if current_user.role == "viewer":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Viewers cannot update doctors")
+    _get_doctor_name(db, doctor_id)
+
+    entry = DoctorAvailability(
+        doctor_id=doctor_id,
+        kind=availability_data.kind,
+        start_date=availability_data.start_date,
+        end_date=availability_data.end_date,
+        weekday_mask=weekdays_to_mask(availability_data.weekdays),
+        note=availability_data.note
+    )
+    db.add(entry)
+    db.commit()
+    bump_generation(DOCTOR_GENERATION)
+    db.refresh(entry)
+    return AvailabilityResponse.from_entry(entry)
+
+@router.delete("/{doctor_id}/availability/{availability_id}")
+async def delete_doctor_availability(
+    doctor_id: int,
+    availability_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Remove an availability entry"""
+    if current_user.role == "viewer":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Viewers cannot update doctors")
+
+    deleted = (
+        db.query(DoctorAvailability)
+        .filter(DoctorAvailability.id == availability_id, DoctorAvailability.doctor_id == doctor_id)
+        .delete(synchronize_session=False)
+    )
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Availability entry not found"
+        )
+    db.commit()
+    bump_generation(DOCTOR_GENERATION)
+    return {"message": "Availability entry deleted successfully"}
+
 @router.delete("/{doctor_id}")
 async def delete_doctor(
     doctor_id: int,
@@ -200,52 +857,53 @@ async def delete_doctor(
     """Delete a doctor"""
     if current_user.role not in ["admin", "editor"]:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only admins and editors can delete doctors")
-    doctor = db.query(Doctor).filter(Doctor.id == doctor_id).first()
-    if not doctor:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Doctor not found"
-        )
+    doctor_name = _get_doctor_name(db, doctor_id)
     
-    # Check if doctor has any assignments
-    assignments = db.query(Assignment).filter(Assignment.doctor_id == doctor_id).all()
-    if assignments:
-        # Get detailed assignment information
-        from sqlalchemy import text
-        assignment_details = db.execute(text("""
-            SELECT 
-                a.id as assignment_id,
-                a.assignment_date,
-                a.assignment_type,
-                s.id as schedule_id,
-                TO_CHAR(s.week_start_date, 'Mon DD, YYYY') || ' - ' || TO_CHAR(s.week_end_date, 'Mon DD, YYYY') as week_range
-            FROM assignments a
-            JOIN schedules s ON a.schedule_id = s.id
-            WHERE a.doctor_id = :doctor_id
-            ORDER BY s.week_start_date
-        """), {"doctor_id": doctor_id}).fetchall()
+    # Check if doctor has any assignments without loading them
+    has_assignments = db.query(
+        exists().where(Assignment.doctor_id == doctor_id)
+    ).scalar()
+    if has_assignments:
+        assignment_count = db.query(func.count(Assignment.id)).filter(
+            Assignment.doctor_id == doctor_id
+        ).scalar()
+        # Only the first few assignments are listed; the rest are paginated
+        # through GET /{doctor_id}/assignments
+        assignment_details = (
+            _assignment_details_query(db, doctor_id)
+            .order_by(Schedule.week_start_date, Assignment.id)
+            .limit(DELETE_DETAIL_LIMIT)
+            .all()
+        )
         
         # Format assignment details
         assignment_list = []
         for detail in assignment_details:
-            assignment_list.append(f"• {detail.week_range} ({detail.assignment_type.replace('_', ' ').title()})")
+            week_range = f"{detail.week_start_date:%b %d, %Y} - {detail.week_end_date:%b %d, %Y}"
+            assignment_list.append(f"• {week_range} ({detail.assignment_type.value.replace('_', ' ').title()})")
+        if assignment_count > len(assignment_details):
+            assignment_list.append(f"• ...and {assignment_count - len(assignment_details)} more")
         
         assignments_text = "\n".join(assignment_list)
         
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Cannot delete doctor '{doctor.name}' because they have {len(assignments)} assignment(s):\n\n{assignments_text}\n\nPlease remove these assignments first or deactivate the doctor instead."
+            detail=f"Cannot delete doctor '{doctor_name}' because they have {assignment_count} assignment(s):\n\n{assignments_text}\n\nPlease remove these assignments first or deactivate the doctor instead."
         )
     
     try:
-        db.delete(doctor)
+        db.query(DoctorAvailability).filter(
+            DoctorAvailability.doctor_id == doctor_id
+        ).delete(synchronize_session=False)
+        db.query(Doctor).filter(Doctor.id == doctor_id).delete(synchronize_session=False)
         db.commit()
+        bump_generation(DOCTOR_GENERATION)
         return {"message": "Doctor deleted successfully"}
     except IntegrityError as e:
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Cannot delete doctor '{doctor.name}' because they are referenced by other records. Please remove all assignments first."
+            detail=f"Cannot delete doctor '{doctor_name}' because they are referenced by other records. Please remove all assignments first."
         )
 
 @router.delete("/{doctor_id}/assignments")
@@ -255,28 +913,27 @@ async def clear_doctor_assignments(
     current_user = Depends(get_current_user)
 ):
     """Clear all assignments for a specific doctor"""
-    doctor = db.query(Doctor).filter(Doctor.id == doctor_id).first()
-    if not doctor:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Doctor not found"
-        )
+    doctor_name = _get_doctor_name(db, doctor_id)
     
-    # Get assignments count before deletion
-    assignments = db.query(Assignment).filter(Assignment.doctor_id == doctor_id).all()
-    assignment_count = len(assignments)
+    # Delete all assignments for this doctor in one statement; the row count
+    # comes back from the database
+    assignment_count = (
+        db.query(Assignment)
+        .filter(Assignment.doctor_id == doctor_id)
+        .delete(synchronize_session=False)
+    )
     
     if assignment_count == 0:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Doctor '{doctor.name}' has no assignments to clear."
+            detail=f"Doctor '{doctor_name}' has no assignments to clear."
         )
     
-    # Delete all assignments for this doctor
-    db.query(Assignment).filter(Assignment.doctor_id == doctor_id).delete()
     db.commit()
+    bump_generation(DOCTOR_GENERATION)
     
     return {
-        "message": f"Successfully cleared {assignment_count} assignment(s) for doctor '{doctor.name}'",
+        "message": f"Successfully cleared {assignment_count} assignment(s) for doctor '{doctor_name}'",
         "cleared_count": assignment_count
     }
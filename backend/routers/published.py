@@ -1,14 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import HTMLResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from database import get_db
+from read_routing import get_async_read_db
 from models import PublishedSchedule, Schedule, Assignment, Doctor, AssignmentType
 from auth import get_current_user
 from pydantic import BaseModel
 from datetime import datetime, date, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import uuid
 import json
 from html import escape as html_escape
+from utils.compression import accepts_gzip, decompress_html
+from utils.pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor, set_next_cursor
+from utils.responses import as_date, trusted_json
 
 router = APIRouter()
 
@@ -271,8 +278,13 @@ async def publish_schedule(
             detail="Schedule not found"
         )
     
-    # Get all assignments for this schedule
-    assignments = db.query(Assignment).filter(Assignment.schedule_id == schedule_id).all()
+    # Get all assignments for this schedule, with their doctors in the same query
+    rows = db.execute(
+        select(Assignment, Doctor)
+        .outerjoin(Doctor, Doctor.id == Assignment.doctor_id)
+        .where(Assignment.schedule_id == schedule_id)
+    ).all()
+    assignments = [assignment for assignment, _ in rows]
     
     # Get week dates
     week_dates = [schedule.week_start_date + timedelta(days=i) for i in range(7)]
@@ -282,8 +294,7 @@ async def publish_schedule(
     
     # Organize assignments by date and type
     assignments_dict = {}
-    for assignment in assignments:
-        doctor = db.query(Doctor).filter(Doctor.id == assignment.doctor_id).first()
+    for assignment, doctor in rows:
         if doctor:
             cell_key = f"{assignment.assignment_date.isoformat()}_{assignment.assignment_type.value}"
             if cell_key not in assignments_dict:
@@ -340,35 +351,92 @@ async def publish_schedule(
 
 @router.get("/", response_model=List[PublishedScheduleResponse])
 async def get_published_schedules(
-    db: Session = Depends(get_db),
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    week_from: Optional[date] = None,
+    week_to: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_read_db),
     current_user = Depends(get_current_user)
 ):
-    """Get all published schedules"""
-    published_schedules = db.query(PublishedSchedule).all()
-    result = []
-    for pub_schedule in published_schedules:
-        schedule = db.query(Schedule).filter(Schedule.id == pub_schedule.schedule_id).first()
-        result.append(PublishedScheduleResponse(
-            id=pub_schedule.id,
-            slug=pub_schedule.slug,
-            schedule_id=pub_schedule.schedule_id,
-            published_at=pub_schedule.published_at,
-            week_start_date=schedule.week_start_date if schedule else None,
-            week_end_date=schedule.week_end_date if schedule else None
-        ))
-    return result
+    """Get published schedules, newest first
 
-@router.get("/{slug}")
-async def get_published_schedule(slug: str, db: Session = Depends(get_db)):
-    """Get published schedule by slug (public access)"""
-    published_schedule = db.query(PublishedSchedule).filter(PublishedSchedule.slug == slug).first()
-    if not published_schedule:
+    Only the listing columns are selected, so snapshot bodies are never loaded.
+    When ``limit`` is given and more rows remain, the cursor for the next page
+    is returned in the ``X-Next-Cursor`` response header.
+    """
+    statement = (
+        select(
+            PublishedSchedule.id,
+            PublishedSchedule.slug,
+            PublishedSchedule.schedule_id,
+            PublishedSchedule.published_at,
+            Schedule.week_start_date,
+            Schedule.week_end_date,
+        )
+        .join(Schedule, Schedule.id == PublishedSchedule.schedule_id)
+    )
+
+    if week_from is not None:
+        statement = statement.where(Schedule.week_start_date >= datetime.combine(week_from, datetime.min.time()))
+    if week_to is not None:
+        statement = statement.where(Schedule.week_start_date < datetime.combine(week_to + timedelta(days=1), datetime.min.time()))
+    if cursor is not None:
+        (last_id,) = decode_cursor(cursor, int)
+        statement = statement.where(PublishedSchedule.id < last_id)
+
+    statement = statement.order_by(PublishedSchedule.id.desc())
+    if limit is not None:
+        statement = statement.limit(limit + 1)
+
+    rows = (await db.execute(statement)).all()
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        set_next_cursor(response, encode_cursor(rows[-1].id))
+
+    return trusted_json([
+        {
+            "id": row.id,
+            "slug": row.slug,
+            "schedule_id": row.schedule_id,
+            "published_at": row.published_at,
+            "week_start_date": as_date(row.week_start_date),
+            "week_end_date": as_date(row.week_end_date),
+        }
+        for row in rows
+    ], response)
+
+async def _get_published_html_gzip(db: AsyncSession, slug: str) -> bytes:
+    """Load the compressed snapshot body for a slug without hydrating the row."""
+    html_gzip = (await db.execute(
+        select(PublishedSchedule.html_gzip).where(PublishedSchedule.slug == slug)
+    )).scalar()
+    if html_gzip is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Published schedule not found"
         )
-    
-    return {"html_content": published_schedule.html_content}
+    return html_gzip
+
+@router.get("/{slug}")
+async def get_published_schedule(slug: str, db: AsyncSession = Depends(get_async_read_db)):
+    """Get published schedule by slug (public access)"""
+    html_gzip = await _get_published_html_gzip(db, slug)
+    return {"html_content": decompress_html(html_gzip)}
+
+@router.get("/{slug}/html")
+async def get_published_schedule_html(slug: str, request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    """Serve the published snapshot as a standalone HTML page (public access)
+
+    Snapshots are stored gzip-compressed, so gzip-capable clients receive the
+    stored bytes directly and nothing is recompressed per request.
+    """
+    html_gzip = await _get_published_html_gzip(db, slug)
+    headers = {"Vary": "Accept-Encoding"}
+    if accepts_gzip(request.headers.get("accept-encoding")):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=html_gzip, media_type="text/html; charset=utf-8", headers=headers)
+    return HTMLResponse(content=decompress_html(html_gzip), headers=headers)
 
 @router.delete("/{schedule_id}/unpublish")
 async def unpublish_schedule(
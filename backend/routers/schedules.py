@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
-from database import get_db
+from sqlalchemy import and_, func, select
+from database import get_async_db, get_db
+from read_routing import get_read_db
 from models import Schedule, Assignment, Doctor, AssignmentType, Capacity
 from auth import get_current_user
 from pydantic import BaseModel
 from datetime import datetime, date, timedelta
-from typing import List, Optional, Tuple
+from typing import List, Literal, Optional, Tuple
 import uuid
+from utils.availability import blocking_kinds, describe_unavailability
+from utils.responses import COMPACT_RESPONSES, as_date, compact_response, negotiate_compact, trusted_json
 
 router = APIRouter()
 
@@ -36,6 +40,8 @@ class ScheduleResponse(BaseModel):
     class Config:
         from_attributes = True
 
+ScheduleFormat = Literal["json", "compact", "msgpack"]
+
 class ScheduleCreate(BaseModel):
     week_start_date: date
 
@@ -61,6 +67,14 @@ def validate_assignment(db: Session, assignment_data: AssignmentCreate, schedule
             detail="Doctor not found or inactive"
         )
     
+    # Check planned leave, conferences and part-time days off
+    blocking = blocking_kinds(db, assignment_data.doctor_id, assignment_data.assignment_date)
+    if blocking:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Doctor is unavailable on this date ({describe_unavailability(blocking)})"
+        )
+
     day_start, day_end = _assignment_day_bounds(assignment_data.assignment_date)
 
     # Check capacity constraint
@@ -102,34 +116,128 @@ def validate_assignment(db: Session, assignment_data: AssignmentCreate, schedule
             detail="Doctor already assigned on this date"
         )
 
-@router.get("/", response_model=List[ScheduleResponse])
+def _assignments_with_doctor_names(*schedule_ids: int):
+    """Assignments of the given schedules with their doctor's name, in one query
+
+    Selects columns rather than ``Assignment`` entities: these rows are only
+    serialized, and skipping the identity map roughly halves the cost per row.
+    """
+    return (
+        select(
+            Assignment.id,
+            Assignment.schedule_id,
+            Assignment.doctor_id,
+            Assignment.assignment_date,
+            Assignment.assignment_type,
+            Doctor.name.label("doctor_name"),
+        )
+        .outerjoin(Doctor, Doctor.id == Assignment.doctor_id)
+        .where(Assignment.schedule_id.in_(schedule_ids))
+    )
+
+def _assignment_response(row) -> dict:
+    """An ``AssignmentResponse`` as a plain dict, for :func:`trusted_json`"""
+    return {
+        "id": row.id,
+        "doctor_id": row.doctor_id,
+        "assignment_date": as_date(row.assignment_date),
+        "assignment_type": row.assignment_type,
+        "doctor_name": row.doctor_name if row.doctor_name is not None else "Unknown",
+    }
+
+def _schedule_response(schedule: Schedule, assignments: List[dict]) -> dict:
+    """A ``ScheduleResponse`` as a plain dict, for :func:`trusted_json`"""
+    return {
+        "id": schedule.id,
+        "week_start_date": as_date(schedule.week_start_date),
+        "week_end_date": as_date(schedule.week_end_date),
+        "is_published": bool(schedule.is_published),
+        "assignments": assignments,
+    }
+
+# Assignment types in compact payloads are indexes into this list
+COMPACT_ASSIGNMENT_TYPES = [assignment_type.value for assignment_type in AssignmentType]
+_ASSIGNMENT_TYPE_CODES = {assignment_type: code for code, assignment_type in enumerate(AssignmentType)}
+
+class CompactScheduleBuilder:
+    """Columnar schedules for clients that opt in to the compact format
+
+    Each assignment is one entry in each of the ``id``, ``doctor``, ``day``
+    and ``type`` arrays: its id, the doctor's index into the shared
+    ``doctors`` dictionary, the day's offset from ``week_start_date`` and the
+    type's index into ``types``. The full format repeats the doctor's name,
+    the ISO date and the type name in every assignment instead.
+    """
+
+    def __init__(self):
+        self._doctor_index = {}
+        self.doctors = {"id": [], "name": []}
+
+    def _doctor(self, doctor_id: int, name: Optional[str]) -> int:
+        index = self._doctor_index.get(doctor_id)
+        if index is None:
+            index = self._doctor_index[doctor_id] = len(self.doctors["id"])
+            self.doctors["id"].append(doctor_id)
+            self.doctors["name"].append(name if name is not None else "Unknown")
+        return index
+
+    def schedule(self, schedule: Schedule, rows) -> dict:
+        """One schedule, with rows from :func:`_assignments_with_doctor_names`"""
+        week_start = as_date(schedule.week_start_date)
+        columns = {"id": [], "doctor": [], "day": [], "type": []}
+        for row in rows:
+            columns["id"].append(row.id)
+            columns["doctor"].append(self._doctor(row.doctor_id, row.doctor_name))
+            columns["day"].append((as_date(row.assignment_date) - week_start).days)
+            columns["type"].append(_ASSIGNMENT_TYPE_CODES[row.assignment_type])
+        return {
+            "id": schedule.id,
+            "week_start_date": week_start.isoformat(),
+            "week_end_date": as_date(schedule.week_end_date).isoformat(),
+            "is_published": bool(schedule.is_published),
+            "assignments": columns,
+        }
+
+    def dictionaries(self) -> dict:
+        """The lookup tables, once every schedule has been added"""
+        return {"types": COMPACT_ASSIGNMENT_TYPES, "doctors": self.doctors}
+
+def _single_schedule_response(schedule: Schedule, rows, encoding: Optional[str], response: Response):
+    """Full or compact response for one schedule"""
+    if encoding is None:
+        return trusted_json(_schedule_response(schedule, [_assignment_response(row) for row in rows]), response)
+    builder = CompactScheduleBuilder()
+    payload = builder.schedule(schedule, rows)
+    return compact_response({**payload, **builder.dictionaries()}, encoding, response)
+
+@router.get("/", response_model=List[ScheduleResponse], responses=COMPACT_RESPONSES)
 async def get_schedules(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    response_format: Optional[ScheduleFormat] = Query(None, alias="format"),
+    db: Session = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
-    """Get all schedules"""
+    """Get all schedules
+
+    Send ``?format=compact`` or ``Accept: application/vnd.scheduler.compact+json``
+    for the columnar format, or ``?format=msgpack`` for it as MessagePack.
+    """
+    encoding = negotiate_compact(request, response, response_format)
     schedules = db.query(Schedule).all()
-    result = []
-    for schedule in schedules:
-        assignments = db.query(Assignment).filter(Assignment.schedule_id == schedule.id).all()
-        assignment_responses = []
-        for assignment in assignments:
-            doctor = db.query(Doctor).filter(Doctor.id == assignment.doctor_id).first()
-            assignment_responses.append(AssignmentResponse(
-                id=assignment.id,
-                doctor_id=assignment.doctor_id,
-                assignment_date=assignment.assignment_date,
-                assignment_type=assignment.assignment_type,
-                doctor_name=doctor.name if doctor else "Unknown"
-            ))
-        result.append(ScheduleResponse(
-            id=schedule.id,
-            week_start_date=schedule.week_start_date,
-            week_end_date=schedule.week_end_date,
-            is_published=schedule.is_published,
-            assignments=assignment_responses
-        ))
-    return result
+    rows_by_schedule = {schedule.id: [] for schedule in schedules}
+    if schedules:
+        for row in db.execute(_assignments_with_doctor_names(*rows_by_schedule)):
+            rows_by_schedule[row.schedule_id].append(row)
+
+    if encoding is None:
+        return trusted_json([
+            _schedule_response(schedule, [_assignment_response(row) for row in rows_by_schedule[schedule.id]])
+            for schedule in schedules
+        ], response)
+    builder = CompactScheduleBuilder()
+    payload = [builder.schedule(schedule, rows_by_schedule[schedule.id]) for schedule in schedules]
+    return compact_response({"schedules": payload, **builder.dictionaries()}, encoding, response)
 
 @router.post("/", response_model=ScheduleResponse)
 async def create_schedule(
@@ -174,13 +282,17 @@ async def create_schedule(
         assignments=[]
     )
 
-@router.get("/{schedule_id}", response_model=ScheduleResponse)
+@router.get("/{schedule_id}", response_model=ScheduleResponse, responses=COMPACT_RESPONSES)
 async def get_schedule(
     schedule_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    response_format: Optional[ScheduleFormat] = Query(None, alias="format"),
+    db: Session = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
-    """Get a specific schedule"""
+    """Get a specific schedule; accepts the compact format like the listing"""
+    encoding = negotiate_compact(request, response, response_format)
     schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
     if not schedule:
         raise HTTPException(
@@ -188,25 +300,8 @@ async def get_schedule(
             detail="Schedule not found"
         )
     
-    assignments = db.query(Assignment).filter(Assignment.schedule_id == schedule_id).all()
-    assignment_responses = []
-    for assignment in assignments:
-        doctor = db.query(Doctor).filter(Doctor.id == assignment.doctor_id).first()
-        assignment_responses.append(AssignmentResponse(
-            id=assignment.id,
-            doctor_id=assignment.doctor_id,
-            assignment_date=assignment.assignment_date,
-            assignment_type=assignment.assignment_type,
-            doctor_name=doctor.name if doctor else "Unknown"
-        ))
-    
-    return ScheduleResponse(
-        id=schedule.id,
-        week_start_date=schedule.week_start_date,
-        week_end_date=schedule.week_end_date,
-        is_published=schedule.is_published,
-        assignments=assignment_responses
-    )
+    rows = db.execute(_assignments_with_doctor_names(schedule_id)).all()
+    return _single_schedule_response(schedule, rows, encoding, response)
 
 @router.post("/{schedule_id}/assignments", response_model=AssignmentResponse)
 async def create_assignment(
@@ -243,6 +338,7 @@ async def create_assignment(
         assignment_type=assignment_data.assignment_type
     )
     db.add(assignment)
+    schedule.version = Schedule.version + 1
     db.commit()
     db.refresh(assignment)
     
@@ -287,23 +383,32 @@ async def delete_assignment(
         )
     
     db.delete(assignment)
+    db.query(Schedule).filter(Schedule.id == schedule_id).update(
+        {Schedule.version: Schedule.version + 1}, synchronize_session=False
+    )
     db.commit()
     return {"message": "Assignment deleted successfully"}
 
-@router.get("/week/{week_start_date}", response_model=ScheduleResponse)
+@router.get("/week/{week_start_date}", response_model=ScheduleResponse, responses=COMPACT_RESPONSES)
 async def get_schedule_by_week(
     week_start_date: date,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    response_format: Optional[ScheduleFormat] = Query(None, alias="format"),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    """Get schedule for a specific week"""
+    """Get schedule for a specific week; accepts the compact format like the listing"""
+    encoding = negotiate_compact(request, response, response_format)
     week_end = week_start_date + timedelta(days=6)
-    schedule = db.query(Schedule).filter(
-        and_(
-            Schedule.week_start_date == week_start_date,
-            Schedule.week_end_date == week_end
+    # Compare as datetimes: SQLite stores DateTime columns as text and would
+    # never match a bare date
+    schedule = (await db.execute(
+        select(Schedule).where(
+            Schedule.week_start_date == datetime.combine(week_start_date, datetime.min.time()),
+            Schedule.week_end_date == datetime.combine(week_end, datetime.min.time())
         )
-    ).first()
+    )).scalars().first()
     
     if not schedule:
         if current_user.role == "viewer":
@@ -317,25 +422,8 @@ async def get_schedule_by_week(
             created_by=current_user.id
         )
         db.add(schedule)
-        db.commit()
-        db.refresh(schedule)
+        await db.commit()
+        await db.refresh(schedule)
     
-    assignments = db.query(Assignment).filter(Assignment.schedule_id == schedule.id).all()
-    assignment_responses = []
-    for assignment in assignments:
-        doctor = db.query(Doctor).filter(Doctor.id == assignment.doctor_id).first()
-        assignment_responses.append(AssignmentResponse(
-            id=assignment.id,
-            doctor_id=assignment.doctor_id,
-            assignment_date=assignment.assignment_date,
-            assignment_type=assignment.assignment_type,
-            doctor_name=doctor.name if doctor else "Unknown"
-        ))
-    
-    return ScheduleResponse(
-        id=schedule.id,
-        week_start_date=schedule.week_start_date,
-        week_end_date=schedule.week_end_date,
-        is_published=schedule.is_published,
-        assignments=assignment_responses
-    )
+    rows = (await db.execute(_assignments_with_doctor_names(schedule.id))).all()
+    return _single_schedule_response(schedule, rows, encoding, response)
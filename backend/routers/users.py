@@ -1,19 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
 from pydantic import BaseModel, EmailStr
-from passlib.context import CryptContext
 
 from database import get_db
+from read_routing import get_read_db
 from models import User, UserRole
-from auth import get_current_user, get_password_hash
-from routers.auth import require_admin
+from redis.exceptions import RedisError
+from auth import get_current_user, get_current_session_id, get_password_hash_async, principal_cache
+from routers.auth import (
+    ChangePasswordRequest, SessionResponse, _session_store_unavailable, change_user_password, require_admin
+)
+from sessions import session_store
 
 router = APIRouter()
 
-# Password context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # Pydantic models
 class UserResponse(BaseModel):
     id: int
@@ -53,13 +55,9 @@ class UpdateUserRequest(BaseModel):
     role: UserRole = None
     is_active: bool = None
 
-class ChangePasswordRequest(BaseModel):
-    current_password: str
-    new_password: str
-
 @router.get("/", response_model=List[UserResponse])
 async def get_users(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user = Depends(require_admin)
 ):
     """Get all users (admin only)"""
@@ -91,7 +89,7 @@ async def create_user(
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     new_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -146,25 +144,40 @@ async def update_user(
                 detail="Email already exists"
             )
     
+    # Sessions carry the username and were opened with the old password
+    ends_sessions = (
+        (user_data.username is not None and user_data.username != user.username)
+        or user_data.password is not None
+        or user_data.is_active is False
+    )
+
     # Update user fields
     if user_data.username is not None:
         user.username = user_data.username
     if user_data.email is not None:
         user.email = user_data.email
     if user_data.password is not None:
-        user.hashed_password = get_password_hash(user_data.password)
+        user.hashed_password = await get_password_hash_async(user_data.password)
     if user_data.role is not None:
         user.role = user_data.role
     if user_data.is_active is not None:
         user.is_active = user_data.is_active
     
+    # Revoke before committing: a deactivated user must not keep refreshing
+    if ends_sessions:
+        try:
+            await run_in_threadpool(session_store.revoke_all, user.id)
+        except RedisError:
+            db.rollback()
+            raise _session_store_unavailable()
     db.commit()
     db.refresh(user)
+    await run_in_threadpool(principal_cache.revoke, user.id)
     
     return UserResponse.from_orm(user)
 
 @router.delete("/{user_id}")
-async def delete_user(
+def delete_user(
     user_id: int,
     db: Session = Depends(get_db),
     current_user = Depends(require_admin)
@@ -185,28 +198,46 @@ async def delete_user(
             detail="Cannot delete your own account"
         )
     
+    try:
+        session_store.revoke_all(user_id)
+    except RedisError:
+        raise _session_store_unavailable()
     db.delete(user)
     db.commit()
+    principal_cache.revoke(user_id)
     
     return {"message": "User deleted successfully"}
 
+@router.get("/{user_id}/sessions", response_model=List[SessionResponse])
+def get_user_sessions(
+    user_id: int,
+    current_user = Depends(require_admin)
+):
+    """List a user's active sessions (admin only)"""
+    try:
+        sessions = session_store.list_for_user(user_id)
+    except RedisError:
+        raise _session_store_unavailable()
+    return [SessionResponse.from_session(session) for session in sessions]
+
+@router.delete("/{user_id}/sessions")
+def revoke_user_sessions(
+    user_id: int,
+    current_user = Depends(require_admin)
+):
+    """Sign a user out everywhere (admin only)"""
+    try:
+        revoked = session_store.revoke_all(user_id)
+    except RedisError:
+        raise _session_store_unavailable()
+    return {"message": f"Revoked {revoked} session(s)", "revoked_count": revoked}
+
 @router.post("/change-password")
 async def change_password(
     password_data: ChangePasswordRequest,
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    current_user = Depends(get_current_user),
+    current_session_id: Optional[str] = Depends(get_current_session_id)
 ):
     """Change user password"""
-    
-    # Verify current password
-    if not pwd_context.verify(password_data.current_password, current_user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Current password is incorrect"
-        )
-    
-    # Update password
-    current_user.hashed_password = get_password_hash(password_data.new_password)
-    db.commit()
-    
-    return {"message": "Password changed successfully"}
\ No newline at end of file
+    return await change_user_password(db, current_user, password_data, current_session_id)
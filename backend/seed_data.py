@@ -4,9 +4,9 @@ Seed script to initialize the database with default data
 """
 from sqlalchemy.orm import Session
 from database import SessionLocal, engine
-from models import Base, User, Doctor, Capacity, AssignmentType, UserRole
+from models import User, Doctor, Capacity, AssignmentType, UserRole
 from auth import get_password_hash
-from bootstrap import ensure_default_admin
+from bootstrap import ensure_default_admin, migrate
 from utils.auth import normalize_username, get_user_by_username
 from datetime import datetime
 
@@ -103,9 +103,8 @@ def main():
     """Main seed function"""
     print("🌱 Seeding database...")
     
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
-    print("✓ Database tables created")
+    # Create or upgrade the schema, stamped so the API accepts it
+    print(f"✓ Schema {migrate(engine)}")
     
     # Create database session
     db = SessionLocal()
@@ -0,0 +1,228 @@
+"""Redis-backed login sessions for refresh tokens."""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import logging
+import secrets
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+from redis.exceptions import WatchError
+
+from cache import redis_client
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+SESSION_KEY_PREFIX = "session:"
+USER_SESSIONS_KEY_PREFIX = "user_sessions:"
+
+
+@dataclass(frozen=True)
+class LoginSession:
+    id: str
+    user_id: int
+    username: str
+    created_at: float
+    last_used_at: float
+    user_agent: str
+    ip_address: str
+
+
+@dataclass(frozen=True)
+class IssuedRefreshToken:
+    session: LoginSession
+    refresh_token: str
+
+
+class SessionStore:
+    """Refresh-token sessions stored as Redis hashes.
+
+    A refresh token is ``<session id>.<secret>``; only a SHA-256 of the secret
+    is stored. Every refresh rotates the secret and slides the idle expiry, which
+    is capped by an absolute lifetime. A per-user set indexes sessions so they
+    can be listed and revoked in bulk.
+
+    Access tokens carry the session id as ``sid`` but are not checked against
+    this store: a revoked session's access token keeps working until it
+    expires, at most ``ACCESS_TOKEN_EXPIRE_MINUTES``. Revocation stops
+    refreshes, not tokens already issued.
+    """
+
+    def __init__(self, idle_seconds: int, max_age_seconds: int):
+        self.idle_seconds = idle_seconds
+        self.max_age_seconds = max_age_seconds
+
+    @staticmethod
+    def _session_key(session_id: str) -> str:
+        return f"{SESSION_KEY_PREFIX}{session_id}"
+
+    @staticmethod
+    def _user_key(user_id: int) -> str:
+        return f"{USER_SESSIONS_KEY_PREFIX}{user_id}"
+
+    @staticmethod
+    def _hash_secret(secret: str) -> str:
+        return hashlib.sha256(secret.encode("utf-8")).hexdigest()
+
+    def _ttl(self, created_at: float, now: float) -> int:
+        remaining = int(created_at + self.max_age_seconds - now)
+        return min(self.idle_seconds, remaining)
+
+    @staticmethod
+    def _from_hash(session_id: str, data: dict) -> LoginSession:
+        return LoginSession(
+            id=session_id,
+            user_id=int(data["user_id"]),
+            username=data["username"],
+            created_at=float(data["created_at"]),
+            last_used_at=float(data["last_used_at"]),
+            user_agent=data.get("user_agent", ""),
+            ip_address=data.get("ip_address", ""),
+        )
+
+    def create(self, user_id: int, username: str, user_agent: str = "", ip_address: str = "") -> IssuedRefreshToken:
+        """Start a session. Raises ``RedisError`` when Redis is unavailable."""
+        now = time.time()
+        session_id = secrets.token_urlsafe(16)
+        secret = secrets.token_urlsafe(32)
+        data = {
+            "user_id": str(user_id),
+            "username": username,
+            "created_at": repr(now),
+            "last_used_at": repr(now),
+            "user_agent": user_agent[:256],
+            "ip_address": ip_address,
+            "secret_hash": self._hash_secret(secret),
+        }
+
+        pipe = redis_client.pipeline()
+        pipe.hset(self._session_key(session_id), mapping=data)
+        pipe.expire(self._session_key(session_id), self.idle_seconds)
+        pipe.sadd(self._user_key(user_id), session_id)
+        pipe.expire(self._user_key(user_id), self.max_age_seconds)
+        pipe.execute()
+
+        return IssuedRefreshToken(
+            session=self._from_hash(session_id, data),
+            refresh_token=f"{session_id}.{secret}",
+        )
+
+    def rotate(self, refresh_token: str) -> Optional[IssuedRefreshToken]:
+        """Exchange a refresh token for a new one, sliding the session expiry.
+
+        Returns ``None`` when the token is malformed, unknown, expired or stale.
+        """
+        session_id, _, secret = refresh_token.partition(".")
+        if not session_id or not secret:
+            return None
+
+        key = self._session_key(session_id)
+        # Compare-and-swap: of two refreshes racing with the same token, the
+        # one whose write lands second sees the key change and fails
+        with redis_client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                data = pipe.hgetall(key)
+                if not data:
+                    return None
+                if not hmac.compare_digest(data.get("secret_hash", ""), self._hash_secret(secret)):
+                    logger.warning("Reused refresh token for session %s", session_id)
+                    return None
+
+                now = time.time()
+                ttl = self._ttl(float(data["created_at"]), now)
+                if ttl <= 0:
+                    pipe.unwatch()
+                    self.revoke(int(data["user_id"]), session_id)
+                    return None
+
+                new_secret = secrets.token_urlsafe(32)
+                data["secret_hash"] = self._hash_secret(new_secret)
+                data["last_used_at"] = repr(now)
+
+                pipe.multi()
+                pipe.hset(key, mapping={"secret_hash": data["secret_hash"], "last_used_at": data["last_used_at"]})
+                pipe.expire(key, ttl)
+                pipe.execute()
+            except WatchError:
+                logger.warning("Concurrent refresh for session %s", session_id)
+                return None
+
+        return IssuedRefreshToken(
+            session=self._from_hash(session_id, data),
+            refresh_token=f"{session_id}.{new_secret}",
+        )
+
+    def revoke_token(self, refresh_token: str) -> bool:
+        """Revoke the session a refresh token belongs to, if the token is current."""
+        session_id, _, secret = refresh_token.partition(".")
+        if not session_id or not secret:
+            return False
+
+        data = redis_client.hgetall(self._session_key(session_id))
+        if not data or not hmac.compare_digest(data.get("secret_hash", ""), self._hash_secret(secret)):
+            return False
+        return self.revoke(int(data["user_id"]), session_id)
+
+    def list_for_user(self, user_id: int) -> List[LoginSession]:
+        """Active sessions for a user, most recently used first."""
+        session_ids = sorted(redis_client.smembers(self._user_key(user_id)))
+        if not session_ids:
+            return []
+
+        pipe = redis_client.pipeline()
+        for session_id in session_ids:
+            pipe.hgetall(self._session_key(session_id))
+        results = pipe.execute()
+
+        sessions = []
+        expired = []
+        for session_id, data in zip(session_ids, results):
+            if data:
+                sessions.append(self._from_hash(session_id, data))
+            else:
+                expired.append(session_id)
+        if expired:
+            redis_client.srem(self._user_key(user_id), *expired)
+
+        sessions.sort(key=lambda session: session.last_used_at, reverse=True)
+        return sessions
+
+    def revoke(self, user_id: int, session_id: str) -> bool:
+        """Revoke one session. Returns ``False`` if it did not belong to the user."""
+        key = self._session_key(session_id)
+        owner = redis_client.hget(key, "user_id")
+        if owner is not None and int(owner) != user_id:
+            return False
+
+        pipe = redis_client.pipeline()
+        pipe.delete(key)
+        pipe.srem(self._user_key(user_id), session_id)
+        deleted, _ = pipe.execute()
+        return bool(deleted)
+
+    def revoke_all(self, user_id: int, keep_session_id: Optional[str] = None) -> int:
+        """Revoke every session of a user, optionally sparing one. Returns the count."""
+        session_ids = [
+            session_id
+            for session_id in redis_client.smembers(self._user_key(user_id))
+            if session_id != keep_session_id
+        ]
+        if not session_ids:
+            return 0
+
+        pipe = redis_client.pipeline()
+        pipe.delete(*(self._session_key(session_id) for session_id in session_ids))
+        pipe.srem(self._user_key(user_id), *session_ids)
+        deleted, _ = pipe.execute()
+        return deleted
+
+
+session_store = SessionStore(
+    idle_seconds=settings.REFRESH_SESSION_IDLE_DAYS * 24 * 60 * 60,
+    max_age_seconds=settings.REFRESH_SESSION_MAX_DAYS * 24 * 60 * 60,
+)
@@ -0,0 +1,115 @@
+import os
+from contextlib import contextmanager
+from typing import Callable, ContextManager, Generator, Iterator
+
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+# Ensure the API uses an isolated SQLite database during tests
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test_auth.db")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+# Test modules build their tables with create_all rather than bootstrap.py,
+# so the schema is never stamped with an Alembic revision.
+os.environ.setdefault("DB_SCHEMA_CHECK", "off")
+
+import cache  # noqa: E402
+from auth import create_access_token  # noqa: E402
+from bootstrap import ensure_default_capacities  # noqa: E402
+from database import Base, engine, SessionLocal, get_db  # noqa: E402
+from main import app  # noqa: E402
+from models import User, UserRole  # noqa: E402
+from query_budget import QueryRecorder  # noqa: E402
+
+
+def override_get_db() -> Generator[Session, None, None]:
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def clean_database() -> Iterator[None]:
+    """Reset database tables around a test.
+
+    Modules opt in with ``pytestmark = pytest.mark.usefixtures("clean_database")``,
+    or depend on it from an autouse fixture that seeds their own rows.
+    """
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def default_capacities(clean_database) -> None:
+    """Clean tables seeded with the default shift capacities."""
+    with SessionLocal() as db:
+        ensure_default_capacities(db)
+
+
+@pytest.fixture
+def client() -> Generator[TestClient, None, None]:
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def fake_redis(monkeypatch) -> fakeredis.FakeRedis:
+    """An in-process Redis behind the response cache (``cache.redis_client``)."""
+    server = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(cache, "redis_client", server)
+    return server
+
+
+@pytest.fixture
+def auth_headers() -> Callable[..., dict]:
+    """Bearer headers for a user, created on first use.
+
+        client.get("/api/doctors/", headers=auth_headers("viewer", UserRole.VIEWER))
+    """
+    def headers(username: str = "editor", role: UserRole = UserRole.EDITOR) -> dict:
+        with SessionLocal() as db:
+            if db.query(User).filter(User.username == username).first() is None:
+                db.add(User(
+                    username=username,
+                    email=f"{username}@example.com",
+                    hashed_password="",
+                    role=role,
+                    is_active=True,
+                ))
+                db.commit()
+        return {"Authorization": f"Bearer {create_access_token({'sub': username})}"}
+
+    return headers
+
+
+@pytest.fixture
+def query_budget() -> Callable[..., ContextManager]:
+    """Fail the test if a block runs too many SQL statements.
+
+        with query_budget(4):
+            client.get("/api/schedules/")
+
+    ``max_repeats`` also caps how often any one statement may run, which is
+    how an N+1 loop shows up even while the total is within budget.
+    """
+    @contextmanager
+    def budget(max_queries: int, max_repeats: int = 2) -> Iterator[QueryRecorder]:
+        with QueryRecorder() as recorder:
+            yield recorder
+        statements = "\n".join(f"  {' '.join(statement.split())}" for statement in recorder.statements)
+        assert recorder.count <= max_queries, (
+            f"Ran {recorder.count} SQL statements, budget is {max_queries}:\n{statements}"
+        )
+        statement, times = recorder.most_repeated()
+        assert times <= max_repeats, (
+            f"Ran the same SQL statement {times} times (limit {max_repeats}): {' '.join(statement.split())}"
+        )
+
+    return budget
@@ -1,46 +1,57 @@
-import os
+import asyncio
+import threading
+import time
 from typing import Generator
 
+import fakeredis
 import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
-from sqlalchemy.orm import Session
+from sqlalchemy import event
 
-# Ensure the API uses an isolated SQLite database during tests
-os.environ.setdefault("DATABASE_URL", "sqlite:///./test_auth.db")
-os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+from database import engine, SessionLocal
+from models import User, UserRole
+import auth
+import rate_limit
+import sessions
+from redis.exceptions import RedisError
+from auth import get_password_hash, principal_cache, PasswordHasher, PRINCIPAL_REVOCATIONS_KEY
+from bootstrap import ensure_default_admin
+from config import settings
+from utils.auth import get_user_by_username, normalize_username
 
-from database import Base, engine, SessionLocal, get_db  # noqa: E402
-from main import app  # noqa: E402
-from models import User, UserRole  # noqa: E402
-from auth import get_password_hash  # noqa: E402
-from bootstrap import ensure_default_admin  # noqa: E402
-from config import settings  # noqa: E402
-from utils.auth import get_user_by_username, normalize_username  # noqa: E402
-
-
-def override_get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+pytestmark = pytest.mark.usefixtures("clean_database")
 
 
 @pytest.fixture(autouse=True)
-def setup_database():
-    """Reset database tables before each test."""
-    Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine)
+def reset_principal_cache():
+    principal_cache.clear()
     yield
-    Base.metadata.drop_all(bind=engine)
+    principal_cache.clear()
 
 
 @pytest.fixture
-def client() -> Generator[TestClient, None, None]:
-    app.dependency_overrides[get_db] = override_get_db
-    with TestClient(app) as test_client:
-        yield test_client
-    app.dependency_overrides.clear()
+def fake_redis(monkeypatch) -> fakeredis.FakeRedis:
+    """Overrides the conftest fixture: backs principals, sessions and rate limits instead of the cache."""
+    server = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(auth, "redis_client", server)
+    monkeypatch.setattr(sessions, "redis_client", server)
+    monkeypatch.setattr(rate_limit, "redis_client", server)
+    return server
+
+
+@pytest.fixture
+def user_queries() -> Generator[list, None, None]:
+    """Record SQL statements that read the users table."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
 
 
 def create_user(username: str, password: str, role: UserRole = UserRole.ADMIN) -> User:
@@ -154,3 +165,389 @@ def test_ensure_default_admin_creates_user_when_missing():
         assert users[0].role == UserRole.ADMIN
     finally:
         db.close()
+
+
+def test_username_lookup_uses_lower_username_index():
+    create_user("IndexedUser", "secret")
+    executed = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        executed.append((statement, parameters))
+
+    db = SessionLocal()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        assert get_user_by_username(db, " indexeduser ").username == "IndexedUser"
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    try:
+        statement, parameters = executed[-1]
+        with engine.connect() as connection:
+            plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    finally:
+        db.close()
+
+    details = " ".join(row[-1] for row in plan)
+    assert "ix_users_username_lower" in details
+    assert "SCAN" not in details
+
+
+def login(client: TestClient, username: str, password: str) -> dict:
+    response = client.post(
+        "/api/auth/login-json",
+        json={"username": username, "password": password},
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_cached_principal_skips_user_lookup(client: TestClient, fake_redis, user_queries):
+    create_user("editor", "editor", role=UserRole.EDITOR)
+    headers = login(client, "editor", "editor")
+
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+    user_queries.clear()
+
+    response = client.get("/api/auth/me", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["username"] == "editor"
+    assert user_queries == []
+
+
+def test_principal_cache_is_bypassed_without_redis(client: TestClient, user_queries):
+    create_user("editor", "editor", role=UserRole.EDITOR)
+    headers = login(client, "editor", "editor")
+
+    client.get("/api/auth/me", headers=headers)
+    user_queries.clear()
+    client.get("/api/auth/me", headers=headers)
+
+    assert len(user_queries) == 1
+
+
+def test_role_change_invalidates_cached_principal(client: TestClient, fake_redis):
+    create_user("admin", "admin")
+    editor = create_user("editor", "editor", role=UserRole.EDITOR)
+    admin_headers = login(client, "admin", "admin")
+    editor_headers = login(client, "editor", "editor")
+    assert client.get("/api/auth/me", headers=editor_headers).json()["role"] == "editor"
+
+    response = client.put(
+        f"/api/users/{editor.id}",
+        json={"role": "viewer"},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+
+    assert client.get("/api/auth/me", headers=editor_headers).json()["role"] == "viewer"
+    assert fake_redis.zscore(PRINCIPAL_REVOCATIONS_KEY, str(editor.id)) is not None
+
+
+def test_revocation_published_by_another_worker_is_honoured(
+    client: TestClient, fake_redis, user_queries, monkeypatch
+):
+    editor = create_user("editor", "editor", role=UserRole.EDITOR)
+    headers = login(client, "editor", "editor")
+    client.get("/api/auth/me", headers=headers)
+
+    monkeypatch.setattr(principal_cache, "sync_interval", 0)
+    fake_redis.zadd(PRINCIPAL_REVOCATIONS_KEY, {str(editor.id): time.time()})
+    user_queries.clear()
+
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+    assert len(user_queries) == 1
+
+
+def test_password_hasher_rejects_jobs_beyond_queue_limit():
+    hasher = PasswordHasher(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = asyncio.ensure_future(hasher.run(release.wait))
+        await asyncio.sleep(0)
+        assert hasher.pending == 1
+
+        with pytest.raises(HTTPException) as exc_info:
+            await hasher.run(lambda: True)
+
+        release.set()
+        await blocked
+        return exc_info.value
+
+    error = asyncio.run(scenario())
+    hasher.shutdown()
+
+    assert error.status_code == 503
+    assert error.headers["Retry-After"] == "1"
+    stats = hasher.stats()
+    assert stats["completed"] == 1
+    assert stats["rejected"] == 1
+    assert stats["pending"] == 0
+
+
+def test_password_hasher_counts_cancelled_jobs_until_their_thread_is_done():
+    hasher = PasswordHasher(max_workers=1, max_queue=4)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(hasher.run(release.wait))
+        queued = asyncio.ensure_future(hasher.run(lambda: True))
+        await asyncio.sleep(0.05)
+        assert hasher.pending == 2
+
+        running.cancel()
+        queued.cancel()
+        await asyncio.gather(running, queued, return_exceptions=True)
+        # The queued job never starts; the running one still holds its thread
+        assert hasher.pending == 1
+
+        release.set()
+        for _ in range(100):
+            if hasher.pending == 0:
+                break
+            await asyncio.sleep(0.01)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        hasher.shutdown()
+
+    assert hasher.pending == 0
+    assert hasher.stats()["completed"] == 1
+
+
+def test_change_password_updates_hash(client: TestClient, fake_redis):
+    create_user("editor", "editor", role=UserRole.EDITOR)
+    headers = login(client, "editor", "editor")
+
+    response = client.post(
+        "/api/auth/change-password",
+        json={"current_password": "editor", "new_password": "changed"},
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    assert client.post(
+        "/api/auth/login-json",
+        json={"username": "editor", "password": "changed"},
+    ).status_code == 200
+
+
+@pytest.mark.parametrize("path", ["/api/auth/change-password", "/api/users/change-password"])
+def test_change_password_rejects_user_deleted_while_cached(client: TestClient, path: str):
+    editor = create_user("editor", "editor", role=UserRole.EDITOR)
+    headers = login(client, "editor", "editor")
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+    db = SessionLocal()
+    try:
+        db.delete(db.get(User, editor.id))
+        db.commit()
+    finally:
+        db.close()
+
+    response = client.post(path, json={"current_password": "editor", "new_password": "changed"}, headers=headers)
+    assert response.status_code == 401
+
+
+def login_tokens(client: TestClient, username: str, password: str) -> dict:
+    response = client.post(
+        "/api/auth/login-json",
+        json={"username": username, "password": password},
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_login_without_redis_issues_no_refresh_token(client: TestClient):
+    create_user("editor", "editor", role=UserRole.EDITOR)
+
+    tokens = login_tokens(client, "editor", "editor")
+
+    assert tokens["access_token"]
+    assert tokens["refresh_token"] is None
+
+
+def test_refresh_rotates_token_and_skips_password_check(client: TestClient, fake_redis, monkeypatch):
+    create_user("editor", "editor", role=UserRole.EDITOR)
+    tokens = login_tokens(client, "editor", "editor")
+
+    async def fail_verify(*args):
+        raise AssertionError("refresh must not verify the password")
+
+    monkeypatch.setattr("routers.auth.verify_password_async", fail_verify)
+    response = client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+    assert response.status_code == 200
+    refreshed = response.json()
+    assert refreshed["refresh_token"] != tokens["refresh_token"]
+    me = client.get("/api/auth/me", headers={"Authorization": f"Bearer {refreshed['access_token']}"})
+    assert me.json()["username"] == "editor"
+
+    # The previous refresh token was rotated out
+    stale = client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert stale.status_code == 401
+
+
+def test_concurrent_refreshes_with_one_token_issue_one_new_token(client: TestClient, fake_redis, monkeypatch):
+    create_user("editor", "editor", role=UserRole.EDITOR)
+    tokens = login_tokens(client, "editor", "editor")
+    issued = []
+    raced = []
+    pipeline = fake_redis.pipeline
+
+    def racing_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        read = pipe.hgetall
+
+        def read_then_race(key):
+            data = read(key)
+            if not raced:
+                # A second refresh with the same token completes in between
+                raced.append(key)
+                issued.append(sessions.session_store.rotate(tokens["refresh_token"]))
+            return data
+
+        pipe.hgetall = read_then_race
+        return pipe
+
+    monkeypatch.setattr(fake_redis, "pipeline", racing_pipeline)
+    assert sessions.session_store.rotate(tokens["refresh_token"]) is None
+    assert issued[0] is not None
+
+    monkeypatch.setattr(fake_redis, "pipeline", pipeline)
+    assert client.post("/api/auth/refresh", json={"refresh_token": issued[0].refresh_token}).status_code == 200
+
+
+def test_sessions_are_listed_and_revoked_in_bulk(client: TestClient, fake_redis):
+    create_user("editor", "editor", role=UserRole.EDITOR)
+    first = login_tokens(client, "editor", "editor")
+    second = login_tokens(client, "editor", "editor")
+    headers = {"Authorization": f"Bearer {first['access_token']}"}
+
+    listed = client.get("/api/auth/sessions", headers=headers).json()
+    assert len(listed) == 2
+    assert sum(session["current"] for session in listed) == 1
+
+    response = client.delete("/api/auth/sessions", headers=headers)
+    assert response.json()["revoked_count"] == 1
+
+    assert client.post("/api/auth/refresh", json={"refresh_token": second["refresh_token"]}).status_code == 401
+    assert client.post("/api/auth/refresh", json={"refresh_token": first["refresh_token"]}).status_code == 200
+
+
+def test_deactivating_user_revokes_their_sessions(client: TestClient, fake_redis):
+    create_user("admin", "admin")
+    editor = create_user("editor", "editor", role=UserRole.EDITOR)
+    admin_headers = login(client, "admin", "admin")
+    editor_tokens = login_tokens(client, "editor", "editor")
+
+    client.put(f"/api/users/{editor.id}", json={"is_active": False}, headers=admin_headers)
+
+    response = client.post("/api/auth/refresh", json={"refresh_token": editor_tokens["refresh_token"]})
+    assert response.status_code == 401
+
+
+def test_refresh_rejects_user_deactivated_behind_session_store(client: TestClient, fake_redis):
+    editor = create_user("editor", "editor", role=UserRole.EDITOR)
+    tokens = login_tokens(client, "editor", "editor")
+    db = SessionLocal()
+    try:
+        db.get(User, editor.id).is_active = False
+        db.commit()
+    finally:
+        db.close()
+
+    response = client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+    assert fake_redis.keys("session:*") == []
+
+
+def test_deactivation_fails_without_session_store(client: TestClient, fake_redis, monkeypatch):
+    create_user("admin", "admin")
+    editor = create_user("editor", "editor", role=UserRole.EDITOR)
+    admin_headers = login(client, "admin", "admin")
+
+    def unavailable(*args, **kwargs):
+        raise RedisError("redis down")
+
+    monkeypatch.setattr(sessions.session_store, "revoke_all", unavailable)
+    deactivated = client.put(f"/api/users/{editor.id}", json={"is_active": False}, headers=admin_headers)
+    deleted = client.delete(f"/api/users/{editor.id}", headers=admin_headers)
+
+    assert deactivated.status_code == 503
+    assert deleted.status_code == 503
+    db = SessionLocal()
+    try:
+        assert db.get(User, editor.id).is_active
+    finally:
+        db.close()
+
+
+def test_logout_ends_session(client: TestClient, fake_redis):
+    create_user("editor", "editor", role=UserRole.EDITOR)
+    tokens = login_tokens(client, "editor", "editor")
+
+    assert client.post("/api/auth/logout", json={"refresh_token": tokens["refresh_token"]}).status_code == 200
+    assert client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+
+
+def test_login_is_rate_limited_per_username_before_lookup(
+    client: TestClient, fake_redis, user_queries, monkeypatch
+):
+    monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_PER_USERNAME", 3)
+    create_user("editor", "editor", role=UserRole.EDITOR)
+
+    for _ in range(3):
+        response = client.post("/api/auth/login-json", json={"username": "editor", "password": "wrong"})
+        assert response.status_code == 401
+
+    user_queries.clear()
+    response = client.post("/api/auth/login-json", json={"username": " EDITOR ", "password": "editor"})
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert user_queries == []
+
+
+def test_login_is_rate_limited_per_ip(client: TestClient, fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_PER_IP", 5)
+
+    statuses = [
+        client.post("/api/auth/login-json", json={"username": f"user{index}", "password": "x"}).status_code
+        for index in range(6)
+    ]
+
+    assert statuses == [401] * 5 + [429]
+
+
+def test_login_calls_redis_off_the_event_loop(client: TestClient, fake_redis, monkeypatch):
+    from routers.auth import login_rate_limiter
+
+    on_loop = []
+    hit = login_rate_limiter.hit
+
+    def recording_hit(limits):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return hit(limits)
+
+    monkeypatch.setattr(login_rate_limiter, "hit", recording_hit)
+
+    client.post("/api/auth/login-json", json={"username": "nobody", "password": "x"})
+    client.post("/api/auth/login", data={"username": "nobody", "password": "x"})
+
+    assert on_loop == [False, False]
+
+
+def test_login_rate_limit_fails_open_without_redis(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_PER_USERNAME", 1)
+    create_user("editor", "editor", role=UserRole.EDITOR)
+
+    for _ in range(3):
+        response = client.post("/api/auth/login-json", json={"username": "editor", "password": "editor"})
+        assert response.status_code == 200
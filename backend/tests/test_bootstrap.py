@@ -0,0 +1,65 @@
+
+import pytest
+from alembic import command
+from sqlalchemy import create_engine, inspect, select, text
+
+from bootstrap import (
+    alembic_config,
+    check_schema_revision,
+    current_revision,
+    ensure_default_capacities,
+    head_revision,
+    migrate,
+)
+from models import SCHEMA_REVISION, Base, Capacity
+from sqlalchemy.orm import Session
+
+
+@pytest.fixture
+def scratch_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'bootstrap.db'}")
+    yield engine
+    engine.dispose()
+
+
+def test_schema_revision_matches_migration_head():
+    # Bump models.SCHEMA_REVISION together with each new migration
+    assert SCHEMA_REVISION == head_revision()
+
+
+def test_migrate_creates_and_stamps_empty_database(scratch_engine):
+    assert migrate(scratch_engine) == "created"
+
+    assert {"users", "schedules", "published_schedules"} <= set(inspect(scratch_engine).get_table_names())
+    assert check_schema_revision(scratch_engine) == SCHEMA_REVISION
+    assert migrate(scratch_engine) == "current"
+
+
+def test_check_rejects_unversioned_schema(scratch_engine):
+    Base.metadata.create_all(bind=scratch_engine)
+
+    with pytest.raises(RuntimeError, match="expected " + SCHEMA_REVISION):
+        check_schema_revision(scratch_engine)
+    with scratch_engine.connect() as connection:
+        assert current_revision(connection) is None
+
+
+def test_migrate_upgrades_pre_alembic_schema(scratch_engine):
+    # Rebuild the original create_all schema: every migration undone, no version table
+    migrate(scratch_engine)
+    command.downgrade(alembic_config(scratch_engine.url.render_as_string(hide_password=False)), "base")
+    with scratch_engine.begin() as connection:
+        connection.execute(text("DROP TABLE alembic_version"))
+    assert "html_gzip" not in {column["name"] for column in inspect(scratch_engine).get_columns("published_schedules")}
+
+    assert migrate(scratch_engine) == "upgraded"
+    assert check_schema_revision(scratch_engine) == SCHEMA_REVISION
+
+
+def test_default_capacities_seeded_once(scratch_engine):
+    Base.metadata.create_all(bind=scratch_engine)
+
+    with Session(scratch_engine) as db:
+        ensure_default_capacities(db)
+        ensure_default_capacities(db)
+        assert len(db.scalars(select(Capacity)).all()) == 6
@@ -0,0 +1,168 @@
+import gzip
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+import cache
+import response_compression
+from database import SessionLocal
+from models import Doctor, PublishedSchedule, Schedule
+from response_compression import CompressionMiddleware
+from utils.compression import accepts_gzip, compress_body, compress_html
+
+LARGE_JSON = b'{"rows":[' + b",".join(b'{"id":%d,"name":"Dr. Example"}' % i for i in range(200)) + b"]}"
+
+
+def build_app() -> FastAPI:
+    sample = FastAPI()
+
+    @sample.get("/large")
+    async def large():
+        return Response(LARGE_JSON, media_type="application/json")
+
+    @sample.get("/small")
+    async def small():
+        return Response(b'{"ok":true}', media_type="application/json")
+
+    @sample.get("/binary")
+    async def binary():
+        return Response(LARGE_JSON, media_type="application/octet-stream")
+
+    @sample.get("/precompressed")
+    async def precompressed():
+        return Response(compress_body(LARGE_JSON), media_type="application/json", headers={"Content-Encoding": "gzip"})
+
+    @sample.get("/stream")
+    async def stream():
+        return StreamingResponse(iter([LARGE_JSON[:2000], LARGE_JSON[2000:]]), media_type="text/csv")
+
+    sample.add_middleware(CompressionMiddleware, minimum_size=1024, content_types=["application/json", "text/csv"])
+    return sample
+
+
+@pytest.fixture
+def compressions(monkeypatch) -> list:
+    """Every compressor the middleware creates, i.e. each body it compresses."""
+    created = []
+    compressobj = response_compression.zlib.compressobj
+
+    def counting(*args):
+        created.append(args)
+        return compressobj(*args)
+
+    monkeypatch.setattr(response_compression.zlib, "compressobj", counting)
+    return created
+
+
+def raw_get(client: TestClient, path: str, **headers) -> tuple:
+    """Status, headers and undecoded body, as the client received them."""
+    with client.stream("GET", path, headers=headers) as response:
+        return response.status_code, response.headers, b"".join(response.iter_raw())
+
+
+def test_large_json_is_gzipped():
+    status, headers, body = raw_get(TestClient(build_app()), "/large", **{"Accept-Encoding": "gzip"})
+
+    assert status == 200
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Accept-Encoding"
+    assert int(headers["content-length"]) == len(body) < len(LARGE_JSON)
+    assert gzip.decompress(body) == LARGE_JSON
+
+
+@pytest.mark.parametrize("path", ["/small", "/binary"])
+def test_small_and_unlisted_bodies_are_not_compressed(path: str, compressions: list):
+    _, headers, body = raw_get(TestClient(build_app()), path, **{"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in headers
+    assert "vary" not in headers
+    assert compressions == []
+
+
+@pytest.mark.parametrize("accept_encoding", ["identity", "gzip;q=0, br"])
+def test_clients_without_gzip_get_identity_with_vary(accept_encoding: str):
+    _, headers, body = raw_get(TestClient(build_app()), "/large", **{"Accept-Encoding": accept_encoding})
+
+    assert "content-encoding" not in headers
+    assert headers["vary"] == "Accept-Encoding"
+    assert body == LARGE_JSON
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("gzip", True),
+    ("*", True),
+    ("*;q=0, gzip", True),
+    ("gzip;q=0, *", False),
+    ("br, *;q=0", False),
+    ("gzip;q=0.0000", False),
+    ("gzip;q=0;level=1", False),
+    ("GZIP; Q=0.5", True),
+    ("", False),
+    (None, False),
+])
+def test_accepts_gzip_prefers_an_explicit_gzip_entry(accept_encoding, expected: bool):
+    assert accepts_gzip(accept_encoding) is expected
+
+
+def test_precompressed_responses_pass_through(compressions: list):
+    _, headers, body = raw_get(TestClient(build_app()), "/precompressed", **{"Accept-Encoding": "gzip"})
+
+    assert headers["content-encoding"] == "gzip"
+    assert gzip.decompress(body) == LARGE_JSON
+    assert compressions == []
+
+
+def test_streaming_responses_are_compressed_incrementally():
+    _, headers, body = raw_get(TestClient(build_app()), "/stream", **{"Accept-Encoding": "gzip"})
+
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    assert gzip.decompress(body) == LARGE_JSON
+
+
+@pytest.mark.usefixtures("clean_database")
+def test_cached_doctor_week_is_served_from_stored_gzip(
+    client: TestClient, auth_headers, fake_redis, compressions: list
+):
+    with SessionLocal() as db:
+        db.add_all(Doctor(name=f"Dr. Number {index:03d}") for index in range(40))
+        db.commit()
+    headers = {**auth_headers(), "Accept-Encoding": "gzip"}
+
+    first = client.get("/api/doctors/availability?week=2024-01-01", headers=headers)
+    stored = fake_redis.keys("doctor_week:*:gzip")
+    assert len(stored) == 1
+    assert len(compressions) == 1
+
+    status, response_headers, body = raw_get(client, "/api/doctors/availability?week=2024-01-01", **headers)
+    assert status == 200
+    assert response_headers["content-encoding"] == "gzip"
+    assert body == cache.get_cached_bytes(stored[0])
+    assert gzip.decompress(body) == first.content
+    assert len(compressions) == 1
+
+    identity = client.get(
+        "/api/doctors/availability?week=2024-01-01", headers={**headers, "Accept-Encoding": "identity"}
+    )
+    assert "content-encoding" not in identity.headers
+    assert identity.content == first.content
+
+
+@pytest.mark.usefixtures("clean_database")
+def test_published_snapshot_is_never_recompressed(client: TestClient, compressions: list):
+    html = "<table>" + "<tr><td>Dr. Example</td><td>MRI</td></tr>" * 100 + "</table>"
+    with SessionLocal() as db:
+        schedule = Schedule(week_start_date=datetime(2024, 1, 1), week_end_date=datetime(2024, 1, 1) + timedelta(days=6))
+        db.add(schedule)
+        db.flush()
+        db.add(PublishedSchedule(slug="week-1", schedule_id=schedule.id, html_gzip=compress_html(html)))
+        db.commit()
+
+    _, headers, body = raw_get(client, "/api/published/week-1/html", **{"Accept-Encoding": "gzip"})
+
+    assert headers["content-encoding"] == "gzip"
+    assert body == compress_html(html)
+    assert compressions == []
@@ -0,0 +1,105 @@
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool
+
+import database
+from config import settings
+from database import InstrumentedAsyncQueuePool, InstrumentedQueuePool, PoolMetrics
+from models import UserRole
+
+POSTGRES_URL = "postgresql://user:pass@db/scheduler"
+ASYNC_POSTGRES_URL = "postgresql+asyncpg://user:pass@db/scheduler"
+
+pytestmark = pytest.mark.usefixtures("clean_database")
+
+
+def test_engine_options_follow_settings(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 3)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 2)
+    monkeypatch.setattr(settings, "DB_ASYNC_POOL_SIZE", 4)
+    monkeypatch.setattr(settings, "DB_ASYNC_MAX_OVERFLOW", 1)
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 5000)
+
+    sync_options = database._engine_options(POSTGRES_URL, is_async=False)
+    assert sync_options["poolclass"] is InstrumentedQueuePool
+    assert sync_options["pool_size"] == 3
+    assert sync_options["max_overflow"] == 2
+    assert sync_options["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+    async_options = database._engine_options(ASYNC_POSTGRES_URL, is_async=True)
+    assert async_options["poolclass"] is InstrumentedAsyncQueuePool
+    assert async_options["pool_size"] == 4
+    assert async_options["max_overflow"] == 1
+    assert async_options["connect_args"] == {"server_settings": {"statement_timeout": "5000"}}
+
+
+@pytest.mark.parametrize("url", ["sqlite://", "sqlite:///:memory:", "sqlite+aiosqlite:///:memory:"])
+def test_in_memory_sqlite_keeps_the_default_pool(url: str):
+    options = database._engine_options(url, is_async=url.startswith("sqlite+aiosqlite"))
+    assert "poolclass" not in options
+    assert "pool_size" not in options
+
+
+def test_statement_timeout_is_skipped_for_sqlite():
+    options = database._engine_options("sqlite:///./scratch.db", is_async=False)
+    assert "connect_args" not in options
+
+
+def test_pgbouncer_mode_disables_local_pooling_and_prepared_statements(monkeypatch):
+    monkeypatch.setattr(settings, "DB_PGBOUNCER", True)
+
+    sync_options = database._engine_options(POSTGRES_URL, is_async=False)
+    assert sync_options["poolclass"] is NullPool
+    assert "connect_args" not in sync_options
+
+    async_options = database._engine_options(ASYNC_POSTGRES_URL, is_async=True)
+    assert async_options["poolclass"] is NullPool
+    assert async_options["connect_args"] == {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+    }
+
+
+def test_instrumented_pool_records_checkouts_and_timeouts(tmp_path):
+    class ProbePool(InstrumentedQueuePool):
+        metrics = PoolMetrics()
+
+    probe = create_engine(
+        f"sqlite:///{tmp_path / 'probe.db'}",
+        poolclass=ProbePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    try:
+        with probe.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            with pytest.raises(PoolTimeoutError):
+                probe.connect()
+
+        snapshot = ProbePool.metrics.snapshot()
+        assert snapshot["checkouts"] == 1
+        assert snapshot["timeouts"] == 1
+        assert snapshot["wait_seconds_max"] >= 0.05
+    finally:
+        probe.dispose()
+
+
+def test_pool_health_reports_both_pools_for_admins(client: TestClient, auth_headers):
+    response = client.get("/health/pools", headers=auth_headers("admin-user", UserRole.ADMIN))
+    assert response.status_code == 200
+
+    body = response.json()
+    assert body["database"]["sync"]["pool"] == "InstrumentedQueuePool"
+    assert body["database"]["sync"]["size"] == settings.DB_POOL_SIZE
+    assert body["database"]["sync"]["checkouts"] >= 1
+    assert "async" in body["database"]
+    assert "pending" in body["password_hasher"]
+
+
+def test_pool_health_requires_admin(client: TestClient, auth_headers):
+    response = client.get("/health/pools", headers=auth_headers("viewer", UserRole.VIEWER))
+    assert response.status_code == 403
@@ -0,0 +1,481 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+
+import pytest
+from fastapi.testclient import TestClient
+
+from database import SessionLocal
+from models import Assignment, AssignmentType, Doctor, DoctorStatus, Schedule, UserRole
+from utils.pagination import encode_cursor
+
+
+pytestmark = pytest.mark.usefixtures("default_capacities")
+
+
+def create_doctor(
+    name: str,
+    position: Optional[str] = None,
+    doctor_status: DoctorStatus = DoctorStatus.ACTIVE,
+    is_active: bool = True,
+) -> int:
+    db = SessionLocal()
+    try:
+        doctor = Doctor(name=name, position=position, status=doctor_status, is_active=is_active)
+        db.add(doctor)
+        db.commit()
+        return doctor.id
+    finally:
+        db.close()
+
+
+def create_assignments(doctor_id: int, weeks: int, first_week: datetime = datetime(2024, 1, 1)) -> None:
+    db = SessionLocal()
+    try:
+        for week in range(weeks):
+            week_start = first_week + timedelta(weeks=week)
+            schedule = Schedule(week_start_date=week_start, week_end_date=week_start + timedelta(days=6))
+            db.add(schedule)
+            db.flush()
+            db.add(Assignment(
+                schedule_id=schedule.id,
+                doctor_id=doctor_id,
+                assignment_date=week_start,
+                assignment_type=AssignmentType.CT_SCAN,
+            ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def names(response) -> list:
+    assert response.status_code == 200
+    return [doctor["name"] for doctor in response.json()]
+
+
+def test_doctor_listing_is_ordered_by_name_and_paginated(client: TestClient, auth_headers):
+    headers = auth_headers()
+    for name in ["Dr. Evans", "Dr. Adams", "Dr. Chen", "Dr. Baker", "Dr. Diaz"]:
+        create_doctor(name)
+
+    first_page = client.get("/api/doctors/?limit=2", headers=headers)
+    assert names(first_page) == ["Dr. Adams", "Dr. Baker"]
+
+    second_page = client.get(
+        f"/api/doctors/?limit=2&cursor={first_page.headers['x-next-cursor']}",
+        headers=headers,
+    )
+    assert names(second_page) == ["Dr. Chen", "Dr. Diaz"]
+
+    last_page = client.get(
+        f"/api/doctors/?limit=2&cursor={second_page.headers['x-next-cursor']}",
+        headers=headers,
+    )
+    assert names(last_page) == ["Dr. Evans"]
+    assert "x-next-cursor" not in last_page.headers
+
+
+def test_doctor_listing_paginates_through_duplicate_names(client: TestClient, auth_headers):
+    headers = auth_headers()
+    ids = [create_doctor("Dr. Smith") for _ in range(3)]
+
+    first_page = client.get("/api/doctors/?limit=2", headers=headers)
+    second_page = client.get(
+        f"/api/doctors/?limit=2&cursor={first_page.headers['x-next-cursor']}",
+        headers=headers,
+    )
+
+    seen = [doctor["id"] for doctor in first_page.json() + second_page.json()]
+    assert seen == ids
+
+
+def test_doctor_listing_filters_by_status_activity_and_position(client: TestClient, auth_headers):
+    headers = auth_headers()
+    create_doctor("Dr. Adams", position="Radiologist")
+    create_doctor("Dr. Baker", position="Resident", doctor_status=DoctorStatus.ON_LEAVE)
+    create_doctor("Dr. Chen", position="Radiologist", is_active=False)
+
+    assert names(client.get("/api/doctors/?status=ON_LEAVE", headers=headers)) == ["Dr. Baker"]
+    assert names(client.get("/api/doctors/?is_active=false", headers=headers)) == ["Dr. Chen"]
+    assert names(client.get("/api/doctors/?position=Radiologist&is_active=true", headers=headers)) == ["Dr. Adams"]
+
+
+def test_doctor_listing_searches_names_by_substring_or_prefix(client: TestClient, auth_headers):
+    headers = auth_headers()
+    create_doctor("Anna Morgan")
+    create_doctor("Morgan Lee")
+    create_doctor("Ben 100%")
+
+    assert names(client.get("/api/doctors/?q=MORGAN", headers=headers)) == ["Anna Morgan", "Morgan Lee"]
+    assert names(client.get("/api/doctors/?q=morgan&match=prefix", headers=headers)) == ["Morgan Lee"]
+    assert names(client.get("/api/doctors/?q=0%25", headers=headers)) == ["Ben 100%"]
+    assert names(client.get("/api/doctors/?q=%25", headers=headers)) == ["Ben 100%"]
+
+
+def test_doctor_sidebar_returns_compact_projection(client: TestClient, auth_headers):
+    headers = auth_headers()
+    doctor_id = create_doctor("Dr. Adams", position="Radiologist", doctor_status=DoctorStatus.ON_LEAVE)
+    create_doctor("Dr. Baker", is_active=False)
+
+    response = client.get("/api/doctors/sidebar?is_active=true", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json() == [{"id": doctor_id, "name": "Dr. Adams", "status": "ON_LEAVE"}]
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor("Dr. A", "1"), encode_cursor(None, 1), encode_cursor(1, 2)])
+def test_doctor_listing_rejects_malformed_cursor(client: TestClient, auth_headers, cursor: str):
+    response = client.get(f"/api/doctors/?limit=2&cursor={cursor}", headers=auth_headers())
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid pagination cursor"
+
+
+def test_delete_doctor_with_assignments_lists_a_capped_summary(client: TestClient, auth_headers):
+    headers = auth_headers()
+    doctor_id = create_doctor("Dr. Busy")
+    create_assignments(doctor_id, weeks=12)
+
+    response = client.delete(f"/api/doctors/{doctor_id}", headers=headers)
+
+    assert response.status_code == 400
+    detail = response.json()["detail"]
+    assert "they have 12 assignment(s)" in detail
+    assert "• Jan 01, 2024 - Jan 07, 2024 (Ct Scan)" in detail
+    assert detail.count("(Ct Scan)") == 10
+    assert "• ...and 2 more" in detail
+
+
+def test_delete_doctor_without_assignments(client: TestClient, auth_headers):
+    headers = auth_headers()
+    doctor_id = create_doctor("Dr. Free")
+
+    response = client.delete(f"/api/doctors/{doctor_id}", headers=headers)
+
+    assert response.status_code == 200
+    assert client.get(f"/api/doctors/{doctor_id}", headers=headers).status_code == 404
+
+
+def test_clear_doctor_assignments_reports_deleted_count(client: TestClient, auth_headers):
+    headers = auth_headers()
+    doctor_id = create_doctor("Dr. Busy")
+    create_assignments(doctor_id, weeks=3)
+
+    response = client.delete(f"/api/doctors/{doctor_id}/assignments", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["cleared_count"] == 3
+
+    again = client.delete(f"/api/doctors/{doctor_id}/assignments", headers=headers)
+    assert again.status_code == 400
+    assert again.json()["detail"] == "Doctor 'Dr. Busy' has no assignments to clear."
+
+
+def test_doctor_assignments_are_paginated(client: TestClient, auth_headers):
+    headers = auth_headers()
+    doctor_id = create_doctor("Dr. Busy")
+    create_assignments(doctor_id, weeks=3)
+
+    first_page = client.get(f"/api/doctors/{doctor_id}/assignments?limit=2", headers=headers)
+    assert first_page.status_code == 200
+    assert [item["assignment_date"] for item in first_page.json()] == ["2024-01-01", "2024-01-08"]
+
+    second_page = client.get(
+        f"/api/doctors/{doctor_id}/assignments?limit=2&cursor={first_page.headers['x-next-cursor']}",
+        headers=headers,
+    )
+    assert [item["week_end_date"] for item in second_page.json()] == ["2024-01-21"]
+    assert "x-next-cursor" not in second_page.headers
+
+
+@pytest.mark.parametrize("cursor", [encode_cursor("2024-01-01T00:00:00", "7"), encode_cursor(20240101, 7)])
+def test_doctor_assignments_reject_wrongly_typed_cursor(client: TestClient, auth_headers, cursor: str):
+    doctor_id = create_doctor("Dr. Busy")
+
+    response = client.get(f"/api/doctors/{doctor_id}/assignments?cursor={cursor}", headers=auth_headers())
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid pagination cursor"
+
+
+def test_import_doctors_from_csv_creates_updates_and_reports_errors(client: TestClient, auth_headers):
+    headers = auth_headers()
+    existing_id = create_doctor("Dr. Old Name", position="Radiologist", doctor_status=DoctorStatus.ON_LEAVE)
+    db = SessionLocal()
+    try:
+        db.get(Doctor, existing_id).email = "old@example.com"
+        db.commit()
+    finally:
+        db.close()
+
+    body = (
+        "name,email,phone,position\n"
+        "Dr. New Name,old@example.com,,\n"
+        '"Adams, Ann",ann@example.com,555-0100,"Senior\nRadiologist"\n'
+        "Dr. Broken,not-an-email,,\n"
+        ",missing@example.com,,\n"
+        "Dr. Ann Adams,ann@example.com,,\n"
+    )
+    response = client.post(
+        "/api/doctors/import",
+        content=body.encode("utf-8"),
+        headers={**headers, "Content-Type": "text/csv"},
+    )
+
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["created"], report["updated"], report["failed"]) == (1, 2, 2)
+    statuses = [(row["row"], row["status"]) for row in report["rows"]]
+    assert statuses == [(1, "updated"), (2, "created"), (3, "error"), (4, "error"), (5, "updated")]
+    assert report["rows"][0]["doctor_id"] == existing_id
+    assert report["rows"][4]["doctor_id"] == report["rows"][1]["doctor_id"]
+    assert "Invalid email format" in report["rows"][2]["error"]
+    assert report["rows"][3]["error"].startswith("name:")
+
+    doctors = {doctor["email"]: doctor for doctor in client.get("/api/doctors/", headers=headers).json()}
+    assert doctors["old@example.com"]["name"] == "Dr. New Name"
+    # Fields absent from the row are left alone on update
+    assert doctors["old@example.com"]["position"] == "Radiologist"
+    assert doctors["old@example.com"]["status"] == "ON_LEAVE"
+    assert doctors["ann@example.com"]["name"] == "Dr. Ann Adams"
+    assert doctors["ann@example.com"]["position"] == "Senior\nRadiologist"
+
+
+def test_import_doctors_from_ndjson_in_multiple_batches(client: TestClient, auth_headers):
+    headers = auth_headers()
+    lines = [f'{{"name": "Dr. {index:05d}", "email": "doc{index}@example.com"}}' for index in range(1200)]
+    lines.insert(3, "not json")
+
+    def chunks():
+        body = "\n".join(lines).encode("utf-8")
+        for start in range(0, len(body), 1000):
+            yield body[start:start + 1000]
+
+    response = client.post(
+        "/api/doctors/import",
+        content=chunks(),
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["created"], report["updated"], report["failed"]) == (1200, 0, 1)
+    assert report["rows"][3]["error"].startswith("Invalid JSON")
+    assert len(client.get("/api/doctors/", headers=headers).json()) == 1200
+
+
+def test_import_doctors_twice_without_emails_updates_by_name(client: TestClient, auth_headers):
+    headers = auth_headers()
+    body = b'{"Name": "Dr. No Email", "Position": "Radiologist"}\n{"NAME": "Dr. Other"}\n'
+
+    for _ in range(2):
+        response = client.post(
+            "/api/doctors/import",
+            content=body,
+            headers={**headers, "Content-Type": "application/x-ndjson"},
+        )
+        assert response.status_code == 200
+    report = response.json()
+
+    assert (report["created"], report["updated"], report["failed"]) == (0, 2, 0)
+    doctors = client.get("/api/doctors/", headers=headers).json()
+    assert sorted(doctor["name"] for doctor in doctors) == ["Dr. No Email", "Dr. Other"]
+    assert {doctor["name"]: doctor["position"] for doctor in doctors}["Dr. No Email"] == "Radiologist"
+
+
+def test_import_doctors_writes_nothing_when_the_upload_fails_midway(client: TestClient, auth_headers, monkeypatch):
+    import routers.doctors as doctors_router
+
+    monkeypatch.setattr(doctors_router, "IMPORT_BATCH_SIZE", 1)
+    headers = auth_headers()
+
+    def chunks():
+        yield b"name\nDr. First\nDr. Second\n"
+        yield b"Dr. \xff\n"
+
+    response = client.post(
+        "/api/doctors/import",
+        content=chunks(),
+        headers={**headers, "Content-Type": "text/csv"},
+    )
+
+    assert response.status_code == 400
+    assert client.get("/api/doctors/", headers=headers).json() == []
+
+
+def test_import_doctors_rejects_unknown_content_type_and_viewers(client: TestClient, auth_headers):
+    headers = auth_headers()
+    response = client.post(
+        "/api/doctors/import",
+        content=b"<doctors/>",
+        headers={**headers, "Content-Type": "application/xml"},
+    )
+    assert response.status_code == 415
+
+    viewer_headers = auth_headers("viewer", UserRole.VIEWER)
+    response = client.post(
+        "/api/doctors/import",
+        content=b"name\nDr. A\n",
+        headers={**viewer_headers, "Content-Type": "text/csv"},
+    )
+    assert response.status_code == 403
+
+
+def test_doctor_availability_entries_and_sidebar_flag(client: TestClient, auth_headers):
+    headers = auth_headers()
+    on_leave_id = create_doctor("Dr. Away")
+    free_id = create_doctor("Dr. Here")
+
+    created = client.post(
+        f"/api/doctors/{on_leave_id}/availability",
+        json={"kind": "LEAVE", "start_date": "2024-01-01", "end_date": "2024-01-07", "note": "Holiday"},
+        headers=headers,
+    )
+    assert created.status_code == 200
+    assert created.json()["weekdays"] is None
+
+    sidebar = client.get("/api/doctors/sidebar?available_on=2024-01-03", headers=headers).json()
+    assert {entry["id"]: entry["available"] for entry in sidebar} == {on_leave_id: False, free_id: True}
+    assert "available" not in client.get("/api/doctors/sidebar", headers=headers).json()[0]
+
+    listed = client.get(f"/api/doctors/{on_leave_id}/availability?start=2024-01-05", headers=headers)
+    assert [entry["note"] for entry in listed.json()] == ["Holiday"]
+    assert client.get(f"/api/doctors/{on_leave_id}/availability?start=2024-01-08", headers=headers).json() == []
+
+    deleted = client.delete(f"/api/doctors/{on_leave_id}/availability/{created.json()['id']}", headers=headers)
+    assert deleted.status_code == 200
+    sidebar = client.get("/api/doctors/sidebar?available_on=2024-01-03", headers=headers).json()
+    assert all(entry["available"] for entry in sidebar)
+
+
+def test_doctor_availability_validates_ranges_and_weekdays(client: TestClient, auth_headers):
+    headers = auth_headers()
+    doctor_id = create_doctor("Dr. Part")
+
+    backwards = client.post(
+        f"/api/doctors/{doctor_id}/availability",
+        json={"kind": "LEAVE", "start_date": "2024-01-07", "end_date": "2024-01-01"},
+        headers=headers,
+    )
+    assert backwards.status_code == 422
+
+    no_weekdays = client.post(
+        f"/api/doctors/{doctor_id}/availability",
+        json={"kind": "PART_TIME", "start_date": "2024-01-01", "end_date": "2024-06-30"},
+        headers=headers,
+    )
+    assert no_weekdays.status_code == 422
+
+    part_time = client.post(
+        f"/api/doctors/{doctor_id}/availability",
+        json={"kind": "PART_TIME", "start_date": "2024-01-01", "end_date": "2024-06-30", "weekdays": [4, 0, 4]},
+        headers=headers,
+    )
+    assert part_time.status_code == 200
+    assert part_time.json()["weekdays"] == [0, 4]
+
+
+def create_week_schedule(week_start: datetime) -> int:
+    db = SessionLocal()
+    try:
+        schedule = Schedule(week_start_date=week_start, week_end_date=week_start + timedelta(days=6))
+        db.add(schedule)
+        db.commit()
+        return schedule.id
+    finally:
+        db.close()
+
+
+def test_week_availability_reports_bookings_load_and_leave(client: TestClient, auth_headers):
+    headers = auth_headers()
+    busy_id = create_doctor("Dr. Busy")
+    away_id = create_doctor("Dr. Away")
+    create_doctor("Dr. Gone", is_active=False)
+    schedule_id = create_week_schedule(datetime(2024, 1, 1))
+    for day, assignment_type in [(1, "CT_SCAN"), (2, "CT_SCAN"), (3, "MRI")]:
+        response = client.post(
+            f"/api/schedules/{schedule_id}/assignments",
+            json={"doctor_id": busy_id, "assignment_date": f"2024-01-0{day}", "assignment_type": assignment_type},
+            headers=headers,
+        )
+        assert response.status_code == 200, response.text
+    client.post(
+        f"/api/doctors/{away_id}/availability",
+        json={"kind": "CONFERENCE", "start_date": "2023-12-30", "end_date": "2024-01-02"},
+        headers=headers,
+    )
+
+    # Any day of the week resolves to its Monday
+    response = client.get("/api/doctors/availability?week=2024-01-03", headers=headers)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["week_start_date"] == "2024-01-01"
+    assert body["schedule_version"] == 4
+    assert [doctor["name"] for doctor in body["doctors"]] == ["Dr. Away", "Dr. Busy"]
+    away, busy = body["doctors"]
+    assert busy["booked_dates"] == ["2024-01-01", "2024-01-02", "2024-01-03"]
+    assert busy["assignment_counts"] == {"CT_SCAN": 2, "MRI": 1}
+    assert busy["total_assignments"] == 3
+    assert busy["unavailable"] == {}
+    assert away["booked_dates"] == [] and away["total_assignments"] == 0
+    assert away["unavailable"] == {"2024-01-01": ["CONFERENCE"], "2024-01-02": ["CONFERENCE"]}
+
+
+def test_week_availability_is_cached_per_schedule_version(client: TestClient, auth_headers, fake_redis):
+    headers = auth_headers()
+    doctor_id = create_doctor("Dr. Busy")
+    schedule_id = create_week_schedule(datetime(2024, 1, 1))
+
+    first = client.get("/api/doctors/availability?week=2024-01-01", headers=headers).json()
+    assert first["doctors"][0]["total_assignments"] == 0
+    assert len(fake_redis.keys("doctor_week:*")) == 1
+
+    # Stale rows written behind the API's back are served from the cache...
+    db = SessionLocal()
+    try:
+        db.get(Doctor, doctor_id).name = "Dr. Renamed Directly"
+        db.commit()
+    finally:
+        db.close()
+    cached = client.get("/api/doctors/availability?week=2024-01-01", headers=headers).json()
+    assert cached == first
+
+    # ...until an assignment change bumps the schedule version
+    client.post(
+        f"/api/schedules/{schedule_id}/assignments",
+        json={"doctor_id": doctor_id, "assignment_date": "2024-01-02", "assignment_type": "CT_SCAN"},
+        headers=headers,
+    )
+    refreshed = client.get("/api/doctors/availability?week=2024-01-01", headers=headers).json()
+    assert refreshed["schedule_version"] == 2
+    assert refreshed["doctors"][0]["name"] == "Dr. Renamed Directly"
+    assert refreshed["doctors"][0]["total_assignments"] == 1
+
+    # Doctor edits bump the doctor generation
+    client.put(f"/api/doctors/{doctor_id}", json={"name": "Dr. Edited"}, headers=headers)
+    edited = client.get("/api/doctors/availability?week=2024-01-01", headers=headers).json()
+    assert edited["doctors"][0]["name"] == "Dr. Edited"
+
+
+def test_week_availability_calls_redis_off_the_event_loop(client: TestClient, auth_headers, fake_redis, monkeypatch):
+    headers = auth_headers()
+    create_doctor("Dr. Busy")
+    on_loop = []
+    execute_command = fake_redis.execute_command
+
+    def recording_execute_command(*args, **kwargs):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return execute_command(*args, **kwargs)
+
+    monkeypatch.setattr(fake_redis, "execute_command", recording_execute_command)
+
+    # A miss reads and then fills the cache, a hit only reads it
+    client.get("/api/doctors/availability?week=2024-01-01", headers=headers)
+    client.get("/api/doctors/availability?week=2024-01-01", headers=headers)
+
+    assert on_loop
+    assert not any(on_loop)
@@ -0,0 +1,75 @@
+from collections import Counter
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from database import engine, SessionLocal
+from generate_dataset import GeneratorConfig, generate
+from models import Assignment, Capacity, Doctor, DoctorAvailability, PublishedSchedule, Schedule
+from routers.published import validate_schedule_completeness
+from utils.availability import AvailabilityIndex
+from utils.compression import decompress_html
+
+CONFIG = GeneratorConfig(years=0.25, doctors=40, start=date(2024, 1, 1), versions=2)
+
+pytestmark = pytest.mark.usefixtures("default_capacities")
+
+
+def load(config: GeneratorConfig = CONFIG) -> dict:
+    with engine.begin() as connection:
+        return generate(connection, config)
+
+
+def test_generates_requested_volume():
+    counts = load()
+
+    assert counts["doctors"] == 40
+    assert counts["schedules"] == 13
+    assert counts["published_schedules"] == 26
+    with SessionLocal() as db:
+        assert db.scalar(select(func.count()).select_from(Assignment)) == counts["assignments"]
+        assert db.scalar(select(func.count()).select_from(DoctorAvailability)) == counts["availability"]
+
+
+def test_assignments_respect_scheduling_rules():
+    load()
+
+    with SessionLocal() as db:
+        capacities = dict(db.execute(select(Capacity.assignment_type, Capacity.max_capacity)).all())
+        assignments = db.scalars(select(Assignment)).all()
+        availability = AvailabilityIndex(db.scalars(select(DoctorAvailability)).all())
+        inactive = set(db.scalars(select(Doctor.id).where(Doctor.is_active.is_(False))))
+
+        per_cell = Counter((a.assignment_date, a.assignment_type) for a in assignments)
+        assert all(count <= capacities[cell[1]] for cell, count in per_cell.items())
+
+        per_doctor_day = Counter((a.doctor_id, a.assignment_date) for a in assignments)
+        assert max(per_doctor_day.values()) == 1
+
+        assert all(availability.is_available(a.doctor_id, a.assignment_date.date()) for a in assignments)
+        assert not inactive & {a.doctor_id for a in assignments}
+
+        # Every week is publishable
+        for schedule in db.scalars(select(Schedule)):
+            week_dates = [schedule.week_start_date + timedelta(days=day) for day in range(7)]
+            validate_schedule_completeness([a for a in assignments if a.schedule_id == schedule.id], week_dates)
+
+
+def test_snapshots_are_decodable_and_slugs_unique():
+    load()
+
+    with SessionLocal() as db:
+        snapshots = db.scalars(select(PublishedSchedule)).all()
+        assert len({snapshot.slug for snapshot in snapshots}) == len(snapshots)
+        assert "<html" in decompress_html(snapshots[0].html_gzip).lower()
+
+
+def test_same_seed_gives_same_data_and_reruns_append():
+    first = load()
+    second = load()
+
+    assert first == second
+    with SessionLocal() as db:
+        names = db.scalars(select(Doctor.name).order_by(Doctor.id)).all()
+    assert names[:40] == names[40:]
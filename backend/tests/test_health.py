@@ -0,0 +1,120 @@
+import time
+
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+
+import health
+from health import HealthMonitor
+
+pytestmark = pytest.mark.usefixtures("clean_database")
+
+
+@pytest.fixture
+def monitor(monkeypatch) -> HealthMonitor:
+    """A monitor that only refreshes when a test asks it to."""
+    test_monitor = HealthMonitor(interval=60, timeout=1)
+    monkeypatch.setattr(health, "health_monitor", test_monitor)
+    monkeypatch.setattr(health, "redis_client", fakeredis.FakeRedis())
+    return test_monitor
+
+
+def test_livez_answers_without_dependencies(client: TestClient, monitor: HealthMonitor):
+    response = client.get("/livez")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "alive"}
+    assert monitor.status is None
+
+
+def test_readyz_not_ready_before_first_check(client: TestClient, monitor: HealthMonitor):
+    response = client.get("/readyz")
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "starting"
+
+
+def test_readyz_serves_cached_status(client: TestClient, monitor: HealthMonitor, monkeypatch):
+    client.portal.call(monitor.refresh)
+    pings = []
+    monkeypatch.setattr(monitor, "_ping_database", lambda: pings.append("database"))
+
+    for _ in range(5):
+        response = client.get("/readyz")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert body["services"]["database"]["status"] == "connected"
+    assert body["services"]["redis"]["status"] == "connected"
+    assert "sync" in body["pool_saturation"]
+    assert pings == []
+
+
+def test_readyz_degraded_without_redis(client: TestClient, monitor: HealthMonitor, monkeypatch):
+    def unreachable():
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(health.redis_client, "ping", unreachable)
+    client.portal.call(monitor.refresh)
+
+    response = client.get("/readyz")
+    assert response.status_code == 200
+    assert response.json()["status"] == "degraded"
+    assert client.get("/health").json()["services"]["redis"] == "unavailable"
+
+
+def test_readyz_fails_when_database_unavailable(client: TestClient, monitor: HealthMonitor, monkeypatch):
+    async def broken():
+        raise OSError("connection refused")
+
+    monkeypatch.setattr(monitor, "_ping_database", broken)
+    client.portal.call(monitor.refresh)
+
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["reasons"] == ["database unavailable"]
+    assert client.get("/health").status_code == 503
+
+
+def test_readyz_sheds_traffic_when_pool_saturated(client: TestClient, monitor: HealthMonitor, monkeypatch):
+    monkeypatch.setattr(health, "pool_status", lambda: {
+        "sync": {"size": 10, "max_overflow": 10, "checked_out": 19, "idle": 0},
+        "async": {"size": 10, "max_overflow": -1, "checked_out": 50, "idle": 0},
+    })
+    client.portal.call(monitor.refresh)
+
+    body = client.get("/readyz").json()
+    assert body["status"] == "not_ready"
+    assert body["pool_saturation"] == {"sync": 0.95}
+    assert body["reasons"] == ["sync pool 95% checked out"]
+
+
+def test_readyz_sheds_traffic_when_event_loop_lags(client: TestClient, monitor: HealthMonitor):
+    client.portal.call(monitor.refresh)
+    monitor._lags.append(0.8)
+
+    body = client.get("/readyz").json()
+    assert body["status"] == "not_ready"
+    assert body["event_loop_lag_ms"] == 800.0
+
+
+def test_readyz_fails_when_status_is_stale(client: TestClient, monitor: HealthMonitor):
+    client.portal.call(monitor.refresh)
+    monitor.refreshed_at = time.monotonic() - 4 * monitor.interval
+
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert "old" in response.json()["reasons"][0]
+
+
+def test_lag_sampler_measures_blocked_loop(client: TestClient, monitor: HealthMonitor):
+    async def block_loop():
+        await monitor.start()
+        await health.asyncio.sleep(0.05)
+        time.sleep(health.LAG_SAMPLE_SECONDS + 0.3)
+        await health.asyncio.sleep(0.05)
+        await monitor.stop()
+
+    client.portal.call(block_loop)
+    assert monitor.event_loop_lag >= 0.25
@@ -0,0 +1,85 @@
+
+import fakeredis
+import pytest
+import redis
+from fastapi.testclient import TestClient
+
+import cache
+from database import SessionLocal
+from metrics import registry
+from models import Doctor, UserRole
+
+
+@pytest.fixture(autouse=True)
+def metrics_doctor(clean_database):
+    """A doctor for the /api/doctors/{doctor_id} requests to find."""
+    with SessionLocal() as db:
+        db.add(Doctor(name="Dr. Metrics"))
+        db.commit()
+
+
+def sample(name: str, **labels) -> float:
+    return registry.get_sample_value(name, labels) or 0.0
+
+
+def test_request_latency_is_labelled_by_route_template(client: TestClient, auth_headers):
+    headers = auth_headers("viewer", UserRole.VIEWER)
+    before = sample("http_request_duration_seconds_count", method="GET", route="/api/doctors/{doctor_id}", status="200")
+
+    assert client.get("/api/doctors/1", headers=headers).status_code == 200
+    assert client.get("/api/doctors/999", headers=headers).status_code == 404
+
+    assert sample(
+        "http_request_duration_seconds_count", method="GET", route="/api/doctors/{doctor_id}", status="200"
+    ) == before + 1
+    assert sample("http_request_duration_seconds_count", method="GET", route="/api/doctors/{doctor_id}", status="404") >= 1
+
+
+@pytest.mark.parametrize("path, route", [
+    ("/api/doctors/1", "/api/doctors/{doctor_id}"),
+    ("/api/doctors/?limit=5", "/api/doctors/"),
+])
+def test_sql_statements_are_counted_per_request(client: TestClient, auth_headers, path: str, route: str):
+    headers = auth_headers("viewer", UserRole.VIEWER)
+    client.get(path, headers=headers)
+    count_before = sample("db_queries_per_request_count", route=route)
+    queries_before = sample("db_queries_per_request_sum", route=route)
+
+    assert client.get(path, headers=headers).status_code == 200
+
+    assert sample("db_queries_per_request_count", route=route) == count_before + 1
+    assert sample("db_queries_per_request_sum", route=route) > queries_before
+
+
+def test_unmatched_paths_share_one_label(client: TestClient):
+    client.get("/no/such/path")
+    assert sample("http_request_duration_seconds_count", method="GET", route="unmatched", status="404") >= 1
+
+
+def test_redis_commands_and_pipelines_are_timed():
+    pool = redis.ConnectionPool(connection_class=fakeredis.FakeConnection, server=fakeredis.FakeServer())
+    timed = cache.TimedRedis(connection_pool=pool)
+    seen = []
+    timed.on_command = lambda command, seconds: seen.append(command)
+
+    timed.set("key", 1)
+    pipe = timed.pipeline()
+    pipe.incr("key")
+    pipe.get("key")
+    pipe.execute()
+
+    assert seen == ["SET", "PIPELINE"]
+
+
+def test_metrics_endpoint_exposes_pools_and_caches(client: TestClient, monkeypatch):
+    monkeypatch.setattr(cache, "redis_client", fakeredis.FakeRedis(decode_responses=True))
+    cache.get_cached("doctor_week:2024-01-01:1:0")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'db_pool_checkouts_total{pool="sync"}' in body
+    assert 'cache_lookups_total{cache="doctor_week",result="miss"}' in body
+    assert 'cache_lookups_total{cache="principal",result="hit"}' in body
+    assert "http_requests_in_flight" in body
@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from database import SessionLocal
+from models import PublishedSchedule, Schedule, UserRole
+from utils.pagination import encode_cursor
+
+pytestmark = pytest.mark.usefixtures("clean_database")
+SNAPSHOT_HTML = "<html><body>" + "<div class=\"doctor-name\">Dr. Test</div>" * 50 + "</body></html>"
+
+
+def create_published_schedule(slug: str, week_start: datetime, html: str = SNAPSHOT_HTML) -> int:
+    db = SessionLocal()
+    try:
+        schedule = Schedule(
+            week_start_date=week_start,
+            week_end_date=week_start + timedelta(days=6),
+            is_published=True,
+        )
+        db.add(schedule)
+        db.flush()
+        published = PublishedSchedule(slug=slug, schedule_id=schedule.id, html_content=html)
+        db.add(published)
+        db.commit()
+        return published.id
+    finally:
+        db.close()
+
+
+def test_snapshot_is_stored_compressed():
+    create_published_schedule("abc12345", datetime(2024, 1, 1))
+
+    db = SessionLocal()
+    try:
+        published = db.query(PublishedSchedule).filter(PublishedSchedule.slug == "abc12345").one()
+        assert published.html_gzip[:2] == b"\x1f\x8b"
+        assert len(published.html_gzip) < len(SNAPSHOT_HTML)
+        assert published.html_content == SNAPSHOT_HTML
+    finally:
+        db.close()
+
+
+def test_get_published_schedule_returns_decompressed_html(client: TestClient):
+    create_published_schedule("abc12345", datetime(2024, 1, 1))
+
+    response = client.get("/api/published/abc12345")
+
+    assert response.status_code == 200
+    assert response.json() == {"html_content": SNAPSHOT_HTML}
+
+
+def test_published_html_serves_stored_gzip_bytes(client: TestClient):
+    create_published_schedule("abc12345", datetime(2024, 1, 1))
+
+    response = client.get(
+        "/api/published/abc12345/html",
+        headers={"Accept-Encoding": "gzip"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("text/html")
+    # httpx transparently decodes the gzip body
+    assert response.text == SNAPSHOT_HTML
+
+
+def test_published_html_decompresses_for_identity_clients(client: TestClient):
+    create_published_schedule("abc12345", datetime(2024, 1, 1))
+
+    response = client.get(
+        "/api/published/abc12345/html",
+        headers={"Accept-Encoding": "identity"},
+    )
+
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.text == SNAPSHOT_HTML
+
+
+def test_unknown_slug_returns_404(client: TestClient):
+    response = client.get("/api/published/missing/html")
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Published schedule not found"
+
+
+def test_published_listing_is_newest_first_and_paginated(client: TestClient, auth_headers):
+    headers = auth_headers("viewer", UserRole.VIEWER)
+    ids = [
+        create_published_schedule(f"slug{week}", datetime(2024, 1, 1) + timedelta(weeks=week))
+        for week in range(5)
+    ]
+
+    first_page = client.get("/api/published/?limit=2", headers=headers)
+    assert first_page.status_code == 200
+    assert [item["id"] for item in first_page.json()] == [ids[4], ids[3]]
+    cursor = first_page.headers["x-next-cursor"]
+
+    second_page = client.get(f"/api/published/?limit=2&cursor={cursor}", headers=headers)
+    assert [item["id"] for item in second_page.json()] == [ids[2], ids[1]]
+
+    last_page = client.get(
+        f"/api/published/?limit=2&cursor={second_page.headers['x-next-cursor']}",
+        headers=headers,
+    )
+    assert [item["id"] for item in last_page.json()] == [ids[0]]
+    assert "x-next-cursor" not in last_page.headers
+
+
+def test_published_listing_filters_by_week_range(client: TestClient, auth_headers):
+    headers = auth_headers("viewer", UserRole.VIEWER)
+    for week in range(5):
+        create_published_schedule(f"slug{week}", datetime(2024, 1, 1) + timedelta(weeks=week))
+
+    response = client.get(
+        "/api/published/?week_from=2024-01-08&week_to=2024-01-22",
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    assert [item["week_start_date"] for item in response.json()] == [
+        "2024-01-22",
+        "2024-01-15",
+        "2024-01-08",
+    ]
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor("abc"), encode_cursor(None), encode_cursor(True)])
+def test_published_listing_rejects_malformed_cursor(client: TestClient, auth_headers, cursor: str):
+    headers = auth_headers("viewer", UserRole.VIEWER)
+    response = client.get(f"/api/published/?limit=2&cursor={cursor}", headers=headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid pagination cursor"
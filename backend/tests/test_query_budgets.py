@@ -0,0 +1,107 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from config import settings
+from database import engine, SessionLocal
+from models import Assignment, AssignmentType, Doctor, Schedule
+from metrics import MetricsMiddleware
+
+pytestmark = pytest.mark.usefixtures("clean_database")
+
+FIRST_WEEK = datetime(2024, 1, 1)
+WEEKDAY_TYPES = [
+    AssignmentType.ULTRASOUND_MORNING,
+    AssignmentType.ULTRASOUND_AFTERNOON,
+    AssignmentType.XRAY,
+    AssignmentType.CT_SCAN,
+    AssignmentType.MRI,
+    AssignmentType.DUTY,
+]
+
+
+def create_full_weeks(weeks: int) -> None:
+    """Complete weeks, each cell staffed by a different doctor."""
+    db = SessionLocal()
+    try:
+        for week in range(weeks):
+            week_start = FIRST_WEEK + timedelta(weeks=week)
+            schedule = Schedule(week_start_date=week_start, week_end_date=week_start + timedelta(days=6))
+            db.add(schedule)
+            db.flush()
+            for day in range(7):
+                types = WEEKDAY_TYPES if day < 4 else [AssignmentType.DUTY]
+                for assignment_type in types:
+                    doctor = Doctor(name=f"Dr. {week}-{day}-{assignment_type.value}")
+                    db.add(doctor)
+                    db.flush()
+                    db.add(Assignment(
+                        schedule_id=schedule.id,
+                        doctor_id=doctor.id,
+                        assignment_date=week_start + timedelta(days=day),
+                        assignment_type=assignment_type,
+                    ))
+        db.commit()
+    finally:
+        db.close()
+
+
+# Budgets include the principal lookup made by get_current_user.
+@pytest.mark.parametrize("method, path, budget", [
+    ("GET", "/api/schedules/", 3),
+    ("GET", "/api/schedules/1", 3),
+    ("GET", f"/api/schedules/week/{FIRST_WEEK.date().isoformat()}", 3),
+    ("GET", "/api/doctors/?limit=50", 2),
+    ("GET", "/api/doctors/sidebar", 2),
+    ("POST", "/api/published/1/publish", 7),
+])
+def test_endpoint_stays_within_query_budget(
+    client: TestClient, auth_headers, query_budget, method: str, path: str, budget: int
+):
+    headers = auth_headers()
+    create_full_weeks(3)
+
+    with query_budget(budget):
+        response = client.request(method, path, headers=headers, json={} if method == "POST" else None)
+    assert response.status_code == 200
+
+
+def test_middleware_warns_about_repeated_statements(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "QUERY_DUPLICATE_THRESHOLD", 3)
+    monkeypatch.setattr(settings, "QUERY_BUDGET_PER_REQUEST", 0)
+
+    async def looping_endpoint(scope, receive, send):
+        with engine.connect() as connection:
+            for _ in range(4):
+                connection.execute(text("SELECT 1"))
+
+    middleware = MetricsMiddleware(looping_endpoint)
+    with caplog.at_level(logging.WARNING, logger="metrics"):
+        asyncio.run(middleware({"type": "http", "method": "GET", "path": "/loop"}, None, None))
+
+    assert len(caplog.records) == 1
+    message = caplog.records[0].getMessage()
+    assert "GET /loop ran the same SQL statement 4 times" in message
+    assert "looping_endpoint" in message
+
+
+def test_middleware_warns_over_budget(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "QUERY_DUPLICATE_THRESHOLD", 0)
+    monkeypatch.setattr(settings, "QUERY_BUDGET_PER_REQUEST", 2)
+
+    async def chatty_endpoint(scope, receive, send):
+        with engine.connect() as connection:
+            for value in range(3):
+                connection.execute(text(f"SELECT {value}"))
+
+    middleware = MetricsMiddleware(chatty_endpoint)
+    with caplog.at_level(logging.WARNING, logger="metrics"):
+        asyncio.run(middleware({"type": "http", "method": "GET", "path": "/chatty"}, None, None))
+
+    assert [record.getMessage().splitlines()[0] for record in caplog.records] == [
+        "GET /chatty ran 3 SQL statements, over the budget of 2; first statement over budget from:"
+    ]
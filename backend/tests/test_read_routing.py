@@ -0,0 +1,144 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+import read_routing
+from database import Base, SessionLocal
+from models import Doctor, PublishedSchedule, Schedule, UserRole
+from utils.compression import compress_html
+
+pytestmark = pytest.mark.usefixtures("clean_database")
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch) -> sessionmaker:
+    """A second SQLite file standing in for the read replica."""
+    path = tmp_path / "replica.db"
+    replica_engine = create_engine(f"sqlite:///{path}")
+    async_replica_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    Base.metadata.create_all(bind=replica_engine)
+
+    replica_sessions = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    monkeypatch.setattr(read_routing, "read_replica_configured", True)
+    monkeypatch.setattr(read_routing, "ReadSessionLocal", replica_sessions)
+    monkeypatch.setattr(
+        read_routing,
+        "AsyncReadSessionLocal",
+        async_sessionmaker(async_replica_engine, expire_on_commit=False),
+    )
+    monkeypatch.setattr(read_routing, "redis_client", fakeredis.FakeRedis(decode_responses=True))
+    yield replica_sessions
+    replica_engine.dispose()
+
+
+def add_schedule(session_factory: sessionmaker, week_start: datetime) -> None:
+    db = session_factory()
+    try:
+        db.add(Schedule(week_start_date=week_start, week_end_date=week_start + timedelta(days=6)))
+        db.commit()
+    finally:
+        db.close()
+
+
+def listed_weeks(client: TestClient, headers: dict) -> list:
+    response = client.get("/api/schedules/", headers=headers)
+    assert response.status_code == 200
+    return [schedule["week_start_date"] for schedule in response.json()]
+
+
+def test_reads_use_primary_without_replica(client: TestClient, auth_headers):
+    add_schedule(SessionLocal, datetime(2024, 1, 1))
+    assert listed_weeks(client, auth_headers("viewer", UserRole.VIEWER)) == ["2024-01-01"]
+
+
+def test_reads_go_to_replica(client: TestClient, auth_headers, replica: sessionmaker):
+    add_schedule(SessionLocal, datetime(2024, 1, 1))
+    add_schedule(replica, datetime(2024, 1, 8))
+
+    assert listed_weeks(client, auth_headers("viewer", UserRole.VIEWER)) == ["2024-01-08"]
+
+
+def test_writer_reads_own_writes_from_primary(client: TestClient, auth_headers, replica: sessionmaker):
+    editor = auth_headers("editor")
+    viewer = auth_headers("viewer", UserRole.VIEWER)
+
+    response = client.post("/api/schedules/", json={"week_start_date": "2024-01-01"}, headers=editor)
+    assert response.status_code == 200
+
+    assert listed_weeks(client, editor) == ["2024-01-01"]
+    assert listed_weeks(client, viewer) == []
+
+
+def test_failed_write_does_not_pin(client: TestClient, auth_headers, replica: sessionmaker):
+    viewer = auth_headers("viewer", UserRole.VIEWER)
+    add_schedule(SessionLocal, datetime(2024, 1, 1))
+
+    response = client.post("/api/schedules/", json={"week_start_date": "2024-01-08"}, headers=viewer)
+    assert response.status_code == 403
+    assert listed_weeks(client, viewer) == []
+
+
+def test_pin_expires(client: TestClient, auth_headers, replica: sessionmaker):
+    editor = auth_headers("editor")
+    client.post("/api/schedules/", json={"week_start_date": "2024-01-01"}, headers=editor)
+
+    read_routing.redis_client.delete(f"{read_routing.PIN_KEY_PREFIX}editor")
+    assert listed_weeks(client, editor) == []
+
+
+def test_public_slug_lookup_uses_replica(client: TestClient, replica: sessionmaker):
+    add_schedule(replica, datetime(2024, 1, 1))
+    db = replica()
+    try:
+        db.add(PublishedSchedule(slug="week-1", schedule_id=1, html_gzip=compress_html("<p>Roster</p>")))
+        db.commit()
+    finally:
+        db.close()
+
+    response = client.get("/api/published/week-1")
+    assert response.status_code == 200
+    assert response.json() == {"html_content": "<p>Roster</p>"}
+
+
+def test_cached_week_availability_reads_primary(client: TestClient, auth_headers, replica: sessionmaker):
+    # Its cache key follows the doctor generation, which a write bumps before
+    # the replica catches up; replica rows would be cached under the new key
+    with SessionLocal() as db:
+        db.add(Doctor(name="Dr. Primary Only"))
+        db.commit()
+
+    response = client.get("/api/doctors/availability?week=2024-01-01", headers=auth_headers("viewer", UserRole.VIEWER))
+    assert response.status_code == 200
+    assert [doctor["name"] for doctor in response.json()["doctors"]] == ["Dr. Primary Only"]
+
+
+def test_async_reads_check_pins_off_the_event_loop(
+    client: TestClient, auth_headers, replica: sessionmaker, monkeypatch
+):
+    headers = auth_headers("viewer", UserRole.VIEWER)
+    checks = []
+
+    def is_pinned(subject: str) -> bool:
+        try:
+            asyncio.get_running_loop()
+            checks.append((subject, "event loop"))
+        except RuntimeError:
+            checks.append((subject, "worker thread"))
+        return False
+
+    def verify_token(token: str):
+        raise AssertionError("read routing decoded the token again")
+
+    monkeypatch.setattr(read_routing, "is_pinned", is_pinned)
+    monkeypatch.setattr(read_routing, "verify_token", verify_token)
+
+    response = client.get("/api/doctors/sidebar", headers=headers)
+    assert response.status_code == 200
+    assert checks == [("viewer", "worker thread")]
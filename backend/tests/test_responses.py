@@ -0,0 +1,147 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import List
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+from database import engine
+from generate_dataset import GeneratorConfig, generate
+from models import UserRole
+from routers.doctors import DoctorAssignmentResponse, DoctorResponse, DoctorSidebarEntry
+from routers.published import PublishedScheduleResponse
+from routers.schedules import ScheduleResponse
+import utils.responses
+from utils.responses import COMPACT_JSON_MEDIA_TYPE, COMPACT_MSGPACK_MEDIA_TYPE, trusted_json
+
+FIRST_WEEK = date(2024, 1, 1)
+
+
+@pytest.fixture(autouse=True)
+def generated_dataset(default_capacities):
+    with engine.begin() as connection:
+        generate(connection, GeneratorConfig(years=0.1, doctors=25, start=FIRST_WEEK, versions=2))
+
+
+@pytest.fixture
+def headers(auth_headers) -> dict:
+    return auth_headers("reader", UserRole.ADMIN)
+
+
+# Trusted payloads skip validation, so each must be byte-for-byte what
+# FastAPI would have produced through the route's response model.
+@pytest.mark.parametrize("path, model, exclude_none", [
+    ("/api/schedules/", List[ScheduleResponse], False),
+    ("/api/schedules/1", ScheduleResponse, False),
+    (f"/api/schedules/week/{FIRST_WEEK.isoformat()}", ScheduleResponse, False),
+    ("/api/doctors/", List[DoctorResponse], False),
+    ("/api/doctors/sidebar", List[DoctorSidebarEntry], True),
+    (f"/api/doctors/sidebar?available_on={FIRST_WEEK.isoformat()}", List[DoctorSidebarEntry], True),
+    ("/api/doctors/1/assignments", List[DoctorAssignmentResponse], False),
+    ("/api/published/", List[PublishedScheduleResponse], False),
+])
+def test_trusted_payload_matches_response_model(
+    client: TestClient, headers: dict, path: str, model, exclude_none: bool
+):
+    response = client.get(path, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+
+    adapter = TypeAdapter(model)
+    payload = response.json()
+    assert payload
+    assert adapter.dump_json(adapter.validate_json(response.content), exclude_none=exclude_none) == response.content
+
+
+def test_trusted_payload_keeps_pagination_cursor(client: TestClient, headers: dict):
+    first = client.get("/api/doctors/?limit=10", headers=headers)
+    second = client.get(f"/api/doctors/?limit=10&cursor={first.headers['X-Next-Cursor']}", headers=headers)
+
+    assert len(first.json()) == 10
+    assert {doctor["id"] for doctor in first.json()}.isdisjoint(doctor["id"] for doctor in second.json())
+
+
+def test_trusted_json_writes_utc_like_pydantic():
+    published_at = datetime(2024, 1, 1, 9, 30, tzinfo=timezone.utc)
+
+    assert trusted_json({"published_at": published_at}).body == b'{"published_at":"2024-01-01T09:30:00Z"}'
+
+
+def expand_compact(schedule: dict, types: list, doctors: dict) -> dict:
+    """Rebuild the full schedule payload from its compact form, as a client would."""
+    week_start = date.fromisoformat(schedule["week_start_date"])
+    columns = schedule["assignments"]
+    return {
+        **schedule,
+        "assignments": [
+            {
+                "id": assignment_id,
+                "doctor_id": doctors["id"][doctor],
+                "assignment_date": (week_start + timedelta(days=day)).isoformat(),
+                "assignment_type": types[type_code],
+                "doctor_name": doctors["name"][doctor],
+            }
+            for assignment_id, doctor, day, type_code in zip(columns["id"], columns["doctor"], columns["day"], columns["type"])
+        ],
+    }
+
+
+def test_compact_schedule_list_carries_the_full_payload(client: TestClient, headers: dict):
+    full = client.get("/api/schedules/", headers=headers)
+    compact = client.get("/api/schedules/?format=compact", headers=headers)
+
+    assert compact.status_code == 200
+    assert compact.headers["content-type"] == COMPACT_JSON_MEDIA_TYPE
+    payload = compact.json()
+    assert [expand_compact(schedule, payload["types"], payload["doctors"]) for schedule in payload["schedules"]] == full.json()
+    assert len(compact.content) < len(full.content) / 2
+
+
+@pytest.mark.parametrize("path", ["/api/schedules/1", f"/api/schedules/week/{FIRST_WEEK.isoformat()}"])
+def test_compact_single_schedule_negotiated_by_accept(client: TestClient, path: str, headers: dict):
+    full = client.get(path, headers=headers)
+    compact = client.get(path, headers={**headers, "Accept": COMPACT_JSON_MEDIA_TYPE})
+
+    assert compact.headers["content-type"] == COMPACT_JSON_MEDIA_TYPE
+    assert "Accept" in compact.headers["vary"].split(", ")
+    payload = compact.json()
+    types, doctors = payload.pop("types"), payload.pop("doctors")
+    assert payload["assignments"]["id"]
+    assert expand_compact(payload, types, doctors) == full.json()
+
+
+def test_compact_format_is_opt_in(client: TestClient, headers: dict):
+    default = client.get("/api/schedules/1", headers={**headers, "Accept": "application/json, */*"})
+    explicit = client.get("/api/schedules/1?format=json", headers={**headers, "Accept": COMPACT_JSON_MEDIA_TYPE})
+    refused = client.get("/api/schedules/1", headers={**headers, "Accept": f"{COMPACT_JSON_MEDIA_TYPE};q=0"})
+
+    for response in (default, explicit, refused):
+        assert response.headers["content-type"] == "application/json"
+        assert "Accept" in response.headers["vary"].split(", ")
+        assert isinstance(response.json()["assignments"], list)
+
+
+@pytest.mark.parametrize("quality", ["q=0", "q=0.0000", "q=0;level=1", " Q = 0.0 "])
+def test_compact_format_refused_with_any_zero_quality(client: TestClient, headers: dict, quality: str):
+    response = client.get("/api/schedules/1", headers={**headers, "Accept": f"{COMPACT_JSON_MEDIA_TYPE};{quality}"})
+
+    assert response.headers["content-type"] == "application/json"
+
+
+def test_compact_schedule_as_msgpack(client: TestClient, headers: dict):
+    msgpack = pytest.importorskip("msgpack")
+
+    compact = client.get("/api/schedules/1?format=compact", headers=headers)
+    packed = client.get("/api/schedules/1", headers={**headers, "Accept": "application/msgpack"})
+
+    assert packed.headers["content-type"] == COMPACT_MSGPACK_MEDIA_TYPE
+    assert msgpack.unpackb(packed.content) == compact.json()
+
+
+def test_msgpack_falls_back_to_compact_json_without_msgpack(client: TestClient, monkeypatch, headers: dict):
+    monkeypatch.setattr(utils.responses, "msgpack", None)
+
+    response = client.get("/api/schedules/1?format=msgpack", headers=headers)
+
+    assert response.headers["content-type"] == COMPACT_JSON_MEDIA_TYPE
+    assert response.json()["assignments"]["id"]
@@ -0,0 +1,59 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from database import SessionLocal
+from models import Assignment, AssignmentType, Doctor, Schedule, UserRole
+
+pytestmark = pytest.mark.usefixtures("clean_database")
+
+
+def test_week_schedule_is_created_once_and_reused(client: TestClient, auth_headers):
+    headers = auth_headers()
+
+    first = client.get("/api/schedules/week/2024-01-01", headers=headers)
+    second = client.get("/api/schedules/week/2024-01-01", headers=headers)
+
+    assert first.status_code == 200
+    assert second.json()["id"] == first.json()["id"]
+    db = SessionLocal()
+    try:
+        assert db.query(Schedule).count() == 1
+    finally:
+        db.close()
+
+
+def test_week_schedule_lists_assignments_with_doctor_names(client: TestClient, auth_headers):
+    headers = auth_headers()
+    db = SessionLocal()
+    try:
+        schedule = Schedule(week_start_date=datetime(2024, 1, 1), week_end_date=datetime(2024, 1, 7))
+        doctor = Doctor(name="Dr. Week")
+        db.add_all([schedule, doctor])
+        db.flush()
+        db.add(Assignment(
+            schedule_id=schedule.id,
+            doctor_id=doctor.id,
+            assignment_date=datetime(2024, 1, 2),
+            assignment_type=AssignmentType.MRI,
+        ))
+        db.commit()
+        schedule_id = schedule.id
+    finally:
+        db.close()
+
+    response = client.get("/api/schedules/week/2024-01-01", headers=headers)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["id"] == schedule_id
+    assert [(a["doctor_name"], a["assignment_date"], a["assignment_type"]) for a in body["assignments"]] == [
+        ("Dr. Week", "2024-01-02", "MRI")
+    ]
+
+
+def test_viewer_gets_404_for_missing_week(client: TestClient, auth_headers):
+    response = client.get("/api/schedules/week/2024-01-01", headers=auth_headers("viewer", UserRole.VIEWER))
+
+    assert response.status_code == 404
@@ -4,8 +4,9 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from fastapi import HTTPException
 from database import Base
-from models import Doctor, Schedule, Assignment, AssignmentType, Capacity
+from models import Doctor, DoctorAvailability, Schedule, Assignment, AssignmentType, AvailabilityKind, Capacity
 from routers.schedules import validate_assignment, AssignmentCreate
+from utils.availability import AvailabilityIndex, weekdays_to_mask
 
 # Test database setup
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -149,3 +150,102 @@ def test_validate_assignment_nonexistent_doctor(db, sample_schedule, sample_capa
 
     assert exc_info.value.status_code == 400
     assert exc_info.value.detail == "Doctor not found or inactive"
+
+def test_validate_assignment_during_leave(db, sample_doctor, sample_schedule, sample_capacities):
+    """Test assignment validation rejects days inside a planned leave"""
+    db.add(DoctorAvailability(
+        doctor_id=sample_doctor.id,
+        kind=AvailabilityKind.LEAVE,
+        start_date=date(2023, 12, 28),
+        end_date=date(2024, 1, 2)
+    ))
+    db.commit()
+
+    assignment_data = AssignmentCreate(
+        doctor_id=sample_doctor.id,
+        assignment_date=date(2024, 1, 2),
+        assignment_type=AssignmentType.XRAY
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        validate_assignment(db, assignment_data, sample_schedule.id)
+
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == "Doctor is unavailable on this date (leave)"
+
+    # The day after the leave ends is fine
+    assignment_data.assignment_date = date(2024, 1, 3)
+    validate_assignment(db, assignment_data, sample_schedule.id)
+
+def test_validate_assignment_on_part_time_day_off(db, sample_doctor, sample_schedule, sample_capacities):
+    """Test assignment validation respects part-time weekdays off"""
+    db.add(DoctorAvailability(
+        doctor_id=sample_doctor.id,
+        kind=AvailabilityKind.PART_TIME,
+        start_date=date(2024, 1, 1),
+        end_date=date(2024, 12, 31),
+        weekday_mask=weekdays_to_mask([2, 4])  # Wednesdays and Fridays
+    ))
+    db.commit()
+
+    assignment_data = AssignmentCreate(
+        doctor_id=sample_doctor.id,
+        assignment_date=date(2024, 1, 3),  # Wednesday
+        assignment_type=AssignmentType.XRAY
+    )
+    with pytest.raises(HTTPException) as exc_info:
+        validate_assignment(db, assignment_data, sample_schedule.id)
+    assert "part time" in exc_info.value.detail
+
+    assignment_data.assignment_date = date(2024, 1, 4)  # Thursday
+    validate_assignment(db, assignment_data, sample_schedule.id)
+
+def test_availability_index_merges_overlapping_entries():
+    """Test the interval index over overlapping and adjacent entries"""
+    entries = [
+        DoctorAvailability(doctor_id=1, kind=AvailabilityKind.LEAVE, start_date=date(2024, 1, 1), end_date=date(2024, 1, 5)),
+        DoctorAvailability(doctor_id=1, kind=AvailabilityKind.CONFERENCE, start_date=date(2024, 1, 4), end_date=date(2024, 1, 10)),
+        DoctorAvailability(doctor_id=1, kind=AvailabilityKind.LEAVE, start_date=date(2024, 1, 11), end_date=date(2024, 1, 12)),
+        DoctorAvailability(doctor_id=1, kind=AvailabilityKind.LEAVE, start_date=date(2024, 3, 1), end_date=date(2024, 3, 1)),
+        DoctorAvailability(doctor_id=2, kind=AvailabilityKind.LEAVE, start_date=date(2024, 1, 1), end_date=date(2024, 12, 31)),
+    ]
+    index = AvailabilityIndex(entries)
+
+    assert index.unavailable(1, date(2024, 1, 4)) == {AvailabilityKind.LEAVE, AvailabilityKind.CONFERENCE}
+    assert index.unavailable(1, date(2024, 1, 12)) == {AvailabilityKind.LEAVE}
+    assert index.is_available(1, date(2023, 12, 31))
+    assert index.is_available(1, date(2024, 1, 13))
+    assert not index.is_available(1, date(2024, 3, 1))
+    assert index.is_available(1, date(2024, 3, 2))
+    assert not index.is_available(2, date(2024, 6, 1))
+    assert index.is_available(3, date(2024, 6, 1))
+
+def test_availability_index_reports_only_kinds_covering_the_day():
+    """Test adjacent entries of different kinds keep their own kinds"""
+    entries = [
+        DoctorAvailability(doctor_id=1, kind=AvailabilityKind.LEAVE, start_date=date(2024, 1, 1), end_date=date(2024, 1, 5)),
+        DoctorAvailability(doctor_id=1, kind=AvailabilityKind.CONFERENCE, start_date=date(2024, 1, 6), end_date=date(2024, 1, 10)),
+    ]
+    index = AvailabilityIndex(entries)
+
+    assert index.unavailable(1, date(2024, 1, 2)) == {AvailabilityKind.LEAVE}
+    assert index.unavailable(1, date(2024, 1, 6)) == {AvailabilityKind.CONFERENCE}
+
+def test_validate_assignment_names_only_the_covering_entry(db, sample_doctor, sample_schedule, sample_capacities):
+    """Test the error names the entry on that day, not an adjacent one"""
+    db.add_all([
+        DoctorAvailability(doctor_id=sample_doctor.id, kind=AvailabilityKind.LEAVE,
+                           start_date=date(2024, 1, 1), end_date=date(2024, 1, 5)),
+        DoctorAvailability(doctor_id=sample_doctor.id, kind=AvailabilityKind.CONFERENCE,
+                           start_date=date(2024, 1, 6), end_date=date(2024, 1, 10)),
+    ])
+    db.commit()
+
+    assignment_data = AssignmentCreate(
+        doctor_id=sample_doctor.id,
+        assignment_date=date(2024, 1, 2),
+        assignment_type=AssignmentType.XRAY
+    )
+    with pytest.raises(HTTPException) as exc_info:
+        validate_assignment(db, assignment_data, sample_schedule.id)
+    assert exc_info.value.detail == "Doctor is unavailable on this date (leave)"
@@ -27,3 +27,14 @@ def get_user_by_username(db: Session, raw_username: str) -> Optional[User]:
         .first()
     )
 
+
+def release_connection(db: Session, user: Optional[User]) -> None:
+    """Return the session's pooled connection before slow password hashing.
+
+    Handlers await bcrypt on a worker pool; holding a connection across that
+    wait lets a login burst drain the pool. The user is detached first so its
+    loaded attributes stay readable; ``db.add(user)`` re-attaches it for updates.
+    """
+    if user is not None:
+        db.expunge(user)
+    db.rollback()
@@ -0,0 +1,147 @@
+"""In-memory interval index over doctor availability entries."""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models import AvailabilityKind, DoctorAvailability
+
+ALL_WEEKDAYS_MASK = 0b1111111
+
+
+def weekdays_to_mask(weekdays: Optional[Iterable[int]]) -> Optional[int]:
+    """Pack weekday numbers (Monday is 0) into a bitmask; ``None`` means every day."""
+    if weekdays is None:
+        return None
+    mask = 0
+    for weekday in weekdays:
+        mask |= 1 << weekday
+    return mask
+
+
+def mask_to_weekdays(mask: Optional[int]) -> Optional[List[int]]:
+    if mask is None:
+        return None
+    return [weekday for weekday in range(7) if mask & (1 << weekday)]
+
+
+class _MergedRanges:
+    """Disjoint, sorted date ranges supporting O(log n) membership checks.
+
+    Each run remembers the entries it was merged from, so a hit reports only
+    the kinds of the entries that actually cover the day.
+    """
+
+    def __init__(self, ranges: Sequence[Tuple[date, date, AvailabilityKind]]):
+        self.starts: List[date] = []
+        self.ends: List[date] = []
+        self.entries: List[List[Tuple[date, date, AvailabilityKind]]] = []
+
+        for start, end, kind in sorted(ranges, key=lambda item: item[0]):
+            if self.ends and start.toordinal() <= self.ends[-1].toordinal() + 1:
+                if end > self.ends[-1]:
+                    self.ends[-1] = end
+                self.entries[-1].append((start, end, kind))
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+                self.entries.append([(start, end, kind)])
+
+    def lookup(self, day: date) -> Optional[FrozenSet[AvailabilityKind]]:
+        position = bisect_right(self.starts, day) - 1
+        if position < 0 or day > self.ends[position]:
+            return None
+        # A run has no gaps, so at least one of its entries covers the day
+        return frozenset(kind for start, end, kind in self.entries[position] if start <= day <= end)
+
+
+class AvailabilityIndex:
+    """Answers "is this doctor unavailable on this day?" in O(log n).
+
+    Entries are grouped per doctor and per weekday, and the ranges in each
+    group are merged into disjoint sorted runs, so a lookup is one bisect.
+    Adjacent or overlapping entries merge into one run; a lookup still
+    reports only the kinds of the entries covering that day.
+    """
+
+    def __init__(self, entries: Iterable[DoctorAvailability]):
+        ranges: Dict[Tuple[int, int], List[Tuple[date, date, AvailabilityKind]]] = defaultdict(list)
+        for entry in entries:
+            mask = ALL_WEEKDAYS_MASK if entry.weekday_mask is None else entry.weekday_mask
+            for weekday in range(7):
+                if mask & (1 << weekday):
+                    ranges[(entry.doctor_id, weekday)].append(
+                        (entry.start_date, entry.end_date, entry.kind)
+                    )
+        self._runs = {key: _MergedRanges(value) for key, value in ranges.items()}
+
+    @staticmethod
+    def _statement(start: date, end: date, doctor_ids: Optional[Iterable[int]]) -> Select:
+        statement = select(DoctorAvailability).where(
+            and_(DoctorAvailability.start_date <= end, DoctorAvailability.end_date >= start)
+        )
+        if doctor_ids is not None:
+            statement = statement.where(DoctorAvailability.doctor_id.in_(list(doctor_ids)))
+        return statement
+
+    @classmethod
+    def load(
+        cls,
+        db: Session,
+        start: date,
+        end: date,
+        doctor_ids: Optional[Iterable[int]] = None,
+    ) -> "AvailabilityIndex":
+        """Build an index from the entries overlapping ``start``..``end``."""
+        return cls(db.execute(cls._statement(start, end, doctor_ids)).scalars().all())
+
+    @classmethod
+    async def load_async(
+        cls,
+        db: AsyncSession,
+        start: date,
+        end: date,
+        doctor_ids: Optional[Iterable[int]] = None,
+    ) -> "AvailabilityIndex":
+        """:meth:`load` for handlers on the async session."""
+        result = await db.execute(cls._statement(start, end, doctor_ids))
+        return cls(result.scalars().all())
+
+    def unavailable(self, doctor_id: int, day: date) -> Optional[FrozenSet[AvailabilityKind]]:
+        """Kinds of the entries blocking the doctor on ``day``, or ``None`` if free."""
+        runs = self._runs.get((doctor_id, day.weekday()))
+        if runs is None:
+            return None
+        return runs.lookup(day)
+
+    def is_available(self, doctor_id: int, day: date) -> bool:
+        return self.unavailable(doctor_id, day) is None
+
+
+def blocking_kinds(db: Session, doctor_id: int, day: date) -> Optional[FrozenSet[AvailabilityKind]]:
+    """Kinds of the entries blocking one doctor on one day, or ``None`` if free.
+
+    A single lookup needs no index; this is one query for the entries
+    spanning ``day``, filtered by weekday.
+    """
+    rows = db.execute(
+        select(DoctorAvailability.kind, DoctorAvailability.weekday_mask).where(
+            DoctorAvailability.doctor_id == doctor_id,
+            DoctorAvailability.start_date <= day,
+            DoctorAvailability.end_date >= day,
+        )
+    ).all()
+    weekday_bit = 1 << day.weekday()
+    kinds = frozenset(kind for kind, mask in rows if mask is None or mask & weekday_bit)
+    return kinds or None
+
+
+def describe_unavailability(kinds: Iterable[AvailabilityKind]) -> str:
+    return ", ".join(sorted(kind.value.replace("_", " ").lower() for kind in kinds))
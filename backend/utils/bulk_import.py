@@ -0,0 +1,120 @@
+"""Incremental parsing of streamed CSV and NDJSON uploads."""
+
+from __future__ import annotations
+
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from fastapi import HTTPException, status
+
+CSV_MEDIA_TYPES = {"text/csv", "application/csv"}
+NDJSON_MEDIA_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+
+# One parsed record: its 1-based position in the upload and either the field
+# mapping or the reason it could not be parsed.
+ParsedRecord = Tuple[int, Dict[str, Any] | None, str | None]
+
+
+def _invalid_upload(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], quote_aware: bool = False) -> AsyncIterator[str]:
+    """Decode a byte stream and yield complete lines, newline included.
+
+    With ``quote_aware`` a newline inside a double-quoted CSV field does not
+    end the line, so each yielded string is one whole CSV record. Quotes are
+    escaped by doubling them in CSV, so an odd running count means the
+    current position is inside a quoted field.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    in_quotes = False
+    scanned = 0
+
+    async for chunk in chunks:
+        try:
+            pending += decoder.decode(chunk)
+        except UnicodeDecodeError:
+            raise _invalid_upload("Upload must be UTF-8 encoded")
+
+        start = 0
+        for index in range(scanned, len(pending)):
+            character = pending[index]
+            if quote_aware and character == '"':
+                in_quotes = not in_quotes
+            elif character == "\n" and not in_quotes:
+                yield pending[start:index + 1]
+                start = index + 1
+        pending = pending[start:]
+        scanned = len(pending)
+
+    try:
+        pending += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise _invalid_upload("Upload must be UTF-8 encoded")
+    if pending:
+        yield pending
+
+
+async def iter_csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRecord]:
+    """Yield one mapping per CSV data row, keyed by the header row."""
+    header: List[str] | None = None
+    row_number = 0
+
+    async for line in iter_lines(chunks, quote_aware=True):
+        if not line.strip():
+            continue
+        try:
+            (values,) = csv.reader([line])
+        except (csv.Error, ValueError) as exc:
+            if header is None:
+                raise _invalid_upload(f"Invalid CSV header: {exc}")
+            row_number += 1
+            yield row_number, None, f"Invalid CSV row: {exc}"
+            continue
+
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            continue
+
+        row_number += 1
+        if len(values) > len(header):
+            yield row_number, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield row_number, dict(zip(header, values)), None
+
+
+async def iter_ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRecord]:
+    """Yield one mapping per non-blank NDJSON line."""
+    row_number = 0
+
+    async for line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield row_number, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(record, dict):
+            yield row_number, None, "Each line must be a JSON object"
+            continue
+        # Field names are matched the same way as CSV headers
+        yield row_number, {str(key).strip().lower(): value for key, value in record.items()}, None
+
+
+def iter_upload_records(content_type: str, chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRecord]:
+    """Pick the parser for an upload from its ``Content-Type`` header."""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type in CSV_MEDIA_TYPES:
+        return iter_csv_records(chunks)
+    if media_type in NDJSON_MEDIA_TYPES:
+        return iter_ndjson_records(chunks)
+    raise HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail="Upload must be text/csv or application/x-ndjson"
+    )
@@ -0,0 +1,44 @@
+"""Compression helpers for stored HTML snapshots and cached response bodies."""
+
+from __future__ import annotations
+
+import gzip
+
+from utils.headers import parse_quality_values
+
+# Snapshots are written once and read many times, so spend the CPU up front.
+SNAPSHOT_COMPRESSION_LEVEL = 9
+
+
+def compress_body(body: str | bytes) -> bytes:
+    """Compress a response body that will be stored and served many times.
+
+    The gzip container (rather than a bare zlib stream) lets the stored bytes be
+    sent as-is to clients that advertise ``Accept-Encoding: gzip``. ``mtime`` is
+    pinned so identical bodies always produce identical bytes.
+    """
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    return gzip.compress(body, compresslevel=SNAPSHOT_COMPRESSION_LEVEL, mtime=0)
+
+
+def compress_html(html: str) -> bytes:
+    """Compress an HTML document into a gzip member; see :func:`compress_body`."""
+    return compress_body(html)
+
+
+def decompress_html(payload: bytes) -> str:
+    """Inverse of :func:`compress_html`."""
+    return gzip.decompress(payload).decode("utf-8")
+
+
+def accepts_gzip(accept_encoding: str | None) -> bool:
+    """Return ``True`` when an ``Accept-Encoding`` header allows gzip.
+
+    An explicit ``gzip`` entry decides on its own; ``*`` only covers gzip
+    when it is not listed.
+    """
+    weights = parse_quality_values(accept_encoding)
+    if "gzip" in weights:
+        return weights["gzip"] > 0
+    return weights.get("*", 0.0) > 0
@@ -0,0 +1,33 @@
+"""Parsing of content-negotiation headers such as ``Accept`` and ``Accept-Encoding``."""
+
+from __future__ import annotations
+
+from typing import Dict
+
+
+def parse_quality_values(header: str | None) -> Dict[str, float]:
+    """Map each lowercased token of a negotiation header to its ``q`` weight.
+
+    Entries without a ``q`` parameter weigh 1.0, and parameters after it
+    are ignored. An entry whose weight is not a number between 0 and 1 is
+    dropped. If a token is listed twice, its first entry counts.
+    """
+    weights: Dict[str, float] = {}
+    for entry in (header or "").split(","):
+        token, *params = entry.split(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() != "q":
+                continue
+            try:
+                quality = float(value.strip())
+            except ValueError:
+                quality = -1.0
+            break
+        if 0.0 <= quality <= 1.0:
+            weights.setdefault(token, quality)
+    return weights
@@ -0,0 +1,58 @@
+"""Keyset pagination helpers shared by the list endpoints."""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from typing import Any, Tuple
+
+from fastapi import HTTPException, Response, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last row on a page into an opaque cursor."""
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _matches(value: Any, expected: type) -> bool:
+    # JSON booleans decode to bool, which is an int subclass
+    if expected is int and isinstance(value, bool):
+        return False
+    return isinstance(value, expected)
+
+
+def decode_cursor(cursor: str, *types: type) -> Tuple[Any, ...]:
+    """Decode a cursor produced by :func:`encode_cursor`.
+
+    ``types`` gives the expected type of each value, e.g.
+    ``decode_cursor(cursor, str, int)`` for a ``(name, id)`` sort key.
+    Raises a 400 error when the cursor is malformed, has the wrong shape or
+    holds a value of the wrong type, so it never reaches the database.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError, binascii.Error):
+        values = None
+
+    if (
+        not isinstance(values, list)
+        or len(values) != len(types)
+        or not all(_matches(value, expected) for value, expected in zip(values, types))
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+    return tuple(values)
+
+
+def set_next_cursor(response: Response, cursor: str | None) -> None:
+    """Expose the cursor for the following page, if there is one."""
+    if cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
@@ -0,0 +1,98 @@
+"""JSON responses for payloads built from trusted database rows.
+
+FastAPI validates whatever a handler returns against its ``response_model``,
+dumps it back to Python and encodes that. For list endpoints that turn
+thousands of ORM rows into JSON, this is most of the CPU per request, and it
+re-checks types the database already guarantees. These handlers build plain
+dicts in the shape of the response model and return :func:`trusted_json`.
+The model stays on the route for the OpenAPI schema, and tests check the
+payloads still validate against it.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Any, Optional
+
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
+
+from utils.headers import parse_quality_values
+
+try:
+    import msgpack
+except ImportError:  # optional; compact payloads are then always JSON
+    msgpack = None
+
+COMPACT_JSON_MEDIA_TYPE = "application/vnd.scheduler.compact+json"
+COMPACT_MSGPACK_MEDIA_TYPE = "application/vnd.scheduler.compact+msgpack"
+MSGPACK_MEDIA_TYPES = (COMPACT_MSGPACK_MEDIA_TYPE, "application/msgpack", "application/x-msgpack")
+
+# OpenAPI ``responses`` entry for routes that negotiate compact payloads
+COMPACT_RESPONSES = {200: {"content": {COMPACT_JSON_MEDIA_TYPE: {}, COMPACT_MSGPACK_MEDIA_TYPE: {}}}}
+
+
+def as_date(value: datetime | date) -> date:
+    """Date of a DateTime column that holds midnight, as ``date`` fields expect."""
+    return value.date() if isinstance(value, datetime) else value
+
+
+class TrustedJSONResponse(ORJSONResponse):
+    def render(self, content: Any) -> bytes:
+        # OPT_UTC_Z writes UTC offsets as "Z", matching Pydantic's output
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+
+
+def trusted_json(content: Any, response: Optional[Response] = None) -> TrustedJSONResponse:
+    """Encode ``content`` with orjson, skipping response-model validation.
+
+    ``content`` may hold dates and enums; orjson writes them as ISO strings
+    and values. Headers set on the handler's injected ``response``, such as
+    the next-page cursor, are carried over, since FastAPI only merges them
+    into responses it builds itself.
+    """
+    encoded = TrustedJSONResponse(content)
+    if response is not None:
+        encoded.headers.raw.extend(response.headers.raw)
+    return encoded
+
+
+def _accepted_media_types(accept: str | None) -> set[str]:
+    """Media types an ``Accept`` header allows, ignoring ``q=0`` entries."""
+    return {media_type for media_type, quality in parse_quality_values(accept).items() if quality > 0}
+
+
+def negotiate_compact(request: Request, response: Response, requested: Optional[str] = None) -> Optional[str]:
+    """Pick the encoding of an opt-in compact payload, or ``None`` for the full one.
+
+    ``requested`` is the route's ``?format=`` value (``json``, ``compact`` or
+    ``msgpack``) and wins over the ``Accept`` header. MessagePack needs the
+    optional ``msgpack`` package; without it, compact JSON is sent and the
+    ``Content-Type`` says so.
+    """
+    response.headers["Vary"] = "Accept"
+    if requested is None:
+        accepted = _accepted_media_types(request.headers.get("accept"))
+        if not accepted.isdisjoint(MSGPACK_MEDIA_TYPES):
+            requested = "msgpack"
+        elif COMPACT_JSON_MEDIA_TYPE in accepted:
+            requested = "compact"
+    if requested is None or requested == "json":
+        return None
+    return "msgpack" if requested == "msgpack" and msgpack is not None else "json"
+
+
+def compact_response(content: Any, encoding: str, response: Optional[Response] = None) -> Response:
+    """Encode a compact payload chosen by :func:`negotiate_compact`.
+
+    ``content`` must only hold JSON types, so both encodings carry the same
+    values.
+    """
+    if encoding == "msgpack":
+        encoded = Response(msgpack.packb(content), media_type=COMPACT_MSGPACK_MEDIA_TYPE)
+    else:
+        encoded = Response(orjson.dumps(content), media_type=COMPACT_JSON_MEDIA_TYPE)
+    if response is not None:
+        encoded.headers.raw.extend(response.headers.raw)
+    return encoded
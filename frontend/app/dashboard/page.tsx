@@ -118,8 +118,8 @@ export default function DashboardPage() {
     }
   }
 
-  const handleLogout = () => {
-    apiClient.clearToken()
+  const handleLogout = async () => {
+    await apiClient.logout()
     router.push('/login')
   }
 
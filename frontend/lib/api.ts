@@ -14,34 +14,114 @@ import {
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8001'
 
+// Columnar schedule payload served with ?format=compact. Each assignment is
+// one entry per array: doctor is an index into doctors, day an offset from
+// week_start_date and type an index into types.
+interface CompactSchedule extends Omit<Schedule, 'assignments' | 'created_by'> {
+  assignments: { id: number[]; doctor: number[]; day: number[]; type: number[] }
+}
+
+interface CompactDictionaries {
+  types: AssignmentType[]
+  doctors: { id: number[]; name: string[] }
+}
+
+function addDays(isoDate: string, days: number): string {
+  const date = new Date(`${isoDate}T00:00:00Z`)
+  date.setUTCDate(date.getUTCDate() + days)
+  return date.toISOString().slice(0, 10)
+}
+
+function expandSchedule(schedule: CompactSchedule, { types, doctors }: CompactDictionaries): Schedule {
+  const { id, doctor, day, type } = schedule.assignments
+  return {
+    id: schedule.id,
+    week_start_date: schedule.week_start_date,
+    week_end_date: schedule.week_end_date,
+    is_published: schedule.is_published,
+    assignments: id.map((assignmentId, i) => ({
+      id: assignmentId,
+      doctor_id: doctors.id[doctor[i]],
+      assignment_date: addDays(schedule.week_start_date, day[i]),
+      assignment_type: types[type[i]],
+      doctor_name: doctors.name[doctor[i]],
+    })),
+  } as Schedule
+}
+
 class ApiClient {
   private token: string | null = null
+  private refreshToken: string | null = null
+  private refreshing: Promise<boolean> | null = null
 
   constructor() {
-    // Load token from localStorage on initialization
+    // Load tokens from localStorage on initialization
     if (typeof window !== 'undefined') {
       this.token = localStorage.getItem('auth_token')
+      this.refreshToken = localStorage.getItem('refresh_token')
     }
   }
 
-  setToken(token: string) {
+  setToken(token: string, refreshToken?: string | null) {
     this.token = token
     // Persist token to localStorage
     if (typeof window !== 'undefined') {
       localStorage.setItem('auth_token', token)
     }
+    if (refreshToken !== undefined) {
+      this.refreshToken = refreshToken
+      if (typeof window !== 'undefined') {
+        if (refreshToken) {
+          localStorage.setItem('refresh_token', refreshToken)
+        } else {
+          localStorage.removeItem('refresh_token')
+        }
+      }
+    }
   }
 
   clearToken() {
     this.token = null
+    this.refreshToken = null
     if (typeof window !== 'undefined') {
       localStorage.removeItem('auth_token')
+      localStorage.removeItem('refresh_token')
     }
   }
 
+  // Trade the refresh token for a new access token. Concurrent callers share one attempt.
+  private async refreshAccessToken(): Promise<boolean> {
+    if (!this.refreshToken) {
+      return false
+    }
+    if (!this.refreshing) {
+      this.refreshing = (async () => {
+        try {
+          const response = await fetch(`${API_BASE_URL}/api/auth/refresh`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ refresh_token: this.refreshToken }),
+          })
+          if (!response.ok) {
+            return false
+          }
+          const data: AuthResponse = await response.json()
+          this.setToken(data.access_token, data.refresh_token ?? null)
+          return true
+        } catch {
+          return false
+        } finally {
+          this.refreshing = null
+        }
+      })()
+    }
+    return this.refreshing
+  }
+
   private async request<T>(
     endpoint: string, 
-    options: RequestInit = {}
+    options: RequestInit = {},
+    retryOnUnauthorized = true
   ): Promise<T> {
     const url = `${API_BASE_URL}${endpoint}`
     const headers: Record<string, string> = {
@@ -58,6 +138,10 @@ class ApiClient {
       headers,
     })
 
+    if (response.status === 401 && retryOnUnauthorized && await this.refreshAccessToken()) {
+      return this.request<T>(endpoint, options, false)
+    }
+
     if (!response.ok) {
       const error = await response.json().catch(() => ({ detail: 'Unknown error' }))
       
@@ -97,10 +181,22 @@ class ApiClient {
     }
 
     const data = await response.json()
-    this.setToken(data.access_token)
+    this.setToken(data.access_token, data.refresh_token ?? null)
     return data
   }
 
+  async logout(): Promise<void> {
+    const refreshToken = this.refreshToken
+    this.clearToken()
+    if (refreshToken) {
+      await fetch(`${API_BASE_URL}/api/auth/logout`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ refresh_token: refreshToken }),
+      }).catch(() => undefined)
+    }
+  }
+
   async getCurrentUser(): Promise<User> {
     return this.request<User>('/api/auth/me')
   }
@@ -138,11 +234,17 @@ class ApiClient {
 
   // Schedule endpoints
   async getSchedules(): Promise<Schedule[]> {
-    return this.request<Schedule[]>('/api/schedules/')
+    const payload = await this.request<CompactDictionaries & { schedules: CompactSchedule[] }>(
+      '/api/schedules/?format=compact'
+    )
+    return payload.schedules.map((schedule) => expandSchedule(schedule, payload))
   }
 
   async getScheduleByWeek(weekStartDate: string): Promise<Schedule> {
-    return this.request<Schedule>(`/api/schedules/week/${weekStartDate}`)
+    const payload = await this.request<CompactSchedule & CompactDictionaries>(
+      `/api/schedules/week/${weekStartDate}?format=compact`
+    )
+    return expandSchedule(payload, payload)
   }
 
   async createSchedule(weekStartDate: string): Promise<Schedule> {
@@ -193,8 +295,15 @@ class ApiClient {
     return this.request<PublishedSchedule[]>('/api/published')
   }
 
+      // The /html page is served straight from the stored gzip snapshot, so
+      // nothing is decompressed or recompressed per request
       async getPublishedSchedule(slug: string): Promise<{ html_content: string }> {
-        return this.request<{ html_content: string }>(`/api/published/${slug}`)
+        const response = await fetch(`${API_BASE_URL}/api/published/${slug}/html`)
+        if (!response.ok) {
+          const error = await response.json().catch(() => ({ detail: `HTTP ${response.status}` }))
+          throw new Error(error.detail || `HTTP ${response.status}`)
+        }
+        return { html_content: await response.text() }
       }
 
       // User management endpoints
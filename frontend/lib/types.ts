@@ -99,4 +99,5 @@ export interface LoginCredentials {
 export interface AuthResponse {
   access_token: string
   token_type: string
+  refresh_token?: string | null
 }